@@ -0,0 +1,256 @@
+# Near-duplicate clustering of unmapped answers (MinHash + LSH).
+#
+# Every distinct unmapped answer is shingled into character 3-grams and
+# summarised by a MinHash signature. Signatures are cut into LSH bands;
+# answers sharing a band bucket become candidate pairs, candidates whose
+# signatures agree on at least THRESHOLD of the hashes are linked, and the
+# linked components are the clusters. No answer is ever compared with
+# every other one, so this scales to tens of thousands of strings.
+#
+# CLI:
+#   python answer_clusters.py                    (all questions, master sheet)
+#   python answer_clusters.py perception --top 10
+
+import argparse
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from survey_pipeline import (
+    FILE,
+    INVALID_BRAND_RESPONSES,
+    INVALID_MOTIVATION,
+    INVALID_PERCEPTION,
+    INVALID_PREFERENCE,
+    PRODUCT_ONLY_KEYWORDS,
+    SPONTANEOUS_INVALID,
+    SPONTANEOUS_PRODUCT_KEYWORDS,
+    cache_path,
+    clean_text,
+    explode_multiselect,
+    load_survey,
+    map_brand_awareness,
+    map_distinct,
+    map_motivation,
+    map_perception,
+    map_preference_brand,
+    map_spontaneous_brand,
+    resolve_columns,
+    safe_text,
+)
+
+# question -> (mapper, invalid answers, deliberately dropped keywords, multi-select)
+UNMAPPED_QUESTIONS = {
+    "perception": (map_perception, INVALID_PERCEPTION, [], True),
+    "motivation": (map_motivation, INVALID_MOTIVATION, [], True),
+    "other_packaged_brands": (map_brand_awareness, INVALID_BRAND_RESPONSES, PRODUCT_ONLY_KEYWORDS, True),
+    "top_3_packaged_brands": (map_spontaneous_brand, SPONTANEOUS_INVALID, SPONTANEOUS_PRODUCT_KEYWORDS, True),
+    "brand_preference": (map_preference_brand, INVALID_PREFERENCE, [], False),
+}
+
+SHINGLE = 3
+N_HASHES = 64
+BANDS = 16          # 16 bands × 4 rows: candidates from ~50% similarity
+THRESHOLD = 0.5     # min. estimated Jaccard to link a candidate pair
+
+_PRIME = (1 << 31) - 1
+
+
+def unmapped_answers(master, question):
+    """
+    Distinct answers the rules do not map (invalid / dropped answers excluded).
+    DataFrame [answer, Respondents], most frequent first.
+    """
+    mapper, invalid, dropped, multiselect = UNMAPPED_QUESTIONS[question]
+    col = resolve_columns(master)[question]
+
+    answers = master[[col]].copy()
+    answers[col] = answers[col].map(clean_text)
+    if multiselect:
+        answers = explode_multiselect(answers, col)
+    answers = answers[col].dropna()
+
+    # rules run once per distinct string
+    keys = map_distinct(answers, safe_text)
+    mapped = map_distinct(answers, mapper)
+
+    unmapped = (
+        mapped.isna()
+        & (keys != "")
+        & ~keys.isin(invalid)
+        & ~keys.map(lambda k: any(p in k for p in dropped))
+    )
+    answers = answers[unmapped]
+
+    return (
+        answers.groupby(answers.to_numpy())
+        .apply(lambda s: s.index.nunique())
+        .rename_axis("answer")
+        .reset_index(name="Respondents")
+        .sort_values(["Respondents", "answer"], ascending=[False, True])
+        .reset_index(drop=True)
+    )
+
+
+def shingles(text, k=SHINGLE):
+    """
+    Hashed character k-grams of the lower-cased, space-padded text.
+    """
+    t = " " + " ".join(safe_text(text).split()) + " "
+    if len(t) <= k:
+        return {zlib.crc32(t.encode())}
+    return {zlib.crc32(t[i:i + k].encode()) for i in range(len(t) - k + 1)}
+
+
+def minhash_signatures(texts, n_hashes=N_HASHES, seed=0, chunk=200_000):
+    """
+    (len(texts), n_hashes) MinHash signatures, one universal hash per column:
+    h(x) = (a * x + b) mod p, minimum taken over each text's shingles.
+    """
+    sets = [np.fromiter(shingles(t), dtype=np.int64) for t in texts]
+    sizes = np.array([len(s) for s in sets])
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, n_hashes, dtype=np.int64)
+    b = rng.integers(0, _PRIME, n_hashes, dtype=np.int64)
+
+    sig = np.empty((len(texts), n_hashes), dtype=np.int64)
+    if not len(texts):
+        return sig
+
+    # texts are processed in chunks so the hash matrix stays small
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    i = 0
+    while i < len(texts):
+        j = i + 1
+        while j < len(texts) and starts[j + 1] - starts[i] <= chunk:
+            j += 1
+
+        values = np.concatenate(sets[i:j]) % _PRIME
+        hashed = (values[:, None] * a[None, :] + b[None, :]) % _PRIME
+        sig[i:j] = np.minimum.reduceat(hashed, starts[i:j] - starts[i], axis=0)
+        i = j
+
+    return sig
+
+
+def lsh_clusters(sig, bands=BANDS, threshold=THRESHOLD):
+    """
+    Cluster label per signature row. Rows sharing any band bucket are
+    candidates; candidates agreeing on >= threshold of the hashes are joined.
+    """
+    n, n_hashes = sig.shape
+    if n == 0:
+        return np.array([], dtype=int)
+
+    rows = n_hashes // bands
+    src, dst = [], []
+
+    for band in range(bands):
+        keys = sig[:, band * rows:(band + 1) * rows]
+        _, bucket = np.unique(keys, axis=0, return_inverse=True)
+        bucket = bucket.ravel()
+
+        # link every row to the first row of its bucket
+        first = np.full(bucket.max() + 1, n, dtype=np.int64)
+        np.minimum.at(first, bucket, np.arange(n))
+        leader = first[bucket]
+
+        pair = leader != np.arange(n)
+        src.append(np.arange(n)[pair])
+        dst.append(leader[pair])
+
+    src = np.concatenate(src)
+    dst = np.concatenate(dst)
+
+    # drop weak candidates (estimated Jaccard from signature agreement)
+    agree = (sig[src] == sig[dst]).mean(axis=1)
+    keep = agree >= threshold
+
+    graph = sparse.coo_matrix(
+        (np.ones(keep.sum()), (src[keep], dst[keep])), shape=(n, n)
+    )
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+def cluster_unmapped(master, question, threshold=THRESHOLD):
+    """
+    Unmapped answers of one question grouped into near-duplicate clusters.
+    DataFrame [cluster, answer, Respondents, Cluster Respondents,
+    Cluster Size], clusters ranked by total respondents (cluster 1 = biggest).
+    """
+    answers = unmapped_answers(master, question)
+    if answers.empty:
+        return answers.assign(cluster=[], **{"Cluster Respondents": [], "Cluster Size": []})
+
+    labels = lsh_clusters(minhash_signatures(answers["answer"]), threshold=threshold)
+    answers["cluster"] = labels
+
+    grouped = answers.groupby("cluster")["Respondents"]
+    answers["Cluster Respondents"] = grouped.transform("sum")
+    answers["Cluster Size"] = grouped.transform("size")
+
+    answers = answers.sort_values(
+        ["Cluster Respondents", "cluster", "Respondents"],
+        ascending=[False, True, False]
+    )
+    answers["cluster"] = pd.factorize(answers["cluster"])[0] + 1
+
+    return answers[["cluster", "answer", "Respondents", "Cluster Respondents", "Cluster Size"]].reset_index(drop=True)
+
+
+def load_clusters(question, path=FILE):
+    """
+    Clusters for a workbook, computed once per dataset version
+    (survey_pipeline.py is part of the version, so rule edits re-cluster).
+    """
+    version, frames = load_survey(path)
+    csv = cache_path(version, f"clusters_{question}.csv")
+
+    if os.path.exists(csv):
+        return pd.read_csv(csv)
+
+    clusters = cluster_unmapped(frames["master"], question)
+    clusters.to_csv(csv, index=False)
+    return clusters
+
+
+def cluster_rules(clusters, cluster, label):
+    """
+    Rule entries mapping every answer of one cluster to `label`
+    (paste into the question's *_MAP in survey_pipeline.py).
+    """
+    answers = clusters.loc[clusters["cluster"] == cluster, "answer"]
+    return {safe_text(a): label for a in answers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate clusters of unmapped answers")
+    parser.add_argument("questions", nargs="*", default=list(UNMAPPED_QUESTIONS))
+    parser.add_argument("--file", default=FILE)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    for question in args.questions:
+        clusters = load_clusters(question, args.file)
+
+        print("=" * 80)
+        print(f"UNMAPPED CLUSTERS: {question}")
+        print(f"Distinct unmapped answers: {len(clusters)} | clusters: {clusters['cluster'].nunique()}")
+        print("=" * 80)
+
+        for cluster, rows in clusters.groupby("cluster", sort=True):
+            if cluster > args.top:
+                break
+            print(f"\n[{cluster}] {rows['Cluster Respondents'].iloc[0]} respondents, {len(rows)} answers")
+            for _, r in rows.iterrows():
+                print(f"    ({r['Respondents']}) {r['answer']}")
+
+
+if __name__ == "__main__":
+    main()
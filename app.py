@@ -1,13 +1,30 @@
 # streamlit run app.py
 # expects "Untitled spreadsheet.xlsx" in same folder
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 import altair as alt
-import re
 import os
+import json
+import time
+from contextlib import nullcontext
 import plotly.express as px
 
+from answer_clusters import UNMAPPED_QUESTIONS, cluster_rules, load_clusters
+from association import cluster_order, load_association
+from brand_funnel import BENCHMARK_BRANDS, brand_funnel
+from dashboard_layout import BRAND_STAGE_COLORS, CHART_COLORS, GENDER_COLORS, PALETTE, TAB_TITLES
+from journey import funnel_counts, load_stages
+from multiselect_bits import encode_multiselect
+from segments import SegmentIndex
+from significance import annotate_crosstabs, annotate_multiselect, respondent_crosstab, ALPHA
+from survey_pipeline import FALLBACK_THRESHOLD, FILE, TENURE_BUCKETS, resolve_columns, rule_labels_only
+from text_index import TEXT_QUESTIONS, cached_text_index, search_waves
+from wave_compare import compare_aggregates, compare_waves, top_movers
+from waves import WAVES, WaveStore
+from weighting import DEFAULT_TARGETS, MAX_WEIGHT, rake, targets_key
+
 # =====================================================
 # PAGE CONFIG
 # =====================================================
@@ -31,25 +48,39 @@ h1, h2 {
 </style>
 """, unsafe_allow_html=True)
 
-PALETTE = ["#F59E0B", "#22D3EE", "#8B5CF6", "#34D399", "#F472B6"]
-
 # =====================================================
 # DATA LOADING
 # =====================================================
-FILE = "Untitled spreadsheet.xlsx"
 if not os.path.exists(FILE):
     st.error("Master file not found")
     st.stop()
 
-@st.cache_data
-def load_master():
-    xl = pd.ExcelFile(FILE)
-    sheet = next(s for s in xl.sheet_names if "master" in s.lower())
-    df = pd.read_excel(FILE, sheet_name=sheet)
-    df.columns = [c.strip().lower() for c in df.columns]
-    return df
+@st.cache_resource
+def get_wave_store():
+    """
+    One store per server; each wave is normalized once per dataset version.
+    """
+    return WaveStore()
+
+# loads new / changed waves only (concurrently), others stay as they are
+wave_store = get_wave_store().add_many(WAVES)
+
+with st.sidebar:
+    st.header("Survey wave")
+
+    selected_wave = st.selectbox(
+        "Wave",
+        wave_store.names,
+        index=len(wave_store.names) - 1
+    )
+
+wave = wave_store.waves[selected_wave]
 
-df_raw = load_master()
+dataset_path = wave["path"]
+dataset_ver = wave["version"]
+frames = wave["frames"]
+
+df_raw = frames["master"]
 
 # =====================================================
 # HERO HEADER (Stable Version)
@@ -86,7 +117,7 @@ st.markdown(
     f"""
     <div class="hero-box">
         <div class="hero-title">Consumer Insights Dashboard</div>
-        <div class="hero-sub">Total Respondents: {total_respondents}</div>
+        <div class="hero-sub">Total Respondents: {total_respondents} · Wave: {selected_wave}</div>
     </div>
     """,
     unsafe_allow_html=True
@@ -95,1331 +126,1335 @@ st.markdown(
 # =====================================================
 # COLUMN MAPPING (BUSINESS MEANING)
 # =====================================================
-COLS = {
-    "customer_name": "customer name",
-    "age": "age",
-    "gender": "gender",
-
-    # Column D (note: “here” typo in sheet)
-    "heard_when": "first here about go desi",
-
-    # Column E
-    "product_category": "product category",
-
-    # Column F
-    "discovery": "how did the customer hear about desi popz",
-
-    # Column G
-    "frequency": "how often does the customer eat desi popz",
-
-    # Column H
-    "consumption_moment": "when does the customer usually eat desi popz",
-
-    # Column I
-    "perception": "what is desi popz",
-
-    # Column J
-    "motivation": "why do you choose desi popz",
-
-    # Column K
-    "brand_linkage": "did you know we also make indian sweets",
-
-    # Column L
-    "other_packaged_brands": "which other packaged indian sweet brand",
-
-    # Column M
-    "top_3_packaged_brands": "top 3 packaged indian sweet brands",
-
-    # Column N
-    "brand_preference": "which packaged sweets brand you prefer",
-
-    # Column O
-    "consumption_frequency": "how often do you consume packaged indian sweets",
-
-    # Column P
-    "consumption_occasion": "on what occasions you consume packaged indian sweets"
-}
-
-def find_col(key):
-    token = COLS[key]
-    matches = [c for c in df_raw.columns if token in c]
-    if not matches:
-        raise ValueError(f"Column not found for key='{key}' using token='{token}'")
-    return matches[0]
-
-age_col = find_col("age")
-gender_col = find_col("gender")
-heard_when_col = find_col("heard_when")
-product_col = find_col("product_category")
-discovery_col = find_col("discovery")
-frequency_col = find_col("frequency")
-moment_col = find_col("consumption_moment")
-perception_col = find_col("perception")
-motivation_col = find_col("motivation")
-linkage_col = find_col("brand_linkage")
-other_brand_col = find_col("other_packaged_brands")
-top3_col = find_col("top_3_packaged_brands")
-preference_col = find_col("brand_preference")
-freq_col = find_col("consumption_frequency")
-occasion_col = find_col("consumption_occasion")
+cols = resolve_columns(df_raw)
+
+age_col = cols["age"]
+gender_col = cols["gender"]
+heard_when_col = cols["heard_when"]
+product_col = cols["product_category"]
+discovery_col = cols["discovery"]
+frequency_col = cols["frequency"]
+moment_col = cols["consumption_moment"]
+perception_col = cols["perception"]
+motivation_col = cols["motivation"]
+linkage_col = cols["brand_linkage"]
+other_brand_col = cols["other_packaged_brands"]
+top3_col = cols["top_3_packaged_brands"]
+preference_col = cols["brand_preference"]
+freq_col = cols["consumption_frequency"]
+occasion_col = cols["consumption_occasion"]
 
 # =====================================================
-# GENERIC HELPERS
+# NORMALIZED DATA (see survey_pipeline.py for the rules)
 # =====================================================
-def clean_text(x):
-    if pd.isna(x):
-        return None
-    return re.sub(r"\s+", " ", str(x)).strip()
+df_master = frames["master"]
+df = frames["df"]
+df_product = frames["product"]
+df_disc = frames["disc"]
+df_moment = frames["moment"]
+df_perception = frames["perception"]
+df_motivation = frames["motivation"]
+df_linkage = frames["linkage"]
+df_brand = frames["brand"]
+df_top3 = frames["top3"]
+df_pref = frames["pref"]
+df_freq = frames["freq"]
+df_occ = frames["occ"]
+
+# answers labelled by the fallback classifier (not by a keyword rule)
+with st.sidebar:
+    st.header("Classification")
+
+    include_model_labels = st.checkbox(
+        "Include classifier labels for unmapped answers",
+        value=True,
+        key="include_model_labels"
+    )
 
-def safe_text(x):
-    """
-    Converts anything into a safe lowercase trimmed string.
-    - NaN/None -> ""
-    - numbers -> "123"
-    - normal string -> "clean lowercase string"
-    """
-    if pd.isna(x):
-        return ""
-    return str(x).strip().lower()
+# unchecked: the classifier's answers are left out of every view (frames,
+# indicator matrix, bitmaps, journey, associations, waves)
+if not include_model_labels:
+    frames = rule_labels_only(frames)
+    df_perception = frames["perception"]
+    df_motivation = frames["motivation"]
+    df_occ = frames["occ"]
 
-def explode_multiselect(df, col):
+onehot = wave["onehot"] if include_model_labels else wave["onehot_rules"]
+
+def model_label_caption(frame, norm_col):
     """
-    Handles comma-separated multiselect answers safely.
-    Example: "Instagram, Friend" -> 2 rows.
+    How many of the shown answers come from the classifier.
     """
-    tmp = df.copy()
-    tmp[col] = tmp[col].dropna().astype(str).str.split(",")
-    tmp = tmp.explode(col)
-    tmp[col] = tmp[col].astype(str).str.strip()
-    return tmp[tmp[col] != ""]
+    n_model = int((frame[f"{norm_col}_source"] == "model").sum())
+    if n_model == 0:
+        return None
+    return (
+        f"Includes {n_model} answers labelled by the fallback classifier "
+        f"(no keyword rule matched; confidence ≥ {FALLBACK_THRESHOLD:.0%})."
+    )
 
 # =====================================================
-# UNMAPPED AUDIT (TERMINAL)
+# WEIGHTING (RAKING TO AGE × GENDER TARGETS)
 # =====================================================
-
-def print_unmapped_report(df_src, raw_col, norm_col, label, id_cols=None, top_n=20):
+@st.cache_data
+def load_weights(version, targets_json):
     """
-    Prints unmapped responses to terminal.
-    Unmapped = raw has value but norm is NaN/None.
+    Raked respondent weights, fitted once per dataset version and target set.
     """
-    if id_cols is None:
-        id_cols = []
+    return rake(df_master, json.loads(targets_json))
+
+with st.sidebar:
+    st.header("Weighting")
+
+    weighted = st.toggle("Weight to population targets", value=False)
+
+    weight_targets = {}
+    with st.expander("Targets (%)"):
+        for target_col, shares in DEFAULT_TARGETS.items():
+            st.markdown(f"**{target_col.replace('_norm', '').title()}**")
+            weight_targets[target_col] = {
+                label: st.number_input(
+                    label,
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=share * 100,
+                    step=1.0,
+                    key=f"target_{target_col}_{label}"
+                ) / 100
+                for label, share in shares.items()
+            }
 
-    tmp = df_src.copy()
+if weighted:
+    resp_weight, weight_info = load_weights(dataset_ver, targets_key(weight_targets))
+    st.sidebar.caption(
+        f"Raked in {weight_info['iterations']} iterations "
+        f"(max margin error {weight_info['max_error']:.1e}). "
+        f"Weights capped at {MAX_WEIGHT:g}× the mean ({weight_info['trimmed']} respondents); "
+        f"effective sample size {weight_info['effective_n']:.0f} of {len(df_master)}. "
+        f"{weight_info['uncovered']} respondents with no age / gender target keep weight 1."
+    )
+else:
+    resp_weight = pd.Series(1.0, index=df_master.index)
+
+# weights aligned with the indicator-matrix rows (None = unweighted)
+matrix_weights = (
+    resp_weight.reindex(onehot.respondents).fillna(1.0).to_numpy()
+    if weighted else None
+)
 
-    # keep only rows with non-empty raw value
-    tmp = tmp[tmp[raw_col].notna()]
-    tmp = tmp[tmp[raw_col].astype(str).str.strip() != ""]
+def unweighted_note(view):
+    """
+    Caption for views that always count raw respondents.
+    """
+    if weighted:
+        st.caption(f"{view} unweighted (raw respondent counts); the weighting toggle does not apply here.")
 
-    # unmapped = norm is null
-    unmapped = tmp[tmp[norm_col].isna()].copy()
+def row_weights(frame):
+    """
+    Respondent weight for every row of a (possibly exploded) frame.
+    """
+    return resp_weight.reindex(frame.index).fillna(1.0).to_numpy()
 
-    if unmapped.empty:
-        print(f"✅ [{label}] No unmapped responses.")
-        return
+def weighted_size(frame):
+    """
+    Row count, or the sum of respondent weights when weighting is on.
+    """
+    if not weighted:
+        return frame.shape[0]
+    return float(row_weights(frame).sum())
 
-    print("\n" + "=" * 80)
-    print(f"❗ UNMAPPED REPORT: {label}")
-    print(f"Raw column: {raw_col}")
-    print(f"Total unmapped rows: {len(unmapped)}")
-    print("=" * 80)
+def weighted_value_counts(series):
+    """
+    value_counts(), summing respondent weights when weighting is on.
+    """
+    if not weighted:
+        return series.value_counts()
+
+    return (
+        pd.Series(row_weights(series))
+        .groupby(series.to_numpy())
+        .sum()
+        .rename_axis(series.name)
+        .rename("count")
+        .sort_values(ascending=False)
+    )
 
-    # print top unmapped values
-    value_counts = (
-        unmapped[raw_col]
-        .astype(str)
-        .str.strip()
-        .value_counts()
-        .head(top_n)
+def weighted_group_size(frame, keys):
+    """
+    groupby(keys).size(), summing respondent weights when weighting is on.
+    """
+    if not weighted:
+        return frame.groupby(keys).size()
+
+    return (
+        pd.Series(row_weights(frame))
+        .groupby([frame[k].to_numpy() for k in keys])
+        .sum()
+        .rename_axis(keys)
     )
 
-    print("\nTop Unmapped Responses:")
-    for val, cnt in value_counts.items():
-        print(f"  ({cnt}) {val}")
+def with_weight(frame):
+    """
+    Adds a weight column when weighting is on (for cached aggregations).
+    """
+    if not weighted:
+        return frame
+    return frame.assign(weight=row_weights(frame))
 
-    # print row-level details
-    print("\nSample Row-level Unmapped Entries (first 50):")
-    cols_to_print = id_cols + [raw_col]
-    cols_to_print = [c for c in cols_to_print if c in unmapped.columns]
+def fmt_n(x):
+    return f"{x:.0f}"
 
-    for idx, row in unmapped[cols_to_print].head(50).iterrows():
-        row_meta = " | ".join([f"{c}={row[c]}" for c in cols_to_print if c != raw_col])
-        print(f"RowIndex={idx} | {row_meta} | UNMAPPED_VALUE={row[raw_col]}")
 
-    # export all unmapped rows to CSV
-    out_csv = f"unmapped_{label.lower().replace(' ', '_')}.csv"
-    unmapped[cols_to_print].to_csv(out_csv, index=True)
-    print(f"\n📁 Exported unmapped rows to: {out_csv}")
+# =====================================================
+# KPI (ONLY TOTAL RESPONDENTS)
+# =====================================================
 
+total_respondents = len(df_master)
 
 # =====================================================
-# NORMALIZATION RULES
+# TABS
 # =====================================================
+tabs = st.tabs(list(TAB_TITLES.values()))
 
-# ---- Column D: When first heard ----
-INVALID_HEARD_WHEN = {
-    "not responded",
-    "i don't remember",
-    "dont remember",
-    ""
-}
+# =====================================================
+# SEGMENT HELPERS
+# =====================================================
+@st.cache_data
+def load_multiselect_bits(version, model_labels):
+    """
+    Bitmask encoding of every multi-select question (per dataset version
+    and classifier-label setting).
+    """
+    return encode_multiselect(onehot)
 
-# ---- Column F: Discovery Channel ----
-DISCOVERY_MAP = {
-    # Word of mouth
-    "a friend or a family": "Word of Mouth",
-    "a friend or family member": "Word of Mouth",
-    "friend / family recommendation": "Word of Mouth",
-    "received it as a gift": "Word of Mouth",
-
-    # Corporate gifting
-    "got it as gift from his company": "Corporate Gifting",
-
-    # Social media
-    "instagram": "Social Media",
-    "facebook": "Social Media",
-    "whatsapp": "Social Media",
-    "youtube": "Social Media",
-
-    # E-commerce
-    "amazon": "E-commerce",
-    "amazon/flipkart": "E-commerce",
-
-    # Quick commerce
-    "blinkit/instamart/zepto": "Quick Commerce",
-    "swiggy instamart": "Quick Commerce",
-    "online grocery app (blinkit, instamart, zepto, etc.)": "Quick Commerce",
-
-    # Offline
-    "saw it in a store": "In-store / Offline",
-    "spotted in a store": "In-store / Offline",
-    "shillong shop": "In-store / Offline",
-
-    # Brand
-    "go desi website": "Brand Website",
-
-    # Media
-    "shark tank": "Shark Tank",
-    "sharktank india by my daughter": "Shark Tank",
-
-    # Paid
-    "ad": "Paid Advertising",
-}
+@st.cache_data
+def load_segment_index(version, model_labels):
+    """
+    Packed respondent bitmaps for the segment builder (per dataset version
+    and classifier-label setting).
+    """
+    return SegmentIndex(onehot)
 
-INVALID_DISCOVERY = {
-    "not responded",
-    "not sure",
-    "dont know",
-    "other",
-    ""
-}
+@st.cache_data
+def load_journey_stages(version, model_labels):
+    """
+    Journey stage code per respondent (per dataset version and
+    classifier-label setting).
+    """
+    _, stages = load_stages(dataset_path, model_labels)
+    return stages
 
-# ---- Column H: Consumption Moment ----
-CONSUMPTION_MOMENT_MAP = {
-    # After meals
-    "after lunch": "After meals",
-    "after dinner": "After meals",
-    "after meals": "After meals",
+def question_label(question):
+    return question.replace("_", " ").title()
 
-    # Evening snack
-    "as an evening snack": "Evening snack",
+def segment_rows(age_filter, gender_filter):
+    """
+    Boolean mask over indicator-matrix rows for the tab's Age / Gender selectboxes.
+    """
+    master = df_master.reindex(onehot.respondents)
+    rows = np.ones(len(master), dtype=bool)
 
-    # Work / study
-    "during work/study breaks": "During work / study breaks",
+    if age_filter != "All":
+        rows &= (master["age_norm"] == age_filter).to_numpy()
 
-    # Watching content
-    "while watching content": "While watching content (OTT / YouTube)",
-    "while watching content (youtube/ott)": "While watching content (OTT / YouTube)",
+    if gender_filter != "All":
+        rows &= (master["gender_norm"] == gender_filter).to_numpy()
 
-    # Cravings
-    "whenever i crave something sweet": "Whenever I crave something sweet",
-    "to curb chatpata cravings": "Whenever I crave something sweet",
-    "to curb my chatpata cravings": "Whenever I crave something sweet",
-    "to curb chatpata cravings / craving": "Whenever I crave something sweet",
+    return rows
 
-    # Festivals
-    "only during festivals/special occasions": "Only during festivals / special occasions",
+# =====================================================
+# COMMON CHART HELPERS
+# =====================================================
+def chart_frame(df, columns):
+    """
+    Only the columns a chart encodes, on a plain index, with repeated text
+    labels dictionary-encoded. Streamlit ships each chart's data once as an
+    Arrow dataset, so this is what goes over the wire on every rerun.
+    """
+    columns = [c for c in dict.fromkeys(columns) if c in df.columns]
+    out = df[columns].reset_index(drop=True)
+    for c in out.columns:
+        if not pd.api.types.is_numeric_dtype(out[c]) and out[c].nunique() * 2 <= len(out):
+            out[c] = out[c].astype("category")
+    return out
+
+# Chart templates: each chart type's Vega-Lite spec is compiled from Altair
+# once per encoding (the Altair build + schema validation is most of a
+# chart's cost) and cached as JSON on a placeholder dataset. Per call only
+# the data and titles are swapped in; the result goes to st.vega_lite_chart.
+SPEC_DATA = "table"
+
+def compile_spec(chart):
+    """
+    Vega-Lite JSON of an Altair chart, as st.altair_chart would emit it
+    (Altair's default theme switched off).
+    """
+    theme = alt.theme.enable("none") if alt.theme.active == "default" else nullcontext()
+    with theme:
+        return json.dumps(chart.to_dict())
 
-    # Travel
-    "while traveling": "While travelling",
-    "while travelling": "While travelling",
+def fill_spec(template, df, **titles):
+    """
+    Fresh spec from a template with `df` as its data and the given axis
+    titles (x=..., y=...) on every layer that shows one.
+    """
+    spec = json.loads(template)
+    for layer in spec.get("layer", [spec]):
+        for channel, title in titles.items():
+            encoding = layer["encoding"].get(channel, {})
+            if "title" in encoding:
+                encoding["title"] = title
+    spec["datasets"] = {SPEC_DATA: df}
+    return spec
+
+def concat_charts(charts, direction="hconcat", width=None):
+    """
+    Batches several filled specs into one concat spec (one element and one
+    message per rerun); each chart keeps its own named dataset.
+    """
+    views, datasets = [], {}
+    for i, chart in enumerate(charts):
+        name = f"{SPEC_DATA}_{i}"
+        view = {k: v for k, v in chart.items() if k not in ("$schema", "datasets")}
+        view["data"] = {"name": name}
+        if width is not None:
+            view["width"] = width
+        views.append(view)
+        datasets[name] = chart["datasets"][SPEC_DATA]
+    # "fit" autosizing only applies to single / layered views
+    return {
+        "$schema": charts[0]["$schema"],
+        direction: views,
+        "datasets": datasets,
+        "autosize": {"type": "pad", "contains": "padding"}
+    }
 
-    # Bored / free time
-    "when bored / free time / leisure": "When bored / free time",
-    "when i'm bored": "When bored / free time",
+@st.cache_resource
+def bar_template(y_col, x_col, color, with_count):
+    data = alt.Data(name=SPEC_DATA)
 
-    # Party
-    "party": "Party / social occasions",
+    bars = alt.Chart(data).mark_bar(color=color).encode(
+        x=alt.X(f"{x_col}:Q", title="x"),
+        y=alt.Y(f"{y_col}:N", sort=None),
+        tooltip=[
+            alt.Tooltip(f"{y_col}:N", title=y_col),
+            alt.Tooltip("Pct:Q", format=".1f", title="%"),
+            alt.Tooltip("Count:Q", title="Count")
+        ] if with_count else [
+            alt.Tooltip(f"{y_col}:N", title=y_col),
+            alt.Tooltip("Pct:Q", format=".1f", title="%")
+        ]
+    )
 
-    # Any time
-    "any time": "Any time",
-    "anytime": "Any time",
-    "all time": "Any time"
-}
+    labels = alt.Chart(data).mark_text(
+        align="left",
+        baseline="middle",
+        dx=6,
+        fontSize=12,
+        color="white"
+    ).encode(
+        x=f"{x_col}:Q",
+        y=alt.Y(f"{y_col}:N", sort="-x"),
+        text=alt.Text("Pct:Q", format=".1f")
+    ).transform_calculate(
+        PctLabel="format(datum.Pct, '.1f') + '%'"
+    ).encode(
+        text="PctLabel:N"
+    )
 
-INVALID_CONSUMPTION_MOMENTS = {
-    "not responded",
-    "other",
-    "none of the above",
-    "it depends on mood",
-    "when will get mood",
-    "stopped eating / didn't like / not a regular consumer",
-    "ocassionally",
-    ""
-}
+    return compile_spec(bars + labels)
 
-# ---- Column I: Perception ----
-PERCEPTION_MAP = {
-    # Candy / Lollipop
-    "candy": "Candy",
-    "lollipop": "Lollipop",
-
-    # Tangy / Chatpata
-    "tangy": "Tangy / Chatpata Treat",
-    "chatak chussa": "Tangy / Chatpata Treat",
-    "tamarind": "Tangy / Chatpata Treat",
-    "imli": "Tangy / Chatpata Treat",
-    "mango": "Tangy / Chatpata Treat",
-
-    # Nostalgia
-    "nostalgic": "Nostalgic Snack",
-    "bachpan": "Nostalgic Snack",
-
-    # Craving / Time pass
-    "craving": "Craving / Time-pass Snack",
-    "time pass": "Craving / Time-pass Snack",
-    "break time": "Craving / Time-pass Snack",
-
-    # Unique / Variety
-    "unique": "Flavour Variety / Unique Taste",
-    "variety": "Flavour Variety / Unique Taste",
-
-    # Refreshment
-    "refreshment": "Refreshment / Mouth Freshener",
-    "mouth": "Refreshment / Mouth Freshener",
-
-    # Digestive
-    "churan": "Digestive / Churan-like",
-    "chavanprash": "Digestive / Churan-like",
-
-    # Quality
-    "quality": "Quality / Premium",
-
-    # Indian
-    "indian": "Indian / Desi Snack",
-
-    # Treat
-    "treat": "Occasional Treat",
-
-    # Negative
-    "pathetic": "Negative Feedback",
-    "didn't like": "Negative Feedback",
-    "not a regular": "Negative Feedback",
-}
+def bar_chart_with_pct_labels(df_counts, y_col, x_col="Pct", color="#22D3EE", title="% of Total Respondents", heading=None):
+    """
+    Horizontal bar chart with % labels at end of each bar.
+    Expects df_counts columns:
+      - y_col: category
+      - Pct
+      - Count (optional but recommended for tooltip)
+    heading becomes the chart title (used when charts are batched).
+    """
+    df_counts = chart_frame(df_counts, [y_col, x_col, "Pct", "Count"])
 
-INVALID_PERCEPTION = {
-    "not responded",
-    "",
-}
+    spec = fill_spec(bar_template(y_col, x_col, color, "Count" in df_counts.columns), df_counts, x=title)
+    if heading:
+        spec["title"] = heading
+    return spec
 
-# ---- Column J: Motivation ----
-MOTIVATION_MAP = {
-    "better ingredient": "Better Ingredients",
-    "natural": "Natural / Clean Label",
+@st.cache_data
+def age_crosstab(df_f, answer_col, respondents, row_col="age_norm", multi_select=False):
+    """
+    Age group (or row_col) × answer counts for the heatmaps (weighted totals when df_f
+    carries a weight column).
+    Significance (expected counts, adjusted residuals, chi-square) is
+    computed and cached together with the crosstab. Weighted counts are
+    tested at the effective sample size (Kish), so weighting does not
+    inflate the chi-square.
+    Multi-select answers are counted in respondents and tested one answer
+    at a time (picked vs not, see significance.annotate_multiselect); their
+    Pct is of the row group's respondents, the base of that test.
+    """
+    weight_col = "weight" if "weight" in df_f.columns else None
 
-    "guilt free": "Guilt-free Snacking",
+    if multi_select:
+        heat_df, bases = respondent_crosstab(df_f, row_col, answer_col, weight_col)
+    elif weight_col is None:
+        heat_df = df_f.groupby([row_col, answer_col]).size().reset_index(name="Count")
+    else:
+        heat_df = df_f.groupby([row_col, answer_col])["weight"].sum().reset_index(name="Count")
 
-    "nostalgic": "Nostalgic Vibes",
+    if weight_col is None:
+        scale = 1.0
+    else:
+        w = df_f.loc[~df_f.index.duplicated(), "weight"].to_numpy() if multi_select else df_f["weight"].to_numpy()
+        scale = w.sum() / (w ** 2).sum() if len(w) else 1.0
 
-    "chatpata": "Chatpata / Tangy Taste",
-    "chapati": "Chatpata / Tangy Taste",
+    if multi_select:
+        base = heat_df[row_col].map(bases)
+        heat_df["Pct"] = np.where(base > 0, heat_df["Count"] / base.where(base > 0), 0) * 100
+    else:
+        heat_df["Pct"] = (
+            heat_df["Count"] / respondents * 100
+            if respondents > 0 else 0
+        )
 
-    "fun to eat": "Fun to Eat",
+    heat_df["Count"] *= scale
+    if multi_select:
+        (heat_df,), (result,) = annotate_multiselect([heat_df], [bases * scale], row_col, answer_col)
+    else:
+        (heat_df,), (result,) = annotate_crosstabs([heat_df], row_col, answer_col)
+    heat_df["Count"] /= scale
+    heat_df["Expected"] /= scale
+    return heat_df, result
+
+@st.cache_resource
+def heatmap_template(answer_col, row_col):
+    base = alt.Chart(alt.Data(name=SPEC_DATA)).encode(
+        x=alt.X(f"{answer_col}:N", title="x"),
+        y=alt.Y(f"{row_col}:N", title="y")
+    )
 
-    "unique format": "Unique Format",
+    rects = base.mark_rect().encode(
+        color=alt.Color("Pct:Q", scale=alt.Scale(scheme="tealblues")),
+        tooltip=[
+            f"{row_col}:N",
+            f"{answer_col}:N",
+            alt.Tooltip("Pct:Q", format=".1f"),
+            "Count:Q",
+            alt.Tooltip("Expected:Q", format=".1f"),
+            alt.Tooltip("Residual:Q", format=".2f", title="Adj. residual"),
+            alt.Tooltip("CellP:Q", format=".3f", title="p")
+        ]
+    )
 
-    "taste": "Good Taste",
+    marks = base.mark_text(fontSize=14, color="white").encode(
+        text="Signal:N"
+    )
 
-    "quality": "Quality",
+    return compile_spec(rects + marks)
 
-    "wanted to try": "Curiosity / Trial",
-    "just tried": "Curiosity / Trial",
-    "curiosity": "Curiosity / Trial",
+def significance_heatmap(heat_df, answer_col, x_title, row_col="age_norm", y_title="Age Group"):
+    """
+    Heatmap shaded by % with ▲ / ▼ on significantly over / under-indexed cells.
+    """
+    heat_df = chart_frame(
+        heat_df,
+        [row_col, answer_col, "Pct", "Count", "Expected", "Residual", "CellP", "Signal"]
+    )
 
-    "gift": "Gifting",
+    return fill_spec(heatmap_template(answer_col, row_col), heat_df, x=x_title, y=y_title)
 
-    "kids": "Kids Like It",
+def significance_caption(result, row_label="age group"):
+    if "tests" in result:
+        return (
+            f"{result['significant']} of {len(result['tests'])} answers differ significantly by {row_label} "
+            f"(each tested on respondents who picked it vs not, χ² p < {ALPHA}). "
+            f"▲ / ▼ = cell significantly over / under-indexed (adjusted residual, p < {ALPHA})."
+        )
+    return (
+        f"χ² = {result['chi2']:.1f} (dof {result['dof']}), p = {result['p_value']:.3g}. "
+        f"▲ / ▼ = cell significantly over / under-indexed (adjusted residual, p < {ALPHA})."
+    )
 
-    "no one else": "Availability / No Alternatives",
+# =====================================================
+# PLOTLY FIGURE CACHE
+# =====================================================
+# Building a Plotly figure (px.* + update_traces/update_layout) costs far
+# more than the tiny aggregated frames behind it. Figures are cached per
+# chart kind (one builder each) and input data, and handed to st.plotly_chart
+# as built go.Figure objects: cache_resource avoids pickling, and Streamlit
+# re-validates plain dicts, so neither would save the build. The figures
+# are never mutated after building.
+@st.cache_resource(max_entries=256)
+def age_bar_figure(age_counts):
+    fig = px.bar(
+        age_counts,
+        x="Pct",
+        y="Age",
+        orientation="h",
+        text="Pct",
+        color_discrete_sequence=[CHART_COLORS["age"]]
+    )
 
-    "don't like": "Negative Experience",
-    "never ordered": "Negative Experience",
-}
+    fig.update_traces(
+        texttemplate="%{text:.1f}%",
+        textposition="outside",
+        cliponaxis=False,
+        width= 0.8
+    )
 
-INVALID_MOTIVATION = {
-    "not responded",
-    "",
-}
+    fig.update_layout(
+        height=260,        # tighter canvas
+        bargap=0.01,       # almost no vertical gap
+        xaxis_title="% of Respondents",
+        yaxis_title="Age Group",
+        showlegend=False,
+        margin=dict(t=10, b=10, l=10, r=10)
+    )
 
-# ---- Column L: Other Packaged Indian Sweet Brands ----
-BRAND_AWARENESS_MAP = {
-    "haldiram": "Haldiram",
-    "haldirams": "Haldiram",
-    "halidiram": "Haldiram",
+    return fig
+
+@st.cache_resource(max_entries=256)
+def gender_donut_figure(gender_counts):
+    fig = px.pie(
+        gender_counts,
+        names="Gender",
+        values="Count",
+        hole=0.5,
+        color="Gender",
+        color_discrete_map=GENDER_COLORS
+    )
 
-    "bikaji": "Bikaji",
-    "bikaaji": "Bikaji",
+    fig.update_traces(
+        textposition="inside",
+        textinfo="percent",
+        insidetextfont=dict(size=16),
+    )
 
-    "bikanervala": "Bikanervala",
-    "bikaner": "Bikanervala",
+    fig.update_layout(
+        height=350,
+        showlegend=True,
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
 
-    "amul": "Amul",
-    "farmley": "Farmley",
+    return fig
+
+@st.cache_resource(max_entries=256)
+def age_gender_bar_figure(age_gender_df, selected_ages):
+    fig = px.bar(
+        age_gender_df,
+        x="age_norm",
+        y="Pct",
+        color="gender_norm",
+        barmode="group",
+        category_orders={"age_norm": list(selected_ages)},
+        color_discrete_map=GENDER_COLORS
+    )
 
-    "go desi": "GO DESi",
-    "godesi": "GO DESi",
-    "only go desi": "GO DESi",
+    fig.update_traces(
+        texttemplate="%{y:.1f}%",
+        textposition="outside",
+        cliponaxis=False
+    )
 
-    "anand sweets": "Anand Sweets",
-    "anand": "Anand Sweets",
+    fig.update_layout(
+        height=450,
+        yaxis_title="% of Respondents",
+        xaxis_title="Age Group",
+        legend_title="Gender",
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
 
-    "bhikharam": "Bhikharam Chandmal",
-    "bhikharam chandmal": "Bhikharam Chandmal",
+    return fig
 
-    "nandini": "Nandini Sweets",
-    "nandini sweets": "Nandini Sweets",
+@st.cache_resource(max_entries=256)
+def journey_funnel_figure(funnel_df):
+    fig = px.funnel(
+        funnel_df,
+        x="Count",
+        y="Stage",
+        color_discrete_sequence=[CHART_COLORS["journey"]]
+    )
 
-    "karachi": "Karachi Bakery",
-    "jabson": "Jabsons",
-    "canbox": "Canbox",
-    "daadi": "Daadi’s",
-    "namaste india": "Namaste India",
-}
+    fig.update_traces(
+        texttemplate="%{x} (%{percentInitial:.0%})"
+    )
 
-LOCAL_BRAND_KEYWORDS = [
-    "local",
-    "sweet shop",
-    "sweet stall",
-    "almond house",
-    "rajpurohit",
-    "kanthi",
-    "asha",
-    "kranthi",
-    "tiwari",
-    "tewari",
-    "vijaya",
-]
-
-INVALID_BRAND_RESPONSES = {
-    "not responded",
-    "not sure",
-    "depends",
-    "disconnected in mid of the call",
-    "doesnt prefer packaged sweets",
-    "dont prefer packaged sweets",
-    "not aware of brands",
-    "dont remember any brands",
-    "manufacturer of sweets",
-    "prefers home made sweets",
-    "prefers whatever's convenient",
-    ""
-}
+    fig.update_layout(
+        height=380,
+        margin=dict(t=10, b=10, l=10, r=10)
+    )
 
-PRODUCT_ONLY_KEYWORDS = [
-    "kaju",
-    "katli",
-    "laddu",
-    "barfi",
-    "barfis",
-    "roll",
-    "snack",
-    "sweetcorn",
-]
-
-# ---- Column M: Top 3 Brands ----
-SPONTANEOUS_BRAND_MAP = {
-    "haldiram": "Haldiram",
-    "haldirams": "Haldiram",
-    "halidiram": "Haldiram",
-
-    "bikaji": "Bikaji",
-    "bikaaji": "Bikaji",
-
-    "bikanervala": "Bikanervala",
-    "bikaner": "Bikanervala",
-    "bikano": "Bikanervala",
-
-    "amul": "Amul",
-    "farmley": "Farmley",
-
-    "go desi": "GO DESi",
-    "godesi": "GO DESi",
-
-    "anand sweets": "Anand Sweets",
-    "anand": "Anand Sweets",
-
-    "bhikharam": "Bhikharam Chandmal",
-    "nandini": "Nandini Sweets",
-
-    "a2b": "A2B",
-    "mtr": "MTR",
-
-    "jabson": "Jabsons",
-    "canbox": "Canbox",
-    "daadi": "Daadi’s",
-    "namaste india": "Namaste India",
-    "karachi": "Karachi Bakery",
-}
+    return fig
 
-SPONTANEOUS_LOCAL_KEYWORDS = [
-    "local",
-    "sweet shop",
-    "sweet stall",
-    "almond house",
-    "agarwal",
-    "kanthi",
-    "asha",
-    "kranthi",
-    "tiwari",
-    "rajpurohit",
-]
-
-SPONTANEOUS_INVALID = {
-    "not responded",
-    "many",
-    "all good",
-    "all the sweets category",
-    "prefers whatever's convenient",
-    "dont prefer packaged sweets",
-    "disconnected in mid of the call",
-    ""
-}
+# =====================================================
+# TAB 1 — DEMOGRAPHICS
+# =====================================================
+with tabs[0]:
 
-SPONTANEOUS_PRODUCT_KEYWORDS = [
-    "kaju",
-    "katli",
-    "laddu",
-    "barfi",
-    "rasgulla",
-    "jalebi",
-    "peda",
-    "milk",
-]
+    st.subheader("Respondent Profile")
 
-# ---- Column N: Brand Preference ----
-PREFERENCE_BRAND_MAP = {
-    "haldiram": "Haldiram",
-    "haldirams": "Haldiram",
+    c1, c2 = st.columns(2)
 
-    "go desi": "GO DESi",
-    "godesi": "GO DESi",
+    with c1:
+        age_options = sorted(
+            df_master["age_norm"]
+            .dropna()
+            .unique()
+        )
 
-    "bikaji": "Bikaji",
-    "bikaaji": "Bikaji",
+        age_tab_filter = st.multiselect(
+            "Filter by Age",
+            age_options,
+            default=age_options
+        )
 
-    "anand sweets": "Anand Sweets",
-    "anand": "Anand Sweets",
+    with c2:
+        gender_options = sorted(
+            df_master[gender_col]
+            .dropna()
+            .unique()
+        )
 
-    "daadi": "Daadi’s",
-    "lal": "Lal Sweets",
+        gender_tab_filter = st.multiselect(
+            "Filter by Gender",
+            gender_options,
+            default=gender_options
+        )
 
-    "local": "Local / Unbranded Sweets",
-    "generic": "Local / Unbranded Sweets",
-}
+    # -------------------------------------------------
+    # FILTERED DATA
+    # -------------------------------------------------
+    demo_df = df_master.copy()
 
-INVALID_PREFERENCE = {
-    "not responded",
-    "no preference / doesn’t consume",
-    "no preference",
-    ""
-}
+    demo_df = demo_df[
+        demo_df["age_norm"].isin(age_tab_filter) &
+        demo_df[gender_col].isin(gender_tab_filter)
+    ]
 
-# ---- Column O: Consumption Frequency ----
-FREQUENCY_MAP = {
-    "daily": "Daily",
-    "2-3 times a week": "2–3 times a week",
-    "once a week": "Once a week",
-    "a few times a month": "A few times a month",
-    "occasionally": "Occasionally",
-    "rarely": "Rarely",
-}
+    INVALID_AGES = {
+        "n/a",
+        "not responded",
+        "don't know",
+        "dont know",
+        ""
+    }
 
-INVALID_FREQUENCY = {
-    "dont consume sweets",
-    "do not consume sweets",
-    "never",
-    "not responded",
-    ""
-}
+    demo_df = demo_df[
+        demo_df["age_norm"].notna() &
+        ~demo_df["age_norm"]
+            .astype(str)
+            .str.strip()
+            .str.lower()
+            .isin(INVALID_AGES)
+    ]
 
-# ---- Column P: Consumption Occasions ----
-OCCASION_MAP = {
-    "after meals": "After meals / dessert",
-    "dessert": "After meals / dessert",
+    responded_count = weighted_size(demo_df)
 
-    "tea": "Snack with tea / coffee",
-    "coffee": "Snack with tea / coffee",
-    "snack": "Snack with tea / coffee",
+    st.metric(
+        label="Responded to this question",
+        value=fmt_n(responded_count)
+    )
 
-    "craving": "Cravings / impulse eating",
-    "impulse": "Cravings / impulse eating",
+    if responded_count == 0:
+        st.warning("No responses available.")
+    else:
 
-    "bored": "Boredom / leisure",
+        # -------------------------------------------------
+        # AGE COUNTS
+        # -------------------------------------------------
+        age_counts = (
+            weighted_value_counts(demo_df["age_norm"])
+            .reset_index()
+        )
 
-    "festival": "Festivals",
-    "festive": "Festivals",
+        age_counts.columns = ["Age", "Count"]
 
-    "special": "Special occasions",
+        age_counts["Pct"] = (
+            age_counts["Count"] / responded_count * 100
+        )
 
-    "travel": "Travel",
-}
+        # Sort highest to lowest
+        age_counts = age_counts.sort_values(
+            "Count",
+            ascending=False
+        )
 
-INVALID_OCCASIONS = {
-    "does not consume",
-    "not responded",
-    ""
-}
+        # -------------------------------------------------
+        # PLOTLY BAR CHART
+        # -------------------------------------------------
+        st.plotly_chart(age_bar_figure(age_counts), use_container_width=True)
 
 # =====================================================
-# DATA TRANSFORMATION PIPELINE
+# TAB 2 — GENDER INSIGHTS
 # =====================================================
 
-df = df_raw.copy()
-
-# Clean text (do NOT drop rows)
-df = df.apply(lambda col: col.map(clean_text))
-
-# ---- Age Normalization ----
-def normalize_age(x):
-    x_low = str(x).strip().lower()
-
-    # Map invalids to N/A bucket
-    if x_low in {"n/a", "not responded", "don't know", "dont know", ""}:
-        return "N/A"
-
-    # Merge Below 18 into Under 20
-    if x_low in {"below 18", "under 20"}:
-        return "Under 20"
+with tabs[1]:
 
-    return x
+    st.subheader("Respondent Gender Profile")
 
-df["age_norm"] = df[age_col].apply(normalize_age)
+    # -------------------------------------------------
+    # BASE RESPONSES (DO NOT CHANGE WITH FILTERS)
+    # -------------------------------------------------
+    base_gender_df = df_master[
+        df_master["gender_norm"].isin(["Male", "Female"])
+    ]
 
-def normalize_gender(x):
-    x_low = safe_text(x)
+    responded_count = weighted_size(base_gender_df)
 
-    if x_low in ["male", "m"]:
-        return "Male"
+    st.markdown(
+        f"**Responded to this question – {fmt_n(responded_count)}**"
+    )
 
-    if x_low in ["female", "f"]:
-        return "Female"
-
-    if x_low in ["n/a", "", "not responded"]:
-        return "N/A"
-
-    return "N/A"
-
-df["gender_norm"] = df[gender_col].apply(normalize_gender)
-
-df_master = df.copy()
-
-# ---- Product Category (explode BOTH) ----
-def expand_product(x):
-    x = clean_text(x)
-    if x is None:
-        return None
-    if str(x).strip().lower() == "both":
-        return ["Sweets", "Confectionery and Mints"]
-    return [x]
-
-df_product = df.copy()
-df_product[product_col] = df_product[product_col].apply(expand_product)
-df_product = df_product.dropna(subset=[product_col])
-df_product = df_product.explode(product_col)
-
-# ---- Discovery Channel ----
-df_disc = df.copy()
-df_disc[discovery_col] = df_disc[discovery_col].map(clean_text)
-
-df_disc = explode_multiselect(df_disc, discovery_col)
-df_disc["discovery_norm"] = (
-    df_disc[discovery_col]
-    .astype(str)
-    .str.lower()
-    .map(DISCOVERY_MAP)
-)
-
-df_disc = df_disc[
-    ~df_disc[discovery_col].astype(str).str.lower().isin(INVALID_DISCOVERY)
-]
-df_disc = df_disc.dropna(subset=["discovery_norm"])
-
-# ---- Consumption Frequency (Column G) ----
-df[frequency_col] = df[frequency_col].map(clean_text)
-df = df[df[frequency_col].notna()]
-df = df[
-    ~df[frequency_col].astype(str).str.strip().str.lower().isin(
-        ["not responded", "not sure", ""]
+    # -------------------------------------------------
+    # AGE FILTER (VISUAL ONLY)
+    # -------------------------------------------------
+    age_options = sorted(
+        df_master["age_norm"]
+        .dropna()
+        .unique()
     )
-]
 
-# ---- Consumption Moment (Column H) ----
-df_moment = df.copy()
-df_moment[moment_col] = df_moment[moment_col].map(clean_text)
+    default_ages = [a for a in age_options if a != "N/A"]
 
-df_moment = explode_multiselect(df_moment, moment_col)
+    selected_ages = st.multiselect(
+        "Filter by Age Group",
+        age_options,
+        default=default_ages
+    )
 
-df_moment["moment_norm"] = (
-    df_moment[moment_col]
-    .astype(str)
-    .str.lower()
-    .map(CONSUMPTION_MOMENT_MAP)
-)
+    # Filtered dataset for charts only
+    gender_df = base_gender_df[
+        base_gender_df["age_norm"].isin(selected_ages)
+    ]
 
-df_moment = df_moment[
-    ~df_moment[moment_col].astype(str).str.lower().isin(INVALID_CONSUMPTION_MOMENTS)
-]
-df_moment = df_moment.dropna(subset=["moment_norm"])
+    col1, col2 = st.columns(2)
 
-# ---- Perception (Column I) ----
-df_perception = df.copy()
-df_perception[perception_col] = df_perception[perception_col].map(clean_text)
+    # =====================================================
+    # LEFT — GENDER DONUT (PLOTLY)
+    # =====================================================
+    with col1:
 
-df_perception = explode_multiselect(df_perception, perception_col)
+        st.markdown("### Gender Distribution")
 
-def map_perception(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+        gender_counts = (
+            weighted_value_counts(base_gender_df["gender_norm"])
+            .reindex(["Female", "Male"], fill_value=0)
+            .reset_index()
+        )
 
-    for k, v in PERCEPTION_MAP.items():
-        if k in x_low:
-            return v
+        gender_counts.columns = ["Gender", "Count"]
 
-    return None
+        st.plotly_chart(gender_donut_figure(gender_counts), use_container_width=True)
 
-df_perception["perception_norm"] = df_perception[perception_col].apply(map_perception)
+    # =====================================================
+    # RIGHT — AGE-WISE GENDER SPLIT (PLOTLY)
+    # =====================================================
+    with col2:
 
-df_perception = df_perception[
-    ~df_perception[perception_col].astype(str).str.lower().isin(INVALID_PERCEPTION)
-]
-df_perception = df_perception.dropna(subset=["perception_norm"])
+        st.markdown("### Age-wise Gender Split")
 
-# ---- Motivation (Column J) ----
-df_motivation = df.copy()
-df_motivation[motivation_col] = df_motivation[motivation_col].map(clean_text)
+        # Force all combinations (so 0% shows)
+        full_index = pd.MultiIndex.from_product(
+            [selected_ages, ["Female", "Male"]],
+            names=["age_norm", "gender_norm"]
+        )
 
-df_motivation = explode_multiselect(df_motivation, motivation_col)
+        age_gender_df = (
+            weighted_group_size(gender_df, ["age_norm", "gender_norm"])
+            .reindex(full_index, fill_value=0)
+            .reset_index(name="Count")
+        )
 
-def map_motivation(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+        age_gender_df["Pct"] = (
+            age_gender_df["Count"] / responded_count * 100
+        )
 
-    for k, v in MOTIVATION_MAP.items():
-        if k in x_low:
-            return v
+        st.plotly_chart(
+            age_gender_bar_figure(age_gender_df, tuple(selected_ages)),
+            use_container_width=True
+        )
 
-    return None
+# =====================================================
+# TAB 3 — DISCOVERY
+# =====================================================
+with tabs[2]:
 
-df_motivation["motivation_norm"] = df_motivation[motivation_col].apply(map_motivation)
+    # -----------------------------
+    # FILTERS
+    # -----------------------------
+    col1, col2 = st.columns(2)
 
-df_motivation = df_motivation[
-    ~df_motivation[motivation_col].astype(str).str.lower().isin(INVALID_MOTIVATION)
-]
-df_motivation = df_motivation.dropna(subset=["motivation_norm"])
+    with col1:
+        age_filter = st.selectbox(
+            "Age",
+            ["All"] + sorted(df_master["age_norm"].dropna().unique())
+        )
 
-# ---- Brand Linkage (Column K) ----
-df_linkage = df.copy()
-df_linkage[linkage_col] = df_linkage[linkage_col].map(clean_text)
-df_linkage = df_linkage[df_linkage[linkage_col].isin(["Yes", "No"])]
+    with col2:
+        gender_filter = st.selectbox(
+            "Gender",
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique())
+        )
 
-# ---- Column L: Brand Awareness ----
-df_brand = df.copy()
-df_brand[other_brand_col] = df_brand[other_brand_col].map(clean_text)
+    # -----------------------------
+    # APPLY FILTERS
+    # -----------------------------
+    df_disc_filtered = df_disc.copy()
 
-df_brand = explode_multiselect(df_brand, other_brand_col)
+    if age_filter != "All":
+        df_disc_filtered = df_disc_filtered[df_disc_filtered["age_norm"] == age_filter]
 
-def map_brand_awareness(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+    if gender_filter != "All":
+        df_disc_filtered = df_disc_filtered[df_disc_filtered["gender_norm"] == gender_filter]
 
-    if x_low in INVALID_BRAND_RESPONSES:
-        return None
+    # -----------------------------
+    # RESPONDENTS
+    # -----------------------------
+    respondents = weighted_size(df_disc_filtered)
 
-    for p in PRODUCT_ONLY_KEYWORDS:
-        if p in x_low:
-            return None
+    # -----------------------------
+    # HEADER (same as Gender tab)
+    # -----------------------------
+    st.subheader("How customers discovered GO DESi")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
-    for k, v in BRAND_AWARENESS_MAP.items():
-        if k in x_low:
-            return v
+    # -----------------------------
+    # AGGREGATION
+    # -----------------------------
+    disc_counts = weighted_value_counts(df_disc_filtered["discovery_norm"]).reset_index()
+    disc_counts.columns = ["Channel", "Count"]
 
-    for kw in LOCAL_BRAND_KEYWORDS:
-        if kw in x_low:
-            return "Local / Unbranded Sweets"
+    if respondents > 0:
+        disc_counts["Pct"] = (disc_counts["Count"] / respondents) * 100
+    else:
+        disc_counts["Pct"] = 0
 
-    return None
+    # -----------------------------
+    # CHART
+    # -----------------------------
+    chart = bar_chart_with_pct_labels(
+        df_counts=disc_counts,
+        y_col="Channel",
+        color=CHART_COLORS["discovery"]
+    )
 
-df_brand["brand_awareness_norm"] = df_brand[other_brand_col].apply(map_brand_awareness)
-df_brand = df_brand.dropna(subset=["brand_awareness_norm"])
+    st.vega_lite_chart(chart, use_container_width=True)
 
-# ---- Column M: Spontaneous Recall (Top 3) ----
-df_top3 = df.copy()
-df_top3[top3_col] = df_top3[top3_col].map(clean_text)
+    st.caption("Note: Discovery is multi-select, so totals can exceed 100%.")
 
-df_top3 = explode_multiselect(df_top3, top3_col)
+# =====================================================
+# TAB 3 — DISCOVERY
+# =====================================================
+with tabs[2]:
 
-def map_spontaneous_brand(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+    # Filters
+    col1, col2 = st.columns(2)
 
-    if x_low in SPONTANEOUS_INVALID:
-        return None
+    with col1:
+        age_filter = st.selectbox(
+            "Age",
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab3"
+        )
 
-    for p in SPONTANEOUS_PRODUCT_KEYWORDS:
-        if p in x_low:
-            return None
+    with col2:
+        gender_filter = st.selectbox(
+            "Gender",
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab3"
+        )
 
-    for k, v in SPONTANEOUS_BRAND_MAP.items():
-        if k in x_low:
-            return v
+    # Apply filters
+    df_filtered = df_disc.copy()
 
-    for kw in SPONTANEOUS_LOCAL_KEYWORDS:
-        if kw in x_low:
-            return "Local / Unbranded Sweets"
+    if age_filter != "All":
+        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
 
-    return None
+    if gender_filter != "All":
+        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
 
-df_top3["spontaneous_brand_norm"] = df_top3[top3_col].apply(map_spontaneous_brand)
-df_top3 = df_top3.dropna(subset=["spontaneous_brand_norm"])
+    # Respondents
+    respondents = weighted_size(df_filtered)
 
-# ---- Column N: Brand Preference ----
-df_pref = df.copy()
-df_pref[preference_col] = df_pref[preference_col].map(clean_text)
+    # Header
+    st.subheader("How customers discovered GO DESi")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
-def map_preference_brand(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+    # Aggregation
+    disc_counts = weighted_value_counts(df_filtered["discovery_norm"]).reset_index()
+    disc_counts.columns = ["Channel", "Count"]
 
-    if x_low in INVALID_PREFERENCE:
-        return None
+    disc_counts["Pct"] = (disc_counts["Count"] / respondents) * 100 if respondents > 0 else 0
 
-    for k, v in PREFERENCE_BRAND_MAP.items():
-        if k in x_low:
-            return v
+    # Chart
+    chart = bar_chart_with_pct_labels(
+        df_counts=disc_counts,
+        y_col="Channel",
+        color=CHART_COLORS["discovery"]
+    )
 
-    return None
+    st.vega_lite_chart(chart, use_container_width=True)
 
-df_pref["preferred_brand_norm"] = df_pref[preference_col].apply(map_preference_brand)
-df_pref = df_pref.dropna(subset=["preferred_brand_norm"])
+    st.caption("Note: Discovery is multi-select, so totals can exceed 100%.")
 
-# ---- Column O: Consumption Frequency (Packaged sweets) ----
-df_freq = df.copy()
-df_freq[freq_col] = df_freq[freq_col].map(clean_text)
+# =====================================================
+# TAB 4 — CONSUMPTION
+# =====================================================
+with tabs[3]:
 
-def map_frequency(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+    # -----------------------------
+    # FILTERS (use df_master)
+    # -----------------------------
+    col1, col2 = st.columns(2)
 
-    if x_low in INVALID_FREQUENCY:
-        return None
+    with col1:
+        age_filter = st.selectbox(
+            "Age",
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab4"
+        )
 
-    for k, v in FREQUENCY_MAP.items():
-        if k in x_low:
-            return v
+    with col2:
+        gender_filter = st.selectbox(
+            "Gender",
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab4"
+        )
 
-    return None
+    # -----------------------------
+    # APPLY FILTERS
+    # -----------------------------
+    df_freq_f = df_freq.copy()
+    df_occ_f = df_occ.copy()
 
-df_freq["consumption_frequency_norm"] = df_freq[freq_col].apply(map_frequency)
-df_freq = df_freq.dropna(subset=["consumption_frequency_norm"])
+    if age_filter != "All":
+        df_freq_f = df_freq_f[df_freq_f["age_norm"] == age_filter]
+        df_occ_f = df_occ_f[df_occ_f["age_norm"] == age_filter]
 
-# ---- Column P: Consumption Occasions ----
-df_occ = df.copy()
-df_occ[occasion_col] = df_occ[occasion_col].map(clean_text)
-df_occ = explode_multiselect(df_occ, occasion_col)
+    if gender_filter != "All":
+        df_freq_f = df_freq_f[df_freq_f["gender_norm"] == gender_filter]
+        df_occ_f = df_occ_f[df_occ_f["gender_norm"] == gender_filter]
 
-def map_occasion(x):
-    x_low = safe_text(x)
-    if x_low == "":
-        return None
+    # -----------------------------
+    # RESPONDENTS (base = freq)
+    # -----------------------------
+    respondents = weighted_size(df_freq_f)
 
-    if x_low in INVALID_OCCASIONS:
-        return None
+    st.subheader("Packaged Sweets Consumption Behaviour")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
-    for k, v in OCCASION_MAP.items():
-        if k in x_low:
-            return v
+    # -----------------------------
+    # FREQUENCY
+    # -----------------------------
+    freq_counts = weighted_value_counts(df_freq_f["consumption_frequency_norm"]).reset_index()
+    freq_counts.columns = ["Frequency", "Count"]
+    freq_counts["Pct"] = (freq_counts["Count"] / respondents) * 100 if respondents > 0 else 0
 
-    return None
+    chart1 = bar_chart_with_pct_labels(
+        freq_counts, "Frequency", color=CHART_COLORS["consumption_frequency"],
+        heading="How often consumers eat packaged sweets"
+    )
 
-df_occ["occasion_norm"] = df_occ[occasion_col].apply(map_occasion)
-df_occ = df_occ.dropna(subset=["occasion_norm"])
+    # -----------------------------
+    # OCCASION (multi-select)
+    # -----------------------------
+    occ_counts = weighted_value_counts(df_occ_f["occasion_norm"]).reset_index()
+    occ_counts.columns = ["Occasion", "Count"]
+    occ_counts["Pct"] = (occ_counts["Count"] / respondents) * 100 if respondents > 0 else 0
 
+    chart2 = bar_chart_with_pct_labels(
+        occ_counts, "Occasion", color=CHART_COLORS["consumption_occasion"],
+        heading="When consumers eat packaged sweets"
+    )
 
-# =====================================================
-# KPI (ONLY TOTAL RESPONDENTS)
-# =====================================================
+    # -----------------------------
+    # LAYOUT (both bars in one concat spec)
+    # -----------------------------
+    st.vega_lite_chart(concat_charts([chart1, chart2], width=340), width="content")
 
-total_respondents = len(df_master)
+    # -----------------------------
+    # HEATMAP
+    # -----------------------------
+    st.markdown("---")
+    st.subheader("Age Group vs Consumption Context")
 
-# =====================================================
-# TABS
-# =====================================================
-tabs = st.tabs([
-    "Demographics",
-    "Gender Insights",
-    "Discovery",
-    "Consumption",
-    "Perception",
-    "Motivation",
-    "Sweets Awareness",
-    "Sweets Preference",
-    "Brand Linkage"
-])
+    heat_df, heat_sig = age_crosstab(
+        with_weight(df_occ_f[["age_norm", "occasion_norm"]]), "occasion_norm", respondents,
+        multi_select=True
+    )
 
-# =====================================================
-# COMMON CHART HELPERS
-# =====================================================
-def bar_chart_with_pct_labels(df_counts, y_col, x_col="Pct", color="#22D3EE", title="% of Total Respondents"):
-    """
-    Horizontal bar chart with % labels at end of each bar.
-    Expects df_counts columns:
-      - y_col: category
-      - Pct
-      - Count (optional but recommended for tooltip)
-    """
+    heatmap = significance_heatmap(heat_df, "occasion_norm", "Consumption Moment")
 
-    bars = alt.Chart(df_counts).mark_bar(color=color).encode(
-        x=alt.X(f"{x_col}:Q", title=title),
-        y=alt.Y(f"{y_col}:N", sort=None),
-        tooltip=[
-            alt.Tooltip(f"{y_col}:N", title=y_col),
-            alt.Tooltip("Pct:Q", format=".1f", title="%"),
-            alt.Tooltip("Count:Q", title="Count")
-        ] if "Count" in df_counts.columns else [
-            alt.Tooltip(f"{y_col}:N", title=y_col),
-            alt.Tooltip("Pct:Q", format=".1f", title="%")
-        ]
-    )
+    st.vega_lite_chart(heatmap, use_container_width=True)
 
-    labels = alt.Chart(df_counts).mark_text(
-        align="left",
-        baseline="middle",
-        dx=6,
-        fontSize=12,
-        color="white"
-    ).encode(
-        x=f"{x_col}:Q",
-        y=alt.Y(f"{y_col}:N", sort="-x"),
-        text=alt.Text("Pct:Q", format=".1f")
-    ).transform_calculate(
-        PctLabel="format(datum.Pct, '.1f') + '%'"
-    ).encode(
-        text="PctLabel:N"
-    )
+    st.caption(significance_caption(heat_sig))
+    st.caption("Note: Multi-select responses may exceed 100%.")
 
-    return bars + labels
+    if model_label_caption(df_occ_f, "occasion_norm"):
+        st.caption(model_label_caption(df_occ_f, "occasion_norm"))
 
 # =====================================================
-# TAB 1 — DEMOGRAPHICS
+# TAB 5 — PERCEPTION
 # =====================================================
-with tabs[0]:
-
-    st.subheader("Respondent Profile")
+with tabs[4]:
 
-    c1, c2 = st.columns(2)
+    # -----------------------------
+    # FILTERS (use normalized cols)
+    # -----------------------------
+    col1, col2 = st.columns(2)
 
-    with c1:
-        age_options = sorted(
-            df_master["age_norm"]
-            .dropna()
-            .unique()
+    with col1:
+        age_filter = st.selectbox(
+            "Age",
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab5"
         )
 
-        age_tab_filter = st.multiselect(
-            "Filter by Age",
-            age_options,
-            default=age_options
+    with col2:
+        gender_filter = st.selectbox(
+            "Gender",
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab5"
         )
 
-    with c2:
-        gender_options = sorted(
-            df_master[gender_col]
-            .dropna()
-            .unique()
-        )
+    # -----------------------------
+    # APPLY FILTERS
+    # -----------------------------
+    df_filtered = df_perception.copy()
 
-        gender_tab_filter = st.multiselect(
-            "Filter by Gender",
-            gender_options,
-            default=gender_options
-        )
+    if age_filter != "All":
+        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
 
-    # -------------------------------------------------
-    # FILTERED DATA
-    # -------------------------------------------------
-    demo_df = df_master.copy()
+    if gender_filter != "All":
+        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
 
-    demo_df = demo_df[
-        demo_df["age_norm"].isin(age_tab_filter) &
-        demo_df[gender_col].isin(gender_tab_filter)
-    ]
+    # -----------------------------
+    # RESPONDENTS
+    # -----------------------------
+    respondents = weighted_size(df_filtered)
 
-    INVALID_AGES = {
-        "n/a",
-        "not responded",
-        "don't know",
-        "dont know",
-        ""
-    }
+    # -----------------------------
+    # HEADER
+    # -----------------------------
+    st.subheader("How consumers perceive GO DESi (Desi Popz)")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
-    demo_df = demo_df[
-        demo_df["age_norm"].notna() &
-        ~demo_df["age_norm"]
-            .astype(str)
-            .str.strip()
-            .str.lower()
-            .isin(INVALID_AGES)
-    ]
+    # -----------------------------
+    # AGGREGATION
+    # -----------------------------
+    perception_counts = (
+        weighted_value_counts(df_filtered["perception_norm"])
+        .reset_index()
+    )
 
-    responded_count = demo_df.shape[0]
+    perception_counts.columns = ["Perception", "Count"]
 
-    st.metric(
-        label="Responded to this question",
-        value=f"{responded_count}"
+    perception_counts["Pct"] = (
+        perception_counts["Count"] / respondents * 100
+        if respondents > 0 else 0
     )
 
-    if responded_count == 0:
-        st.warning("No responses available.")
-    else:
+    # -----------------------------
+    # CHART
+    # -----------------------------
+    chart = bar_chart_with_pct_labels(
+        df_counts=perception_counts,
+        y_col="Perception",
+        color=CHART_COLORS["perception"]
+    )
 
-        # -------------------------------------------------
-        # AGE COUNTS
-        # -------------------------------------------------
-        age_counts = (
-            demo_df["age_norm"]
-            .value_counts()
-            .reset_index()
-        )
+    st.vega_lite_chart(chart, use_container_width=True)
 
-        age_counts.columns = ["Age", "Count"]
+    st.caption("Note: Perception is multi-select, so totals can exceed 100%.")
 
-        age_counts["Pct"] = (
-            age_counts["Count"] / responded_count * 100
-        )
+    if model_label_caption(df_filtered, "perception_norm"):
+        st.caption(model_label_caption(df_filtered, "perception_norm"))
 
-        # Sort highest to lowest
-        age_counts = age_counts.sort_values(
-            "Count",
-            ascending=False
-        )
+# =====================================================
+# TAB 6 — MOTIVATION
+# =====================================================
+with tabs[5]:
 
-        # -------------------------------------------------
-        # PLOTLY BAR CHART
-        # -------------------------------------------------
-        fig = px.bar(
-            age_counts,
-            x="Pct",
-            y="Age",
-            orientation="h",
-            text="Pct",
-            color_discrete_sequence=[PALETTE[0]]
-        )
+    # -----------------------------
+    # FILTERS (normalized cols)
+    # -----------------------------
+    col1, col2 = st.columns(2)
 
-        fig.update_traces(
-            texttemplate="%{text:.1f}%",
-            textposition="outside",
-            cliponaxis=False,
-            width= 0.8
+    with col1:
+        age_filter = st.selectbox(
+            "Age",
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab6"
         )
 
-        fig.update_layout(
-            height=260,        # tighter canvas
-            bargap=0.01,       # almost no vertical gap
-            xaxis_title="% of Respondents",
-            yaxis_title="Age Group",
-            showlegend=False,
-            margin=dict(t=10, b=10, l=10, r=10)
+    with col2:
+        gender_filter = st.selectbox(
+            "Gender",
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab6"
         )
 
-        st.plotly_chart(fig, use_container_width=True)
-
-# =====================================================
-# TAB 2 — GENDER INSIGHTS
-# =====================================================
-
-with tabs[1]:
+    # -----------------------------
+    # APPLY FILTERS
+    # -----------------------------
+    df_filtered = df_motivation.copy()
 
-    st.subheader("Respondent Gender Profile")
+    if age_filter != "All":
+        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
 
-    # -------------------------------------------------
-    # BASE RESPONSES (DO NOT CHANGE WITH FILTERS)
-    # -------------------------------------------------
-    base_gender_df = df_master[
-        df_master["gender_norm"].isin(["Male", "Female"])
-    ]
+    if gender_filter != "All":
+        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
 
-    responded_count = base_gender_df.shape[0]
+    # -----------------------------
+    # RESPONDENTS
+    # -----------------------------
+    respondents = weighted_size(df_filtered)
 
-    st.markdown(
-        f"**Responded to this question – {responded_count}**"
-    )
+    # -----------------------------
+    # HEADER
+    # -----------------------------
+    st.subheader("Why consumers choose GO DESi")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
-    # -------------------------------------------------
-    # AGE FILTER (VISUAL ONLY)
-    # -------------------------------------------------
-    age_options = sorted(
-        df_master["age_norm"]
-        .dropna()
-        .unique()
+    # -----------------------------
+    # AGGREGATION
+    # -----------------------------
+    motivation_counts = (
+        weighted_value_counts(df_filtered["motivation_norm"])
+        .reset_index()
     )
 
-    default_ages = [a for a in age_options if a != "N/A"]
+    motivation_counts.columns = ["Motivation", "Count"]
 
-    selected_ages = st.multiselect(
-        "Filter by Age Group",
-        age_options,
-        default=default_ages
+    motivation_counts["Pct"] = (
+        motivation_counts["Count"] / respondents * 100
+        if respondents > 0 else 0
     )
 
-    # Filtered dataset for charts only
-    gender_df = base_gender_df[
-        base_gender_df["age_norm"].isin(selected_ages)
-    ]
-
-    col1, col2 = st.columns(2)
-
-    # =====================================================
-    # LEFT — GENDER DONUT (PLOTLY)
-    # =====================================================
-    with col1:
-
-        st.markdown("### Gender Distribution")
-
-        gender_counts = (
-            base_gender_df["gender_norm"]
-            .value_counts()
-            .reindex(["Female", "Male"], fill_value=0)
-            .reset_index()
-        )
-
-        gender_counts.columns = ["Gender", "Count"]
-
-        fig = px.pie(
-            gender_counts,
-            names="Gender",
-            values="Count",
-            hole=0.5,
-            color="Gender",
-            color_discrete_map={
-                "Female": PALETTE[1],
-                "Male": PALETTE[0]
-            }
-        )
-
-        fig.update_traces(
-            textposition="inside",
-            textinfo="percent",
-            insidetextfont=dict(size=16),
-        )
-
-        fig.update_layout(
-            height=350,
-            showlegend=True,
-            margin=dict(t=20, b=20, l=20, r=20)
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-
-    # =====================================================
-    # RIGHT — AGE-WISE GENDER SPLIT (PLOTLY)
-    # =====================================================
-    with col2:
-
-        st.markdown("### Age-wise Gender Split")
+    # -----------------------------
+    # CHART
+    # -----------------------------
+    chart = bar_chart_with_pct_labels(
+        df_counts=motivation_counts,
+        y_col="Motivation",
+        color=CHART_COLORS["motivation"]
+    )
 
-        # Force all combinations (so 0% shows)
-        full_index = pd.MultiIndex.from_product(
-            [selected_ages, ["Female", "Male"]],
-            names=["age_norm", "gender_norm"]
-        )
+    st.vega_lite_chart(chart, use_container_width=True)
 
-        age_gender_df = (
-            gender_df
-            .groupby(["age_norm", "gender_norm"])
-            .size()
-            .reindex(full_index, fill_value=0)
-            .reset_index(name="Count")
-        )
+    # -----------------------------
+    # HEATMAP (AGE vs MOTIVATION)
+    # -----------------------------
+    st.markdown("---")
+    st.subheader("Age Group vs Purchase Motivation")
 
-        age_gender_df["Pct"] = (
-            age_gender_df["Count"] / responded_count * 100
-        )
+    heat_df, heat_sig = age_crosstab(
+        with_weight(df_filtered[["age_norm", "motivation_norm"]]), "motivation_norm", respondents,
+        multi_select=True
+    )
 
-        fig = px.bar(
-            age_gender_df,
-            x="age_norm",
-            y="Pct",
-            color="gender_norm",
-            barmode="group",
-            category_orders={"age_norm": selected_ages},
-            color_discrete_map={
-                "Female": PALETTE[1],
-                "Male": PALETTE[0]
-            }
-        )
+    heatmap = significance_heatmap(heat_df, "motivation_norm", "Motivation")
 
-        fig.update_traces(
-            texttemplate="%{y:.1f}%",
-            textposition="outside",
-            cliponaxis=False
-        )
+    st.vega_lite_chart(heatmap, use_container_width=True)
 
-        fig.update_layout(
-            height=450,
-            yaxis_title="% of Respondents",
-            xaxis_title="Age Group",
-            legend_title="Gender",
-            margin=dict(t=20, b=20, l=20, r=20)
-        )
+    st.caption(significance_caption(heat_sig))
+
+    st.caption("Note: Motivation is multi-select, so totals can exceed 100%.")
 
-        st.plotly_chart(fig, use_container_width=True)
+    if model_label_caption(df_filtered, "motivation_norm"):
+        st.caption(model_label_caption(df_filtered, "motivation_norm"))
 
 # =====================================================
-# TAB 3 — DISCOVERY
+# TAB 7 — SWEETS AWARENESS
 # =====================================================
-with tabs[2]:
+with tabs[6]:
 
     # -----------------------------
-    # FILTERS
+    # FILTERS (normalized cols)
     # -----------------------------
     col1, col2 = st.columns(2)
 
     with col1:
         age_filter = st.selectbox(
             "Age",
-            ["All"] + sorted(df["age"].dropna().unique().tolist())
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab7"
         )
 
     with col2:
         gender_filter = st.selectbox(
             "Gender",
-            ["All"] + sorted(df["gender"].dropna().unique().tolist())
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab7"
         )
 
     # -----------------------------
     # APPLY FILTERS
     # -----------------------------
-    df_disc_filtered = df_disc.copy()
+    df_filtered = df_brand.copy()
 
     if age_filter != "All":
-        df_disc_filtered = df_disc_filtered[df_disc_filtered["age"] == age_filter]
+        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
 
     if gender_filter != "All":
-        df_disc_filtered = df_disc_filtered[df_disc_filtered["gender"] == gender_filter]
+        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
 
     # -----------------------------
     # RESPONDENTS
     # -----------------------------
-    respondents = df_disc_filtered.shape[0]
+    respondents = weighted_size(df_filtered)
 
     # -----------------------------
-    # HEADER (same as Gender tab)
+    # HEADER
     # -----------------------------
-    st.subheader("How customers discovered GO DESi")
-    st.caption(f"Respondents: {respondents}")
+    st.subheader("Other packaged Indian sweet brands consumers are aware of")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
     # -----------------------------
     # AGGREGATION
     # -----------------------------
-    disc_counts = df_disc_filtered["discovery_norm"].value_counts().reset_index()
-    disc_counts.columns = ["Channel", "Count"]
+    awareness_counts = (
+        weighted_value_counts(df_filtered["brand_awareness_norm"])
+        .reset_index()
+    )
 
-    if respondents > 0:
-        disc_counts["Pct"] = (disc_counts["Count"] / respondents) * 100
-    else:
-        disc_counts["Pct"] = 0
+    awareness_counts.columns = ["Brand", "Count"]
+
+    awareness_counts["Pct"] = (
+        awareness_counts["Count"] / respondents * 100
+        if respondents > 0 else 0
+    )
 
     # -----------------------------
     # CHART
     # -----------------------------
     chart = bar_chart_with_pct_labels(
-        df_counts=disc_counts,
-        y_col="Channel",
-        color=PALETTE[1]
+        df_counts=awareness_counts,
+        y_col="Brand",
+        color=CHART_COLORS["brand_awareness"]
     )
 
-    st.altair_chart(chart, use_container_width=True)
+    st.vega_lite_chart(chart, use_container_width=True)
 
-    st.caption("Note: Discovery is multi-select, so totals can exceed 100%.")
+    st.caption("Note: Awareness is multi-select, so totals can exceed 100%.")
+
+    # -----------------------------
+    # CO-RECALL (COLUMN M BITMASKS)
+    # -----------------------------
+    st.markdown("---")
+    st.subheader("Brands recalled together (Top 3 spontaneous recall)")
+
+    recall_bits = load_multiselect_bits(dataset_ver, include_model_labels)["top_3_packaged_brands"]
+    recall_rows = segment_rows(age_filter, gender_filter)
+
+    co_recall = recall_bits.cooccurrence(recall_rows, matrix_weights)
+    recall_respondents = recall_bits.respondents_answered(recall_rows, matrix_weights)
+
+    st.caption(f"Respondents: {recall_respondents:.0f}")
+
+    co_df = (
+        co_recall
+        .rename_axis("Brand A")
+        .reset_index()
+        .melt(id_vars="Brand A", var_name="Brand B", value_name="Count")
+    )
+    co_df = co_df[co_df["Count"] > 0]
+
+    co_df["Pct"] = (
+        co_df["Count"] / recall_respondents * 100
+        if recall_respondents > 0 else 0
+    )
+
+    co_heatmap = alt.Chart(chart_frame(co_df, ["Brand A", "Brand B", "Count", "Pct"])).mark_rect().encode(
+        x=alt.X("Brand B:N", title=None),
+        y=alt.Y("Brand A:N", title=None),
+        color=alt.Color("Count:Q", scale=alt.Scale(scheme="tealblues")),
+        tooltip=["Brand A", "Brand B", "Count", alt.Tooltip("Pct:Q", format=".1f")]
+    )
+
+    st.altair_chart(co_heatmap, use_container_width=True)
+
+    st.caption("Diagonal = respondents recalling the brand; off-diagonal = recalled together.")
 
 # =====================================================
-# TAB 3 — DISCOVERY
+# TAB 8 — SWEETS PREFERENCE
 # =====================================================
-with tabs[2]:
+with tabs[7]:
 
-    # Filters
+    # -----------------------------
+    # FILTERS (normalized cols)
+    # -----------------------------
     col1, col2 = st.columns(2)
 
     with col1:
         age_filter = st.selectbox(
             "Age",
-            ["All"] + sorted(df_disc["age"].dropna().unique()),
-            key="age_tab3"
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab8"
         )
 
     with col2:
         gender_filter = st.selectbox(
             "Gender",
-            ["All"] + sorted(df_disc["gender"].dropna().unique()),
-            key="gender_tab3"
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab8"
         )
 
-    # Apply filters
-    df_filtered = df_disc.copy()
+    # -----------------------------
+    # APPLY FILTERS
+    # -----------------------------
+    df_filtered = df_pref.copy()
 
     if age_filter != "All":
-        df_filtered = df_filtered[df_filtered["age"] == age_filter]
+        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
 
     if gender_filter != "All":
-        df_filtered = df_filtered[df_filtered["gender"] == gender_filter]
+        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
 
-    # Respondents
-    respondents = df_filtered.shape[0]
+    # -----------------------------
+    # RESPONDENTS
+    # -----------------------------
+    respondents = weighted_size(df_filtered)
 
-    # Header
-    st.subheader("How customers discovered GO DESi")
-    st.caption(f"Respondents: {respondents}")
+    # -----------------------------
+    # HEADER
+    # -----------------------------
+    st.subheader("Preferred packaged Indian sweets brand")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
-    # Aggregation
-    disc_counts = df_filtered["discovery_norm"].value_counts().reset_index()
-    disc_counts.columns = ["Channel", "Count"]
+    # -----------------------------
+    # AGGREGATION
+    # -----------------------------
+    pref_counts = (
+        weighted_value_counts(df_filtered["preferred_brand_norm"])
+        .reset_index()
+    )
 
-    disc_counts["Pct"] = (disc_counts["Count"] / respondents) * 100 if respondents > 0 else 0
+    pref_counts.columns = ["Brand", "Count"]
 
-    # Chart
-    chart = bar_chart_with_pct_labels(
-        df_counts=disc_counts,
-        y_col="Channel",
-        color=PALETTE[1]
+    pref_counts["Pct"] = (
+        pref_counts["Count"] / respondents * 100
+        if respondents > 0 else 0
     )
 
-    st.altair_chart(chart, use_container_width=True)
+    # -----------------------------
+    # CHART
+    # -----------------------------
+    chart = bar_chart_with_pct_labels(
+        df_counts=pref_counts,
+        y_col="Brand",
+        color=CHART_COLORS["brand_preference"]
+    )
 
-    st.caption("Note: Discovery is multi-select, so totals can exceed 100%.")
+    st.vega_lite_chart(chart, use_container_width=True)
 
 # =====================================================
-# TAB 4 — CONSUMPTION
+# TAB 9 — BRAND LINKAGE
 # =====================================================
-with tabs[3]:
+with tabs[8]:
 
     # -----------------------------
-    # FILTERS (use df_master)
+    # FILTERS (normalized cols)
     # -----------------------------
     col1, col2 = st.columns(2)
 
@@ -1427,173 +1462,286 @@ with tabs[3]:
         age_filter = st.selectbox(
             "Age",
             ["All"] + sorted(df_master["age_norm"].dropna().unique()),
-            key="age_tab4"
+            key="age_tab9"
         )
 
     with col2:
         gender_filter = st.selectbox(
             "Gender",
             ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
-            key="gender_tab4"
+            key="gender_tab9"
         )
 
     # -----------------------------
     # APPLY FILTERS
     # -----------------------------
-    df_freq_f = df_freq.copy()
-    df_occ_f = df_occ.copy()
+    df_filtered = df_linkage.copy()
 
     if age_filter != "All":
-        df_freq_f = df_freq_f[df_freq_f["age_norm"] == age_filter]
-        df_occ_f = df_occ_f[df_occ_f["age_norm"] == age_filter]
+        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
 
     if gender_filter != "All":
-        df_freq_f = df_freq_f[df_freq_f["gender_norm"] == gender_filter]
-        df_occ_f = df_occ_f[df_occ_f["gender_norm"] == gender_filter]
+        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
 
     # -----------------------------
-    # RESPONDENTS (base = freq)
+    # RESPONDENTS
     # -----------------------------
-    respondents = df_freq_f.shape[0]
-
-    st.subheader("Packaged Sweets Consumption Behaviour")
-    st.caption(f"Respondents: {respondents}")
+    respondents = weighted_size(df_filtered)
 
     # -----------------------------
-    # FREQUENCY
+    # HEADER
     # -----------------------------
-    freq_counts = df_freq_f["consumption_frequency_norm"].value_counts().reset_index()
-    freq_counts.columns = ["Frequency", "Count"]
-    freq_counts["Pct"] = (freq_counts["Count"] / respondents) * 100 if respondents > 0 else 0
-
-    chart1 = bar_chart_with_pct_labels(freq_counts, "Frequency", color=PALETTE[2])
+    st.subheader("Awareness of GO DESi’s Indian sweets portfolio")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
     # -----------------------------
-    # OCCASION (multi-select)
+    # AGGREGATION
     # -----------------------------
-    occ_counts = df_occ_f["occasion_norm"].value_counts().reset_index()
-    occ_counts.columns = ["Occasion", "Count"]
-    occ_counts["Pct"] = (occ_counts["Count"] / respondents) * 100 if respondents > 0 else 0
+    linkage_counts = (
+        weighted_value_counts(df_filtered[linkage_col])
+        .reset_index()
+    )
+
+    linkage_counts.columns = ["Response", "Count"]
 
-    chart2 = bar_chart_with_pct_labels(occ_counts, "Occasion", color=PALETTE[3])
+    linkage_counts["Pct"] = (
+        linkage_counts["Count"] / respondents * 100
+        if respondents > 0 else 0
+    )
 
     # -----------------------------
-    # LAYOUT
+    # CHART
     # -----------------------------
-    c1, c2 = st.columns(2)
-
-    with c1:
-        st.markdown("#### How often consumers eat packaged sweets")
-        st.altair_chart(chart1, use_container_width=True)
+    chart = bar_chart_with_pct_labels(
+        df_counts=linkage_counts,
+        y_col="Response",
+        color=CHART_COLORS["brand_linkage"]
+    )
 
-    with c2:
-        st.markdown("#### When consumers eat packaged sweets")
-        st.altair_chart(chart2, use_container_width=True)
+    st.vega_lite_chart(chart, use_container_width=True)
 
     # -----------------------------
-    # HEATMAP
+    # SUMMARY INSIGHT
     # -----------------------------
+    yes_count = weighted_size(df_filtered[df_filtered[linkage_col] == "Yes"])
+    no_count = weighted_size(df_filtered[df_filtered[linkage_col] == "No"])
+    total = yes_count + no_count
+
+    pct_yes = round((yes_count / total) * 100, 1) if total > 0 else 0
+
     st.markdown("---")
-    st.subheader("Age Group vs Consumption Context")
+    st.markdown(
+        f"**{pct_yes}%** of respondents know that **GO DESi also makes Indian sweets** "
+        f"(Yes: {fmt_n(yes_count)}, No: {fmt_n(no_count)})"
+    )
+
+# =====================================================
+# TAB 10 — ASSOCIATIONS
+# =====================================================
+@st.cache_data
+def load_associations(version, model_labels):
+    """
+    Cramér's V for every question pair + clustered order (per dataset
+    version and classifier-label setting).
+    """
+    assoc = load_association(dataset_path, model_labels)
+    return assoc, cluster_order(assoc)
 
-    heat_df = (
-        df_occ_f.groupby(["age_norm", "occasion_norm"])
-        .size()
-        .reset_index(name="Count")
+with tabs[9]:
+
+    st.subheader("Which survey questions relate to each other")
+    unweighted_note("Associations are")
+
+    assoc, assoc_order = load_associations(dataset_ver, include_model_labels)
+
+    assoc_df = (
+        assoc
+        .rename_axis("Question A")
+        .reset_index()
+        .melt(id_vars="Question A", var_name="Question B", value_name="V")
     )
 
-    heat_df["Pct"] = (heat_df["Count"] / respondents) * 100 if respondents > 0 else 0
+    base = alt.Chart(chart_frame(assoc_df, ["Question A", "Question B", "V"])).encode(
+        x=alt.X("Question B:N", sort=assoc_order, title=None),
+        y=alt.Y("Question A:N", sort=assoc_order, title=None)
+    )
 
-    heatmap = alt.Chart(heat_df).mark_rect().encode(
-        x=alt.X("occasion_norm:N", title="Consumption Moment"),
-        y=alt.Y("age_norm:N", title="Age Group"),
-        color=alt.Color("Pct:Q", scale=alt.Scale(scheme="tealblues")),
-        tooltip=["age_norm", "occasion_norm", "Pct", "Count"]
+    rects = base.mark_rect().encode(
+        color=alt.Color("V:Q", scale=alt.Scale(scheme="tealblues", domain=[0, 1]),
+                        title="Cramér's V"),
+        tooltip=["Question A", "Question B", alt.Tooltip("V:Q", format=".2f")]
     )
 
-    st.altair_chart(heatmap, use_container_width=True)
+    labels = base.mark_text(fontSize=10, color="white").encode(
+        text=alt.Text("V:Q", format=".2f")
+    )
 
-    st.caption("Note: Multi-select responses may exceed 100%.")
+    st.altair_chart((rects + labels).properties(height=550), use_container_width=True)
+
+    st.caption(
+        "Bias-corrected Cramér's V (0 = unrelated, 1 = fully determined). "
+        "Questions are ordered by hierarchical clustering so related ones sit together. "
+        "Tables count respondents: a multi-select question is compared answer by answer "
+        "(picked vs not), averaged over its answers."
+    )
 
 # =====================================================
-# TAB 5 — PERCEPTION
+# TAB 11 — SEGMENT BUILDER
 # =====================================================
-with tabs[4]:
+with tabs[10]:
+
+    st.subheader("Build a segment from any combination of answers")
+
+    seg_index = load_segment_index(dataset_ver, include_model_labels)
+
+    if "segment_predicates" not in st.session_state:
+        st.session_state["segment_predicates"] = []
 
     # -----------------------------
-    # FILTERS (use normalized cols)
+    # PREDICATE INPUT
     # -----------------------------
-    col1, col2 = st.columns(2)
+    c1, c2, c3 = st.columns([2, 3, 1])
 
-    with col1:
-        age_filter = st.selectbox(
-            "Age",
-            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
-            key="age_tab5"
+    with c1:
+        seg_question = st.selectbox(
+            "Question",
+            onehot.questions,
+            format_func=question_label,
+            key="seg_question"
         )
 
-    with col2:
-        gender_filter = st.selectbox(
-            "Gender",
-            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
-            key="gender_tab5"
+    with c2:
+        seg_answers = st.multiselect(
+            "Answer is any of",
+            onehot.answers(seg_question),
+            key="seg_answers"
         )
 
-    # -----------------------------
-    # APPLY FILTERS
-    # -----------------------------
-    df_filtered = df_perception.copy()
+    with c3:
+        seg_exclude = st.checkbox("Exclude", key="seg_exclude")
 
-    if age_filter != "All":
-        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
+    b1, b2 = st.columns(2)
 
-    if gender_filter != "All":
-        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
+    with b1:
+        if st.button("Add condition", disabled=not seg_answers):
+            st.session_state["segment_predicates"].append(
+                (seg_question, list(seg_answers), seg_exclude)
+            )
+
+    with b2:
+        if st.button("Clear segment"):
+            st.session_state["segment_predicates"] = []
+
+    # conditions are kept across wave switches; answers this wave does not
+    # have are left out (and match no one) until another wave is picked
+    predicates, dropped = seg_index.known(st.session_state["segment_predicates"])
+
+    if dropped:
+        st.warning(
+            f"No respondent in {selected_wave} gave these answers, so they match no one here: "
+            + ", ".join(f"{question_label(q)} = {a}" for q, a in dropped)
+        )
+
+    if predicates:
+        st.markdown("\n".join(
+            f"- {question_label(q)} {'is not' if ex else 'is'} {' / '.join(a) or '(none in this wave)'}"
+            for q, a, ex in predicates
+        ))
+    else:
+        st.caption("No conditions yet — showing all respondents.")
 
     # -----------------------------
-    # RESPONDENTS
+    # EVALUATE (BITMAP INTERSECTION)
     # -----------------------------
-    respondents = df_filtered.shape[0]
+    t0 = time.perf_counter()
+    seg_bitmap = seg_index.segment(predicates)
+    seg_dist = seg_index.distributions(seg_bitmap, matrix_weights)
+    seg_ms = (time.perf_counter() - t0) * 1000
+
+    st.metric(
+        label="Respondents in segment",
+        value=f"{seg_index.size(seg_bitmap)}"
+    )
+    st.caption(f"Evaluated in {seg_ms:.1f} ms")
 
     # -----------------------------
-    # HEADER
+    # EVERY QUESTION'S DISTRIBUTION
     # -----------------------------
-    st.subheader("How consumers perceive GO DESi (Desi Popz)")
-    st.caption(f"Respondents: {respondents}")
+    seg_questions = [q for q in onehot.questions if seg_dist.loc[seg_dist["question"] == q, "Count"].sum() > 0]
+
+    for i in range(0, len(seg_questions), 2):
+        cols_pair = st.columns(2)
+
+        for col, q in zip(cols_pair, seg_questions[i:i + 2]):
+            q_counts = (
+                seg_dist[(seg_dist["question"] == q) & (seg_dist["Count"] > 0)]
+                .rename(columns={"answer": "Answer"})
+                .sort_values("Count", ascending=False)
+            )
+
+            with col:
+                st.markdown(f"#### {question_label(q)}")
+                st.caption(f"Respondents: {q_counts['Base'].iloc[0]:.0f}")
+                st.vega_lite_chart(
+                    bar_chart_with_pct_labels(q_counts[["Answer", "Count", "Pct"]], "Answer", color=CHART_COLORS["segment"]),
+                    use_container_width=True
+                )
+
+# =====================================================
+# TAB 12 — CONSUMER JOURNEY
+# =====================================================
+with tabs[11]:
 
     # -----------------------------
-    # AGGREGATION
+    # FILTERS (normalized cols)
     # -----------------------------
-    perception_counts = (
-        df_filtered["perception_norm"]
-        .value_counts()
-        .reset_index()
-    )
+    col1, col2 = st.columns(2)
 
-    perception_counts.columns = ["Perception", "Count"]
+    with col1:
+        age_filter = st.selectbox(
+            "Age",
+            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
+            key="age_tab12"
+        )
 
-    perception_counts["Pct"] = (
-        perception_counts["Count"] / respondents * 100
-        if respondents > 0 else 0
-    )
+    with col2:
+        gender_filter = st.selectbox(
+            "Gender",
+            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
+            key="gender_tab12"
+        )
 
     # -----------------------------
-    # CHART
+    # FUNNEL (STAGE CODES PER RESPONDENT)
     # -----------------------------
-    chart = bar_chart_with_pct_labels(
-        df_counts=perception_counts,
-        y_col="Perception",
-        color=PALETTE[4]
+    journey_stages = load_journey_stages(dataset_ver, include_model_labels)
+    funnel_df = funnel_counts(
+        journey_stages, segment_rows(age_filter, gender_filter), matrix_weights
     )
 
-    st.altair_chart(chart, use_container_width=True)
+    st.subheader("GO DESi Consumer Journey Funnel")
+    st.caption(f"Respondents: {fmt_n(funnel_df['Count'].iloc[0])}")
 
-    st.caption("Note: Perception is multi-select, so totals can exceed 100%.")
+    st.plotly_chart(journey_funnel_figure(funnel_df), use_container_width=True)
+
+    st.caption(
+        "Discovery = named a discovery channel · Trial = reported eat frequency · "
+        "Habit = eats at least weekly · "
+        "Advocacy = prefers GO DESi, shares it socially or buys it as a gift."
+    )
 
 # =====================================================
-# TAB 6 — MOTIVATION
+# TAB 13 — BRAND FUNNEL
 # =====================================================
-with tabs[5]:
+@st.cache_data
+def brand_funnel_for_segment(version, model_labels, age_filter, gender_filter, weights_key):
+    """
+    Aware → recalled → preferred for every brand (cached per segment,
+    classifier-label setting and weighting: weights_key is None when unweighted).
+    """
+    return brand_funnel(onehot, segment_rows(age_filter, gender_filter), matrix_weights)
+
+with tabs[12]:
 
     # -----------------------------
     # FILTERS (normalized cols)
@@ -1604,326 +1752,535 @@ with tabs[5]:
         age_filter = st.selectbox(
             "Age",
             ["All"] + sorted(df_master["age_norm"].dropna().unique()),
-            key="age_tab6"
+            key="age_tab13"
         )
 
     with col2:
         gender_filter = st.selectbox(
             "Gender",
             ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
-            key="gender_tab6"
+            key="gender_tab13"
         )
 
-    # -----------------------------
-    # APPLY FILTERS
-    # -----------------------------
-    df_filtered = df_motivation.copy()
+    funnel_table = brand_funnel_for_segment(
+        dataset_ver, include_model_labels, age_filter, gender_filter,
+        targets_key(weight_targets) if weighted else None
+    )
 
-    if age_filter != "All":
-        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
+    st.subheader("Brand conversion: aware → recalled → preferred")
 
-    if gender_filter != "All":
-        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
+    brand_options = funnel_table["Brand"].tolist()
 
-    # -----------------------------
-    # RESPONDENTS
-    # -----------------------------
-    respondents = df_filtered.shape[0]
+    selected_brands = st.multiselect(
+        "Brands",
+        brand_options,
+        default=[b for b in BENCHMARK_BRANDS if b in brand_options],
+        key="brands_tab13"
+    )
 
     # -----------------------------
-    # HEADER
+    # CHART (STAGE COUNTS PER BRAND)
     # -----------------------------
-    st.subheader("Why consumers choose GO DESi")
-    st.caption(f"Respondents: {respondents}")
+    stage_df = (
+        funnel_table[funnel_table["Brand"].isin(selected_brands)]
+        .melt(
+            id_vars="Brand",
+            value_vars=["Aware", "Recalled", "Preferred"],
+            var_name="Stage",
+            value_name="Count"
+        )
+    )
+
+    chart = alt.Chart(stage_df).mark_bar().encode(
+        x=alt.X("Brand:N", sort=selected_brands, title=None),
+        xOffset=alt.XOffset("Stage:N", sort=["Aware", "Recalled", "Preferred"]),
+        y=alt.Y("Count:Q", title="Respondents"),
+        color=alt.Color(
+            "Stage:N",
+            sort=["Aware", "Recalled", "Preferred"],
+            scale=alt.Scale(range=BRAND_STAGE_COLORS)
+        ),
+        tooltip=["Brand", "Stage", "Count"]
+    )
+
+    st.altair_chart(chart, use_container_width=True)
 
     # -----------------------------
-    # AGGREGATION
+    # TABLE (ALL BRANDS)
     # -----------------------------
-    motivation_counts = (
-        df_filtered["motivation_norm"]
-        .value_counts()
-        .reset_index()
+    st.dataframe(
+        funnel_table.style.format({
+            "Aware → Recalled %": "{:.1f}",
+            "Aware → Preferred %": "{:.1f}",
+            "Recalled → Preferred %": "{:.1f}",
+        }),
+        use_container_width=True,
+        hide_index=True
     )
 
-    motivation_counts.columns = ["Motivation", "Count"]
+    st.caption(
+        "Aware = named the brand in Column L, M or N · Recalled = spontaneous top 3 (M) · "
+        "Preferred = preferred brand (N)."
+    )
 
-    motivation_counts["Pct"] = (
-        motivation_counts["Count"] / respondents * 100
-        if respondents > 0 else 0
+# =====================================================
+# TAB 14 — WAVES
+# =====================================================
+with tabs[13]:
+
+    st.subheader("Wave-over-wave comparison")
+    unweighted_note("Wave aggregates are")
+    st.caption("Waves: " + " → ".join(wave_store.names))
+
+    wave_question = st.selectbox(
+        "Question",
+        [q for q in onehot.questions if q not in ("age", "gender")],
+        format_func=question_label,
+        key="question_tab14"
     )
 
+    wave_deltas = wave_store.deltas(wave_question, include_model_labels)
+
     # -----------------------------
-    # CHART
+    # CHART (% PER WAVE)
     # -----------------------------
-    chart = bar_chart_with_pct_labels(
-        df_counts=motivation_counts,
-        y_col="Motivation",
-        color=PALETTE[2]
+    wave_pct = wave_deltas.melt(
+        id_vars="answer",
+        value_vars=wave_store.names,
+        var_name="Wave",
+        value_name="Pct"
+    )
+
+    chart = alt.Chart(wave_pct).mark_bar().encode(
+        y=alt.Y("answer:N", title=None),
+        yOffset=alt.YOffset("Wave:N", sort=wave_store.names),
+        x=alt.X("Pct:Q", title="% of respondents answering"),
+        color=alt.Color("Wave:N", sort=wave_store.names, scale=alt.Scale(range=PALETTE)),
+        tooltip=["answer", "Wave", alt.Tooltip("Pct:Q", format=".1f")]
     )
 
     st.altair_chart(chart, use_container_width=True)
 
     # -----------------------------
-    # HEATMAP (AGE vs MOTIVATION)
+    # DELTAS (PERCENTAGE POINTS)
     # -----------------------------
-    st.markdown("---")
-    st.subheader("Age Group vs Purchase Motivation")
+    delta_cols = [c for c in wave_deltas.columns if c.startswith("Δ ")]
 
-    heat_df = (
-        df_filtered
-        .groupby(["age_norm", "motivation_norm"])
-        .size()
-        .reset_index(name="Count")
+    st.dataframe(
+        wave_deltas.drop(columns="question").style.format(
+            {c: "{:.1f}" for c in wave_store.names + delta_cols}
+        ),
+        use_container_width=True,
+        hide_index=True
     )
 
-    heat_df["Pct"] = (
-        heat_df["Count"] / respondents * 100
-        if respondents > 0 else 0
-    )
+    st.caption("Δ = percentage-point change vs the previous wave (from per-wave aggregates).")
 
-    heatmap = alt.Chart(heat_df).mark_rect().encode(
-        x=alt.X("motivation_norm:N", title="Motivation"),
-        y=alt.Y("age_norm:N", title="Age Group"),
-        color=alt.Color("Pct:Q", scale=alt.Scale(scheme="tealblues")),
-        tooltip=["age_norm", "motivation_norm", "Pct", "Count"]
+# =====================================================
+# TAB 15 — WHAT CHANGED
+# =====================================================
+@st.cache_data
+def what_changed(wave_a, version_a, wave_b, version_b, alpha, model_labels):
+    """
+    Two-proportion z-tests for every answer (cached per wave pair and
+    classifier-label setting).
+    """
+    return compare_waves(wave_store, wave_a, wave_b, alpha, model_labels)
+
+with tabs[14]:
+
+    st.subheader("What changed between two waves or two segments")
+    unweighted_note("Tests are")
+
+    compare_mode = st.radio(
+        "Compare",
+        ["Waves", "Segment vs rest"],
+        horizontal=True,
+        key="mode_tab15"
     )
 
-    st.altair_chart(heatmap, use_container_width=True)
+    col1, col2, col3 = st.columns(3)
 
-    st.caption("Note: Motivation is multi-select, so totals can exceed 100%.")
+    with col3:
+        change_alpha = st.selectbox("Significance level", [0.05, 0.01, 0.1], key="alpha_tab15")
+
+    comparison = None
+
+    if compare_mode == "Waves":
+        with col1:
+            wave_a = st.selectbox("From wave", wave_store.names, index=0, key="wave_a_tab15")
+
+        with col2:
+            wave_b = st.selectbox(
+                "To wave",
+                wave_store.names,
+                index=wave_store.names.index(selected_wave),
+                key="wave_b_tab15"
+            )
+
+        label_a, label_b = wave_a, wave_b
+
+        if wave_a == wave_b:
+            st.warning("Pick two different waves.")
+        else:
+            comparison = what_changed(
+                wave_a, wave_store.waves[wave_a]["version"],
+                wave_b, wave_store.waves[wave_b]["version"],
+                change_alpha, include_model_labels
+            )
+        base_note = "base = respondents who answered the question in each wave"
+    else:
+        # the Segment Builder's segment against everyone else in the selected wave
+        label_a, label_b = "Rest of wave", "Segment"
+        seg_size = seg_index.size(seg_bitmap)
+
+        st.caption(
+            f"Segment Builder segment ({seg_size} respondents) vs the other "
+            f"{seg_index.size(seg_index.rest(seg_bitmap))} respondents of {selected_wave}."
+        )
+
+        if not predicates:
+            st.info("Add conditions in the Segment Builder tab to define a segment.")
+        elif seg_size == 0 or seg_size == seg_index.n:
+            st.warning("The segment must contain some, but not all, respondents.")
+        else:
+            comparison = compare_aggregates(
+                seg_index.distributions(seg_index.rest(seg_bitmap)),
+                seg_index.distributions(seg_bitmap),
+                change_alpha
+            )
+        base_note = "base = respondents who answered the question in each group"
+
+    if comparison is not None:
+        movers = top_movers(comparison, top=25).copy()
+
+        st.caption(
+            f"Answers compared: {len(comparison)} · "
+            f"significant movers: {int(comparison['Significant'].sum())}"
+        )
+
+        if movers.empty:
+            st.info("No significant changes at this level.")
+        else:
+            movers["Label"] = movers["question"].map(question_label) + " — " + movers["answer"]
+            movers["Direction"] = np.where(movers["Delta"] > 0, "Up", "Down")
+
+            movers = chart_frame(movers, ["Label", "Direction", "Delta", "Pct A", "Pct B", "p"])
+
+            chart = alt.Chart(movers).mark_bar().encode(
+                x=alt.X("Delta:Q", title="Change (percentage points)"),
+                y=alt.Y("Label:N", sort=None, title=None),
+                color=alt.Color(
+                    "Direction:N",
+                    scale=alt.Scale(domain=["Up", "Down"], range=[PALETTE[3], PALETTE[4]]),
+                    legend=None
+                ),
+                tooltip=[
+                    "Label",
+                    alt.Tooltip("Pct A:Q", format=".1f", title=label_a),
+                    alt.Tooltip("Pct B:Q", format=".1f", title=label_b),
+                    alt.Tooltip("Delta:Q", format="+.1f"),
+                    alt.Tooltip("p:Q", format=".3g")
+                ]
+            )
+
+            st.altair_chart(chart, use_container_width=True)
+
+        st.dataframe(
+            comparison.style.format({
+                "Pct A": "{:.1f}", "Pct B": "{:.1f}", "Delta": "{:+.1f}",
+                "z": "{:.2f}", "p": "{:.3g}"
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        st.caption(f"A = {label_a}, B = {label_b}. Two-proportion z-test per answer; {base_note}.")
 
 # =====================================================
-# TAB 7 — SWEETS AWARENESS
+# TAB 16 — RECENCY (COLUMN D TENURE)
 # =====================================================
-with tabs[6]:
+with tabs[15]:
 
     # -----------------------------
     # FILTERS (normalized cols)
     # -----------------------------
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
 
     with col1:
         age_filter = st.selectbox(
             "Age",
             ["All"] + sorted(df_master["age_norm"].dropna().unique()),
-            key="age_tab7"
+            key="age_tab16"
         )
 
     with col2:
         gender_filter = st.selectbox(
             "Gender",
             ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
-            key="gender_tab7"
+            key="gender_tab16"
         )
 
-    # -----------------------------
-    # APPLY FILTERS
-    # -----------------------------
-    df_filtered = df_brand.copy()
+    tenure_options = [b for b, _ in TENURE_BUCKETS if b in set(df_master["tenure_norm"].dropna())]
 
-    if age_filter != "All":
-        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
+    with col3:
+        tenure_filter = st.multiselect(
+            "First heard",
+            tenure_options,
+            default=tenure_options,
+            key="tenure_tab16"
+        )
 
-    if gender_filter != "All":
-        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
+    def recency_filter(frame):
+        frame = frame[frame["tenure_norm"].isin(tenure_filter)]
+
+        if age_filter != "All":
+            frame = frame[frame["age_norm"] == age_filter]
+
+        if gender_filter != "All":
+            frame = frame[frame["gender_norm"] == gender_filter]
+
+        return frame
+
+    df_tenure_f = recency_filter(df_master)
 
     # -----------------------------
     # RESPONDENTS
     # -----------------------------
-    respondents = df_filtered.shape[0]
+    respondents = weighted_size(df_tenure_f)
 
-    # -----------------------------
-    # HEADER
-    # -----------------------------
-    st.subheader("Other packaged Indian sweet brands consumers are aware of")
-    st.caption(f"Respondents: {respondents}")
+    st.subheader("When customers first heard about GO DESi")
+    st.caption(f"Respondents: {fmt_n(respondents)}")
 
     # -----------------------------
-    # AGGREGATION
+    # TENURE DISTRIBUTION
     # -----------------------------
-    awareness_counts = (
-        df_filtered["brand_awareness_norm"]
-        .value_counts()
+    tenure_counts = (
+        weighted_value_counts(df_tenure_f["tenure_norm"])
+        .reindex(tenure_filter, fill_value=0)
         .reset_index()
     )
 
-    awareness_counts.columns = ["Brand", "Count"]
+    tenure_counts.columns = ["Tenure", "Count"]
 
-    awareness_counts["Pct"] = (
-        awareness_counts["Count"] / respondents * 100
+    tenure_counts["Pct"] = (
+        tenure_counts["Count"] / respondents * 100
         if respondents > 0 else 0
     )
 
-    # -----------------------------
-    # CHART
-    # -----------------------------
     chart = bar_chart_with_pct_labels(
-        df_counts=awareness_counts,
-        y_col="Brand",
-        color=PALETTE[3]
+        df_counts=tenure_counts,
+        y_col="Tenure",
+        color=CHART_COLORS["tenure"]
     )
 
-    st.altair_chart(chart, use_container_width=True)
-
-    st.caption("Note: Awareness is multi-select, so totals can exceed 100%.")
-
-# =====================================================
-# TAB 8 — SWEETS PREFERENCE
-# =====================================================
-with tabs[7]:
+    st.vega_lite_chart(chart, use_container_width=True)
 
     # -----------------------------
-    # FILTERS (normalized cols)
+    # HEATMAPS (TENURE vs DISCOVERY / FREQUENCY)
     # -----------------------------
-    col1, col2 = st.columns(2)
-
-    with col1:
-        age_filter = st.selectbox(
-            "Age",
-            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
-            key="age_tab8"
-        )
+    st.markdown("---")
+    st.subheader("Discovery channel by tenure")
 
-    with col2:
-        gender_filter = st.selectbox(
-            "Gender",
-            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
-            key="gender_tab8"
-        )
+    df_disc_t = recency_filter(df_disc)
 
-    # -----------------------------
-    # APPLY FILTERS
-    # -----------------------------
-    df_filtered = df_pref.copy()
+    heat_df, heat_sig = age_crosstab(
+        with_weight(df_disc_t[["tenure_norm", "discovery_norm"]]),
+        "discovery_norm",
+        weighted_size(df_disc_t),
+        row_col="tenure_norm",
+        multi_select=True
+    )
 
-    if age_filter != "All":
-        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
+    st.vega_lite_chart(
+        significance_heatmap(heat_df, "discovery_norm", "Discovery Channel", "tenure_norm", "First heard"),
+        use_container_width=True
+    )
 
-    if gender_filter != "All":
-        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
+    st.caption(significance_caption(heat_sig, "tenure"))
 
-    # -----------------------------
-    # RESPONDENTS
-    # -----------------------------
-    respondents = df_filtered.shape[0]
+    st.markdown("---")
+    st.subheader("Eat frequency by tenure")
 
-    # -----------------------------
-    # HEADER
-    # -----------------------------
-    st.subheader("Preferred packaged Indian sweets brand")
-    st.caption(f"Respondents: {respondents}")
+    df_freq_t = recency_filter(df)
 
-    # -----------------------------
-    # AGGREGATION
-    # -----------------------------
-    pref_counts = (
-        df_filtered["preferred_brand_norm"]
-        .value_counts()
-        .reset_index()
+    heat_df, heat_sig = age_crosstab(
+        with_weight(df_freq_t[["tenure_norm", "eat_frequency_norm"]]),
+        "eat_frequency_norm",
+        weighted_size(df_freq_t),
+        row_col="tenure_norm"
     )
 
-    pref_counts.columns = ["Brand", "Count"]
-
-    pref_counts["Pct"] = (
-        pref_counts["Count"] / respondents * 100
-        if respondents > 0 else 0
+    st.vega_lite_chart(
+        significance_heatmap(heat_df, "eat_frequency_norm", "Eat Frequency", "tenure_norm", "First heard"),
+        use_container_width=True
     )
 
-    # -----------------------------
-    # CHART
-    # -----------------------------
-    chart = bar_chart_with_pct_labels(
-        df_counts=pref_counts,
-        y_col="Brand",
-        color=PALETTE[4]
+    st.caption(significance_caption(heat_sig))
+    st.caption(
+        "Tenure is parsed from Column D (\"3-6 months\", \"more than a year ago\", dates); "
+        "ranges use their upper bound. Discovery is multi-select, so totals can exceed 100%."
     )
 
-    st.altair_chart(chart, use_container_width=True)
-
 # =====================================================
-# TAB 9 — BRAND LINKAGE
+# TAB 17 — SEARCH (FREE-TEXT INVERTED INDEX)
 # =====================================================
-with tabs[8]:
+@st.cache_data
+def load_wave_text_index(wave_name, version):
+    """
+    Token inverted index for one wave (built once per dataset version).
+    """
+    return cached_text_index(version, wave_store.waves[wave_name]["frames"])
 
-    # -----------------------------
-    # FILTERS (normalized cols)
-    # -----------------------------
-    col1, col2 = st.columns(2)
+with tabs[16]:
+
+    st.subheader("Search free-text answers")
+
+    col1, col2, col3 = st.columns([3, 1, 1])
 
     with col1:
-        age_filter = st.selectbox(
-            "Age",
-            ["All"] + sorted(df_master["age_norm"].dropna().unique()),
-            key="age_tab9"
+        search_query = st.text_input(
+            "Query",
+            placeholder="gift* OR kids   ·   haldiram taste",
+            key="query_tab17"
         )
 
     with col2:
-        gender_filter = st.selectbox(
-            "Gender",
-            ["All"] + sorted(df_master["gender_norm"].dropna().unique()),
-            key="gender_tab9"
-        )
+        search_all_waves = st.checkbox("All waves", value=False, key="all_waves_tab17")
 
-    # -----------------------------
-    # APPLY FILTERS
-    # -----------------------------
-    df_filtered = df_linkage.copy()
+    with col3:
+        page_size = st.selectbox("Per page", [25, 50, 100], key="page_size_tab17")
 
-    if age_filter != "All":
-        df_filtered = df_filtered[df_filtered["age_norm"] == age_filter]
+    st.caption(
+        "Space = AND, OR = either, trailing * = prefix (gift* matches gifting). "
+        "Searches motivation, perception, brands, moments, occasions and discovery answers."
+    )
 
-    if gender_filter != "All":
-        df_filtered = df_filtered[df_filtered["gender_norm"] == gender_filter]
+    if search_query.strip():
+        search_waves_selected = wave_store.names if search_all_waves else [selected_wave]
+
+        text_indexes = {
+            name: load_wave_text_index(name, wave_store.waves[name]["version"])
+            for name in search_waves_selected
+        }
+
+        t0 = time.perf_counter()
+        search_hits = search_waves(text_indexes, search_query)
+        search_ms = (time.perf_counter() - t0) * 1000
+
+        st.metric(label="Matching respondents", value=f"{len(search_hits)}")
+        st.caption(f"Evaluated in {search_ms:.2f} ms")
+
+        if not search_hits.empty:
+            n_pages = (len(search_hits) - 1) // page_size + 1
+
+            page = st.number_input(
+                f"Page (of {n_pages})",
+                min_value=1,
+                max_value=n_pages,
+                value=1,
+                key="page_tab17"
+            )
+
+            page_hits = search_hits.iloc[(page - 1) * page_size: page * page_size]
+
+            # answers of the page's respondents only
+            page_rows = []
+            for name, hits in page_hits.groupby("wave", sort=False):
+                master = wave_store.waves[name]["frames"]["master"]
+                wave_cols = resolve_columns(master)
+                text_cols = {
+                    wave_cols[k]: question_label(k)
+                    for k in TEXT_QUESTIONS if wave_cols.get(k) is not None
+                }
+
+                page_rows.append(
+                    master.loc[hits["respondent"], ["age_norm", "gender_norm"] + list(text_cols)]
+                    .rename(columns={"age_norm": "Age", "gender_norm": "Gender", **text_cols})
+                    .rename_axis("Respondent")
+                    .reset_index()
+                    .assign(Wave=name)
+                )
+
+            page_df = pd.concat(page_rows, ignore_index=True)
+
+            st.dataframe(
+                page_df[["Wave"] + [c for c in page_df.columns if c != "Wave"]],
+                use_container_width=True,
+                hide_index=True
+            )
 
-    # -----------------------------
-    # RESPONDENTS
-    # -----------------------------
-    respondents = df_filtered.shape[0]
+# =====================================================
+# TAB 18 — UNMAPPED CLUSTERS (MINHASH / LSH)
+# =====================================================
+@st.cache_data
+def load_unmapped_clusters(version, question):
+    """
+    Near-duplicate clusters of unmapped answers (per dataset version).
+    """
+    return load_clusters(question, dataset_path)
 
-    # -----------------------------
-    # HEADER
-    # -----------------------------
-    st.subheader("Awareness of GO DESi’s Indian sweets portfolio")
-    st.caption(f"Respondents: {respondents}")
+with tabs[17]:
 
-    # -----------------------------
-    # AGGREGATION
-    # -----------------------------
-    linkage_counts = (
-        df_filtered[linkage_col]
-        .value_counts()
-        .reset_index()
+    st.subheader("Unmapped answers grouped into near-duplicate clusters")
+
+    cluster_question = st.selectbox(
+        "Question",
+        list(UNMAPPED_QUESTIONS),
+        format_func=question_label,
+        key="question_tab18"
     )
 
-    linkage_counts.columns = ["Response", "Count"]
+    clusters = load_unmapped_clusters(dataset_ver, cluster_question)
 
-    linkage_counts["Pct"] = (
-        linkage_counts["Count"] / respondents * 100
-        if respondents > 0 else 0
-    )
+    if clusters.empty:
+        st.success("No unmapped answers for this question.")
+    else:
+        st.caption(
+            f"{len(clusters)} distinct unmapped answers in "
+            f"{clusters['cluster'].nunique()} clusters, largest first."
+        )
 
-    # -----------------------------
-    # CHART
-    # -----------------------------
-    chart = bar_chart_with_pct_labels(
-        df_counts=linkage_counts,
-        y_col="Response",
-        color=PALETTE[1]
-    )
+        cluster_summary = (
+            clusters.groupby("cluster", sort=True)
+            .agg(
+                Example=("answer", "first"),
+                Answers=("answer", "size"),
+                Respondents=("Respondents", "sum")
+            )
+            .reset_index()
+        )
 
-    st.altair_chart(chart, use_container_width=True)
+        st.dataframe(cluster_summary, use_container_width=True, hide_index=True)
 
-    # -----------------------------
-    # SUMMARY INSIGHT
-    # -----------------------------
-    yes_count = (df_filtered[linkage_col] == "Yes").sum()
-    no_count = (df_filtered[linkage_col] == "No").sum()
-    total = yes_count + no_count
+        # -----------------------------
+        # MAP A WHOLE CLUSTER
+        # -----------------------------
+        st.markdown("---")
 
-    pct_yes = round((yes_count / total) * 100, 1) if total > 0 else 0
+        c1, c2 = st.columns(2)
 
-    st.markdown("---")
-    st.markdown(
-        f"**{pct_yes}%** of respondents know that **GO DESi also makes Indian sweets** "
-        f"(Yes: {yes_count}, No: {no_count})"
-    )
\ No newline at end of file
+        with c1:
+            selected_cluster = st.selectbox(
+                "Cluster",
+                cluster_summary["cluster"].tolist(),
+                format_func=lambda c: f"{c} — {cluster_summary.set_index('cluster').loc[c, 'Example']}",
+                key="cluster_tab18"
+            )
+
+        with c2:
+            cluster_label = st.text_input("Map to label", key="label_tab18")
+
+        st.dataframe(
+            clusters.loc[clusters["cluster"] == selected_cluster, ["answer", "Respondents"]],
+            use_container_width=True,
+            hide_index=True
+        )
+
+        if cluster_label.strip():
+            rules = cluster_rules(clusters, selected_cluster, cluster_label.strip())
+            st.caption("Add to the question's map in survey_pipeline.py:")
+            st.code(
+                "\n".join(f"    {k!r}: {v!r}," for k, v in rules.items()),
+                language="python"
+            )
@@ -0,0 +1,149 @@
+# "What relates to what": bias-corrected Cramér's V for every pair of
+# survey questions.
+#
+# All pairwise contingency tables are built from one Gram matrix
+# G = X.T @ X of the respondent × answer indicator matrix, so the whole
+# q × q overview costs a single sparse product plus one batched
+# chi-square pass (significance.batch_significance).
+#
+# Tables are counted in respondents. A multi-select question (someone
+# picked more than one answer) cannot be a table axis without counting
+# people several times, so each of its answers becomes a picked / not
+# picked row pair instead: 2 × k against a single-select question, 2 × 2
+# against another multi-select one. The pair's V is the mean of its
+# answer tables' V, weighted by each table's smallest margin, so tables
+# resting on a handful of respondents barely move it.
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+from significance import batch_significance
+from survey_matrix import load_indicator_matrix
+from survey_pipeline import FILE, cache_path, labels_cache_name
+
+
+def cramers_v_corrected(chi2, n, r, k):
+    """
+    Bias-corrected Cramér's V (Bergsma 2013). Works on arrays.
+    """
+    chi2, n, r, k = (np.asarray(a, dtype=float) for a in (chi2, n, r, k))
+    n1 = np.maximum(n - 1, 1)
+
+    phi2 = np.where(n > 0, chi2 / np.maximum(n, 1), 0)
+    phi2_corr = np.maximum(0, phi2 - (k - 1) * (r - 1) / n1)
+    r_corr = r - (r - 1) ** 2 / n1
+    k_corr = k - (k - 1) ** 2 / n1
+
+    denom = np.minimum(k_corr - 1, r_corr - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v = np.where(denom > 0, np.sqrt(phi2_corr / denom), 0)
+    return v
+
+
+def _nonempty(table):
+    return table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+
+
+def pair_tables(onehot, gram, qa, qb, multi):
+    """
+    Respondent-level contingency tables of one question pair (see module
+    comment), over the respondents who answered both.
+    """
+    block = gram[onehot.slices[qa], onehot.slices[qb]].toarray()
+    if not multi[qa] and not multi[qb]:
+        return [_nonempty(block)]
+
+    answered = {q: np.asarray(onehot.block(q).sum(axis=1)).ravel() > 0 for q in (qa, qb)}
+    # respondents picking each answer of qa among those who answered qb, and vice versa
+    picked_a = np.asarray(onehot.block(qa).T @ answered[qb]).ravel()
+    picked_b = np.asarray(onehot.block(qb).T @ answered[qa]).ravel()
+
+    if multi[qa] and multi[qb]:
+        n = (answered[qa] & answered[qb]).sum()
+        return [
+            _nonempty(np.array([
+                [block[i, j], picked_a[i] - block[i, j]],
+                [picked_b[j] - block[i, j], n - picked_a[i] - picked_b[j] + block[i, j]],
+            ]))
+            for i in range(block.shape[0])
+            for j in range(block.shape[1])
+        ]
+
+    if multi[qb]:
+        block, picked_b = block.T, picked_a
+    return [_nonempty(np.vstack([row, picked_b - row])) for row in block]
+
+
+def association_matrix(onehot):
+    """
+    Symmetric DataFrame (question × question) of bias-corrected Cramér's V,
+    computed on respondent-level tables (multi-select questions answer by
+    answer, see module comment).
+    """
+    gram = (onehot.matrix.T @ onehot.matrix).tocsr()
+    questions = onehot.questions
+    multi = {q: onehot.block(q).sum(axis=1).max() > 1 for q in questions}
+
+    pairs, tables = [], []
+    for i, qa in enumerate(questions):
+        for qb in questions[i + 1:]:
+            for table in pair_tables(onehot, gram, qa, qb, multi):
+                pairs.append((qa, qb))
+                tables.append(pd.DataFrame(table))
+
+    results = batch_significance(tables)
+
+    chi2 = [res["chi2"] for res in results]
+    n = [t.to_numpy().sum() for t in tables]
+    r = [t.shape[0] for t in tables]
+    k = [t.shape[1] for t in tables]
+    v = cramers_v_corrected(chi2, n, r, k)
+
+    margin = [min(t.sum(axis=0).min(), t.sum(axis=1).min()) if t.size else 0 for t in tables]
+    pair_v = (
+        pd.DataFrame({"pair": pairs, "vw": v * np.array(margin, dtype=float), "w": margin})
+        .groupby("pair")[["vw", "w"]].sum()
+    )
+
+    out = pd.DataFrame(np.eye(len(questions)), index=questions, columns=questions)
+    for (qa, qb), row in pair_v.iterrows():
+        val = row["vw"] / row["w"] if row["w"] > 0 else 0
+        out.loc[qa, qb] = val
+        out.loc[qb, qa] = val
+
+    return out
+
+
+def cluster_order(assoc):
+    """
+    Question order from average-linkage clustering on 1 - V,
+    so related questions sit next to each other in the heatmap.
+    """
+    if len(assoc) < 3:
+        return list(assoc.index)
+
+    dist = 1 - assoc.to_numpy()
+    np.fill_diagonal(dist, 0)
+    tree = linkage(squareform(np.clip(dist, 0, None), checks=False), method="average")
+    return [assoc.index[i] for i in leaves_list(tree)]
+
+
+def load_association(path=FILE, model_labels=True):
+    """
+    Association matrix for a workbook, computed once per dataset version
+    and persisted as association.csv next to the indicator matrix
+    (model_labels=False: without the classifier's labels).
+    """
+    version, onehot = load_indicator_matrix(path, model_labels)
+    csv = cache_path(version, labels_cache_name("association.csv", model_labels))
+
+    if os.path.exists(csv):
+        return pd.read_csv(csv, index_col=0)
+
+    assoc = association_matrix(onehot)
+    assoc.to_csv(csv)
+    return assoc
@@ -0,0 +1,78 @@
+# Brand conversion funnel across awareness, recall and preference.
+#
+# Columns L (other brands known), M (top-3 spontaneous recall) and N
+# (preferred brand) are joined per respondent on the normalized brand
+# label. Each stage is a respondent × brand boolean matrix, so the stage
+# sets and their intersections are computed for every brand at once.
+#   Aware     : named the brand in L, M or N
+#   Recalled  : named it in the spontaneous top 3 (M)
+#   Preferred : named it as the preferred brand (N)
+
+import numpy as np
+import pandas as pd
+
+STAGE_QUESTIONS = {
+    "awareness": "other_packaged_brands",
+    "recall": "top_3_packaged_brands",
+    "preference": "brand_preference",
+}
+
+BENCHMARK_BRANDS = ["GO DESi", "Haldiram", "Bikaji"]
+
+
+def brand_stage_matrix(onehot, question, brands, rows=None):
+    """
+    Respondent × brand booleans for one question, columns in `brands` order
+    (brands the question never mentions are all-False).
+    """
+    block = onehot.block(question)
+    if rows is not None:
+        block = block[rows]
+
+    present = pd.Index(onehot.answers(question))
+    out = np.zeros((block.shape[0], len(brands)), dtype=bool)
+
+    pos = present.get_indexer(brands)
+    hit = pos >= 0
+    out[:, hit] = block[:, pos[hit]].toarray() > 0
+    return out
+
+
+def brand_funnel(onehot, rows=None, weights=None):
+    """
+    One row per brand: stage counts and conversion ratios (%).
+    rows: optional boolean respondent mask (segment filter).
+    weights: optional respondent weights (stage counts become weighted totals).
+    """
+    brands = sorted(set().union(*(onehot.answers(q) for q in STAGE_QUESTIONS.values())))
+
+    aware_l = brand_stage_matrix(onehot, STAGE_QUESTIONS["awareness"], brands, rows)
+    recalled = brand_stage_matrix(onehot, STAGE_QUESTIONS["recall"], brands, rows)
+    preferred = brand_stage_matrix(onehot, STAGE_QUESTIONS["preference"], brands, rows)
+
+    aware = aware_l | recalled | preferred
+
+    if weights is None:
+        w = np.ones(aware.shape[0], dtype=np.int64)
+    else:
+        w = weights if rows is None else weights[rows]
+
+    n_aware = w @ aware
+    n_recalled = w @ recalled
+    n_preferred = w @ preferred
+    n_recalled_preferred = w @ (recalled & preferred)
+
+    def ratio(num, den):
+        return np.where(den > 0, num / np.maximum(den, 1) * 100, 0)
+
+    out = pd.DataFrame({
+        "Brand": brands,
+        "Aware": n_aware,
+        "Recalled": n_recalled,
+        "Preferred": n_preferred,
+        "Aware → Recalled %": ratio(n_recalled, n_aware),
+        "Aware → Preferred %": ratio(n_preferred, n_aware),
+        "Recalled → Preferred %": ratio(n_recalled_preferred, n_recalled),
+    })
+
+    return out[out["Aware"] > 0].sort_values("Aware", ascending=False).reset_index(drop=True)
@@ -0,0 +1,148 @@
+# Content-addressed cache for the insightsgraphs charts.
+#
+# A chart's key hashes everything that can change its pixels:
+#   - the workbook sheets the chart actually read (recorded on render),
+#   - the source of its script plus every local module it pulls in
+#     (keyword rules, colours, STYLE dicts, journey / pipeline code),
+#   - the global style (matplotlib + seaborn versions, rcParams) and the
+#     render profile (dpi, layout, formats).
+# One manifest per profile maps "module.chart" to {key, sheets, outputs,
+# preview}; a chart whose key still matches and whose outputs are untouched
+# on disk is skipped.
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import types
+
+import matplotlib
+import pandas as pd
+import seaborn as sns
+
+from survey_pipeline import CACHE_DIR
+
+MANIFEST = os.path.join(CACHE_DIR, "chart_manifest_{profile}.json")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class RecordingBook(dict):
+    """
+    Workbook dict that remembers which sheets a chart looked at.
+    """
+    def __init__(self, book):
+        super().__init__(book)
+        self.read = set()
+
+    def __getitem__(self, name):
+        self.read.add(name)
+        return super().__getitem__(name)
+
+
+def frame_hash(df):
+    h = hashlib.sha1()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def sheet_hashes(book):
+    return {name: frame_hash(df) for name, df in book.items()}
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return bytes_hash(f.read())
+
+
+def bytes_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _local_module(obj):
+    module = obj if isinstance(obj, types.ModuleType) else sys.modules.get(getattr(obj, "__module__", None))
+    path = getattr(module, "__file__", None)
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    if path.startswith(ROOT + os.sep) and "site-packages" not in path:
+        return module
+    return None
+
+
+def source_hash(module):
+    """
+    Hash of a module's source and of every repo module it reaches through
+    its globals (imported modules, functions and classes), transitively.
+    """
+    seen = {}
+    todo = [module]
+    while todo:
+        m = todo.pop()
+        if m.__name__ in seen:
+            continue
+        seen[m.__name__] = inspect.getsource(m)
+        for value in vars(m).values():
+            local = _local_module(value)
+            if local is not None and local.__name__ not in seen:
+                todo.append(local)
+
+    h = hashlib.sha1()
+    for name in sorted(seen):
+        h.update(name.encode())
+        h.update(seen[name].encode())
+    return h.hexdigest()
+
+
+def style_hash(settings):
+    rc = sorted((k, repr(v)) for k, v in matplotlib.rcParams.items() if k != "backend")
+    payload = [matplotlib.__version__, sns.__version__, settings, rc]
+    return hashlib.sha1(json.dumps(payload).encode()).hexdigest()
+
+
+def chart_key(source, style, hashes, sheets):
+    """
+    Key of one chart. `sheets` are the sheets it read; a chart that read
+    none loads the workbook itself, so every sheet counts.
+    """
+    names = sorted(sheets) if sheets else sorted(hashes)
+    payload = [source, style, [(s, hashes.get(s)) for s in names]]
+    return hashlib.sha1(json.dumps(payload).encode()).hexdigest()
+
+
+def outputs_intact(entry):
+    """
+    True when every output of the manifest entry is still the file that
+    was written.
+    """
+    return all(
+        os.path.exists(path) and file_hash(path) == digest
+        for path, digest in entry["outputs"].items()
+    )
+
+
+def is_fresh(entry, key):
+    """
+    True when the manifest entry matches `key` and its outputs are intact.
+    """
+    return bool(entry) and entry["key"] == key and outputs_intact(entry)
+
+
+def load_manifest(profile):
+    path = MANIFEST.format(profile=profile)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, profile):
+    path = MANIFEST.format(profile=profile)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
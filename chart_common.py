@@ -0,0 +1,131 @@
+# Shared plumbing for the insightsgraphs chart scripts.
+#
+# Every chart is a function taking the parsed workbook ({sheet: DataFrame})
+# and saving its PNG(s). The scripts can still be run one by one, and
+# render_all.py parses the workbook once and renders every chart in a
+# process pool.
+#
+# How a chart is saved depends on the render profile, picked globally with
+# CHART_PROFILE=preview|publication (or render_all.py --profile):
+#   preview      72 dpi PNG, no tight_layout, into insightsgraphs/preview/
+#   publication  300 dpi PNG + SVG + PDF (deck quality), into insightsgraphs/
+#                (the SVG / PDF copies are git-ignored)
+#
+# Inside capture_figures() nothing is written: save_chart lays the figure
+# out and hands it back instead (report.py builds the PDF / PPTX deck from
+# those in memory).
+
+import os
+from contextlib import contextmanager
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+matplotlib.use("Agg")
+
+INPUT_FILE = "Untitled spreadsheet.xlsx"
+OUTPUT_FOLDER = "insightsgraphs"
+
+PROFILES = {
+    "preview": {
+        "dpi": 72,
+        "tight_layout": False,
+        "formats": ["png"],
+        "folder": os.path.join(OUTPUT_FOLDER, "preview"),
+    },
+    "publication": {
+        "dpi": 300,
+        "tight_layout": True,
+        "formats": ["png", "svg", "pdf"],
+        "folder": OUTPUT_FOLDER,
+    },
+}
+
+profile = os.environ.get("CHART_PROFILE", "publication")
+
+_capturing = False
+
+
+def set_profile(name):
+    """
+    Switches the render profile used by save_chart (process-wide).
+    """
+    global profile
+    if name not in PROFILES:
+        raise ValueError(f"Unknown chart profile {name!r}, expected one of {list(PROFILES)}")
+    profile = name
+
+
+@contextmanager
+def capture_figures():
+    """
+    Within the block save_chart returns [figure] (laid out, still open)
+    instead of saving and closing it.
+    """
+    global _capturing
+    previous, _capturing = _capturing, True
+    try:
+        yield
+    finally:
+        _capturing = previous
+
+
+def read_workbook(path=INPUT_FILE):
+    """
+    Every sheet of the workbook, parsed once: {sheet name: DataFrame}.
+    """
+    return pd.read_excel(path, sheet_name=None)
+
+
+def sheet(book, name):
+    """
+    Copy of one sheet with stripped, lower-cased column names.
+    """
+    df = book[name].copy()
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+def product_sheets(book):
+    """
+    The sweets + confectionery / mints sheets stacked (workbook order),
+    columns stripped and lower-cased.
+    """
+    names = [
+        s for s in book
+        if "sweet" in s.lower() or "mint" in s.lower() or "confection" in s.lower()
+    ]
+    df = pd.concat([book[s] for s in names], ignore_index=True)
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+def as_text(series):
+    """
+    str() of every value, missing values included ("nan"), which is what
+    the keyword rules in the chart scripts expect.
+    """
+    return series.map(str)
+
+
+def save_chart(name):
+    """
+    Lays out, saves and closes the current figure in every format of the
+    active profile. Returns the output paths ([figure] while capturing).
+    """
+    settings = PROFILES[profile]
+    if settings["tight_layout"]:
+        plt.tight_layout()
+    if _capturing:
+        return [plt.gcf()]
+
+    os.makedirs(settings["folder"], exist_ok=True)
+    stem = os.path.splitext(name)[0]
+    paths = []
+    for fmt in settings["formats"]:
+        path = os.path.join(settings["folder"], f"{stem}.{fmt}")
+        plt.savefig(path, dpi=settings["dpi"])
+        paths.append(path)
+    plt.close()
+    return paths
@@ -1,23 +1,36 @@
 import matplotlib.pyplot as plt
-import os
-
-output_folder = "insightsgraphs"
-os.makedirs(output_folder, exist_ok=True)
-
-# Define approximate funnel values (you can adjust based on dataset counts)
-stages = ["Discovery", "Trial", "Habit", "Advocacy"]
-values = [60, 45, 25, 10]  # number of consumers at each stage
-
-plt.figure(figsize=(6,5))
-plt.plot(stages, values, marker="o", color="#EF6C00", linewidth=3)
-plt.fill_between(stages, values, color="#FFE0B2", alpha=0.7)
-for i, v in enumerate(values):
-    plt.text(i, v + 2, f"{v}", ha="center", fontweight="bold", color="#333")
-plt.title("GO DESi Consumer Journey Funnel", pad=15, weight="bold", color="#333")
-plt.xlabel("Journey Stage")
-plt.ylabel("Number of Consumers (approx.)")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "consumer_journey_funnel.png"), dpi=300)
-plt.close()
-
-print("✅ Saved: consumer_journey_funnel.png")
+
+from chart_common import read_workbook, save_chart, sheet
+from journey import STAGES, funnel_counts, sheet_stages
+
+
+def consumer_journey_funnel(book):
+    # Funnel values derived per respondent from the master sheet's answers
+    # (see journey.py)
+    master = sheet(book, next(s for s in book if "master" in s.lower()))
+    onehot, stages_per_respondent = sheet_stages(master)
+    funnel = funnel_counts(stages_per_respondent)
+
+    stages = STAGES
+    values = funnel["Count"].tolist()  # number of consumers at each stage
+
+    plt.figure(figsize=(6,5))
+    plt.plot(stages, values, marker="o", color="#EF6C00", linewidth=3)
+    plt.fill_between(stages, values, color="#FFE0B2", alpha=0.7)
+    for i, v in enumerate(values):
+        plt.text(i, v + max(values) * 0.02, f"{v}", ha="center", fontweight="bold", color="#333")
+    plt.title("GO DESi Consumer Journey Funnel", pad=15, weight="bold", color="#333")
+    plt.xlabel("Journey Stage")
+    plt.ylabel("Number of Consumers")
+    return save_chart("consumer_journey_funnel.png")
+
+
+CHARTS = [consumer_journey_funnel]
+
+
+if __name__ == "__main__":
+    book = read_workbook()
+    for chart in CHARTS:
+        chart(book)
+
+    print("✅ Saved: consumer_journey_funnel.png")
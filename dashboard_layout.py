@@ -0,0 +1,49 @@
+# Tab titles and chart colours of the dashboard.
+#
+# Shared by app.py and static_export.py so the static export always shows
+# the same tabs, in the same order and colours, as the live dashboard.
+
+PALETTE = ["#F59E0B", "#22D3EE", "#8B5CF6", "#34D399", "#F472B6"]
+
+# tab id -> title, in dashboard order
+TAB_TITLES = {
+    "demographics": "Demographics",
+    "gender": "Gender Insights",
+    "discovery": "Discovery",
+    "consumption": "Consumption",
+    "perception": "Perception",
+    "motivation": "Motivation",
+    "awareness": "Sweets Awareness",
+    "preference": "Sweets Preference",
+    "linkage": "Brand Linkage",
+    "associations": "Associations",
+    "segments": "Segment Builder",
+    "journey": "Consumer Journey",
+    "brand_funnel": "Brand Funnel",
+    "waves": "Waves",
+    "what_changed": "What Changed",
+    "recency": "Recency",
+    "search": "Search",
+    "clusters": "Unmapped Clusters",
+}
+
+# single-colour charts, by chart id
+CHART_COLORS = {
+    "age": PALETTE[0],
+    "discovery": PALETTE[1],
+    "consumption_frequency": PALETTE[2],
+    "consumption_occasion": PALETTE[3],
+    "perception": PALETTE[4],
+    "motivation": PALETTE[2],
+    "brand_awareness": PALETTE[3],
+    "brand_preference": PALETTE[4],
+    "brand_linkage": PALETTE[1],
+    "journey": PALETTE[0],
+    "tenure": PALETTE[0],
+    "segment": PALETTE[1],
+}
+
+GENDER_COLORS = {"Female": PALETTE[1], "Male": PALETTE[0]}
+
+# brand funnel bars: Aware, Recalled, Preferred
+BRAND_STAGE_COLORS = PALETTE[:3]
@@ -6,6 +6,12 @@ import streamlit as st
 import altair as alt
 import re
 import os
+import json
+import hashlib
+
+from kpi_engine import KpiEngine, CELL, SEGMENT
+from survey_pipeline import normalize_age, normalize_gender
+from weighting import DEFAULT_TARGETS, cell_weights, rake, targets_key, weight_cells
 
 # =====================================================
 # PAGE CONFIG + THEME
@@ -32,15 +38,27 @@ if not os.path.exists(FILE):
     st.error("Master file not found")
     st.stop()
 
-@st.cache_data
-def load_master():
+def data_version():
+    """
+    Short hash of the workbook bytes + this file (the mapping rules live
+    here), so edited rows or rules invalidate everything derived from them.
+    """
+    h = hashlib.sha1()
+    for path in (FILE, __file__):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+@st.cache_data(max_entries=2)
+def load_master(version):
     xl = pd.ExcelFile(FILE)
     sheet = next(s for s in xl.sheet_names if "master" in s.lower())
     df = pd.read_excel(FILE, sheet_name=sheet)
     df.columns = [c.strip().lower() for c in df.columns]
     return df
 
-df_raw = load_master()
+data_ver = data_version()
+df_raw = load_master(data_ver)
 
 # =====================================================
 # COLUMN MAPPING (BUSINESS MEANING)
@@ -810,33 +828,107 @@ df_occ["occasion_norm"] = df_occ[occasion_col].apply(map_occasion)
 df_occ = df_occ.dropna(subset=["occasion_norm"])
 
 
+# =====================================================
+# SIDEBAR FILTERS
+# =====================================================
+
+with st.sidebar:
+    st.header("Filters")
+
+    age_values = (
+        df[age_col]
+        .dropna()          # remove None
+        .astype(str)       # ensure consistent type
+        .unique()
+    )
+
+    age_filter = st.multiselect(
+        "Age group",
+        sorted(age_values),
+        default=sorted(age_values)
+    )
+
+    weighted = st.checkbox("Weight to population targets (age × gender)", value=False)
+
 # =====================================================
 # GLOBAL KPI STRIP (EXECUTIVE SUMMARY)
 # =====================================================
 
-# Base respondent count (after age filter applied later)
-total_respondents = df.shape[0]
+# numerator / denominator flag per KPI (all counted per respondent)
+KPIS = {
+    # % consuming packaged sweets (valid Column O answer)
+    "pct_consumers": ("consumers", "respondents"),
 
-# % consuming packaged sweets
-# (exclude non-consumers from frequency df)
-consumers_count = df_freq.shape[0]
-pct_consumers = round((consumers_count / total_respondents) * 100, 1) if total_respondents else 0
+    # % aware of GO DESi (Column L), base = answered Column L
+    "pct_aware_go_desi": ("aware_go_desi", "answered_awareness"),
 
-# % aware of GO DESi (Column L)
-aware_go_desi = (
-    df_brand["brand_awareness_norm"]
-    .eq("GO DESi")
-    .sum()
-)
-pct_aware_go_desi = round((aware_go_desi / df_brand.shape[0]) * 100, 1) if df_brand.shape[0] else 0
+    # % preferring GO DESi (Column N), base = answered Column N
+    "pct_prefer_go_desi": ("prefer_go_desi", "answered_preference"),
+}
 
-# % preferring GO DESi (Column N)
-prefer_go_desi = (
-    df_pref["preferred_brand_norm"]
-    .eq("GO DESi")
-    .sum()
-)
-pct_prefer_go_desi = round((prefer_go_desi / df_pref.shape[0]) * 100, 1) if df_pref.shape[0] else 0
+@st.cache_resource
+def get_kpi_engine():
+    return KpiEngine(KPIS)
+
+def weight_frame():
+    """
+    Normalized age / gender per respondent (the raking margins).
+    """
+    return pd.DataFrame({
+        "age_norm": df[age_col].map(normalize_age),
+        "gender_norm": df[gender_col].map(normalize_gender),
+    }, index=df.index)
+
+def respondent_flags(ids):
+    """
+    One row per respondent with 0/1 counters.
+    Exploded frames share df's index, so index = respondent id.
+    """
+    aware_ids = df_brand.index[df_brand["brand_awareness_norm"].eq("GO DESi")]
+    prefer_ids = df_pref.index[df_pref["preferred_brand_norm"].eq("GO DESi")]
+
+    flags = pd.DataFrame(index=ids)
+    flags[SEGMENT] = df.loc[ids, age_col].astype(str)
+    flags[CELL] = weight_cells(weight_frame().loc[ids])
+    flags["respondents"] = 1
+    flags["consumers"] = ids.isin(df_freq.index).astype(int)
+    flags["answered_awareness"] = ids.isin(df_brand.index).astype(int)
+    flags["aware_go_desi"] = ids.isin(aware_ids).astype(int)
+    flags["answered_preference"] = ids.isin(df_pref.index).astype(int)
+    flags["prefer_go_desi"] = ids.isin(prefer_ids).astype(int)
+    return flags
+
+kpi_engine = get_kpi_engine()
+
+# flags are recomputed once per data / rules version; only respondents
+# whose flags changed (or who were added / removed) move the counters
+if kpi_engine.version != data_ver:
+    kpi_engine.sync(respondent_flags(df.index), data_ver)
+
+@st.cache_data(max_entries=2)
+def load_kpi_weights(version, targets_json):
+    """
+    Raked weight per age × gender cell + fit info
+    (cached per data / rules version and target set).
+    """
+    frame = weight_frame()
+    weights, info = rake(frame, json.loads(targets_json))
+    return cell_weights(frame, weights), info
+
+kpi_weights = None
+if weighted:
+    kpi_weights, weight_info = load_kpi_weights(data_ver, targets_key(DEFAULT_TARGETS))
+    st.sidebar.caption(
+        f"Effective sample size {weight_info['effective_n']:.0f} of {len(df)} "
+        f"({weight_info['trimmed']} respondents capped at the maximum weight)"
+    )
+
+# Base respondent count (sidebar age filter applied)
+total_respondents = kpi_engine.count("respondents", age_filter, kpi_weights)
+
+pct_consumers = kpi_engine.pct("pct_consumers", age_filter, kpi_weights)
+pct_aware_go_desi = kpi_engine.pct("pct_aware_go_desi", age_filter, kpi_weights)
+pct_prefer_go_desi = kpi_engine.pct("pct_prefer_go_desi", age_filter, kpi_weights)
 
 
 # =====================================================
@@ -847,7 +939,7 @@ kpi1, kpi2, kpi3, kpi4 = st.columns(4)
 with kpi1:
     st.metric(
         label="Total Respondents",
-        value=f"{total_respondents}"
+        value=f"{total_respondents:.0f}"
     )
 
 with kpi2:
@@ -876,22 +968,6 @@ st.markdown("---")
 # APPLY SIDEBAR FILTERS CONSISTENTLY
 # =====================================================
 
-with st.sidebar:
-    st.header("Filters")
-
-    age_values = (
-        df[age_col]
-        .dropna()          # remove None
-        .astype(str)       # ensure consistent type
-        .unique()
-    )
-
-    age_filter = st.multiselect(
-        "Age group",
-        sorted(age_values),
-        default=sorted(age_values)
-    )
-
 # apply filter to ALL dataframes
 df_freq = df_freq.loc[df_freq[age_col].isin(age_filter)].copy()
 df_brand = df_brand.loc[df_brand[age_col].isin(age_filter)].copy()
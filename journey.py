@@ -0,0 +1,144 @@
+# Consumer journey funnel derived from the answers (no hand-typed numbers).
+#
+# Each respondent gets one stage code in a single vectorized pass over the
+# indicator matrix; stage N counts everyone whose code is >= N.
+#   1 Discovery : named a discovery channel (Column F)
+#   2 Trial     : reported how often they eat Desi Popz (Column G)
+#   3 Habit     : eats it at least weekly (Column G)
+#   4 Advocacy  : the respondent's own advocacy behaviour: prefers GO DESi
+#                 over other sweets brands, shares it at parties / social
+#                 occasions or buys it as a gift (Columns N, H, J)
+#
+# How the respondent heard of the brand (word of mouth, corporate gifting
+# in Column F) is someone else's advocacy and does not count.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from survey_matrix import build_indicator_matrix, load_indicator_matrix
+from survey_pipeline import (
+    CONSUMPTION_MOMENT_MAP, EAT_FREQUENCY_MAP, FILE, MOTIVATION_MAP, PREFERENCE_BRAND_MAP, cache_path,
+    labels_cache_name, normalize_survey
+)
+
+STAGES = ["Discovery", "Trial", "Habit", "Advocacy"]
+
+HABIT_FREQUENCIES = {"Daily", "2–3 times a week", "Once a week"}
+
+# (question, answer) pairs that count as advocacy
+ADVOCACY_SIGNALS = [
+    ("brand_preference", "GO DESi"),
+    ("consumption_moment", "Party / social occasions"),
+    ("motivation", "Gifting"),
+]
+
+# every answer the normalization rules can give a signal question
+VOCABULARY = {
+    "frequency": set(EAT_FREQUENCY_MAP.values()),
+    "brand_preference": set(PREFERENCE_BRAND_MAP.values()),
+    "consumption_moment": set(CONSUMPTION_MOMENT_MAP.values()),
+    "motivation": set(MOTIVATION_MAP.values()),
+}
+
+
+def check_signals(pairs):
+    """
+    Raises ValueError for a (question, answer) pair the normalization rules
+    can never produce, so a misnamed signal cannot silently empty a stage.
+    """
+    unknown = [(q, a) for q, a in pairs if a not in VOCABULARY.get(q, ())]
+    if unknown:
+        raise ValueError(f"Journey signals not in the answer vocabulary: {unknown}")
+
+
+def _has_any(onehot, pairs):
+    """
+    Boolean per respondent: gave at least one of the (question, answer) pairs.
+    Valid answers nobody gave in this workbook (e.g. in an early wave) match
+    no one.
+    """
+    check_signals(pairs)
+    cols = [
+        onehot.column(q, a) for q, a in pairs
+        if q in onehot.slices and a in onehot.answers(q)
+    ]
+    if not cols:
+        return np.zeros(onehot.matrix.shape[0], dtype=bool)
+    return np.asarray(onehot.matrix[:, cols].sum(axis=1)).ravel() > 0
+
+
+def _answered(onehot, question):
+    if question not in onehot.slices:
+        return np.zeros(onehot.matrix.shape[0], dtype=bool)
+    return np.asarray(onehot.block(question).sum(axis=1)).ravel() > 0
+
+
+def assign_stages(onehot):
+    """
+    Stage code per respondent (0 = not in funnel, 1..4 = STAGES),
+    aligned with onehot.respondents.
+    """
+    discovered = _answered(onehot, "discovery")
+    tried = _answered(onehot, "frequency")
+    habit = _has_any(onehot, [("frequency", f) for f in HABIT_FREQUENCIES])
+    advocacy = _has_any(onehot, ADVOCACY_SIGNALS)
+
+    # stages are sequential: a stage only counts if every earlier one holds
+    return (
+        discovered.astype(np.int8)
+        * (1 + tried * (1 + habit * (1 + advocacy.astype(np.int8))))
+    ).astype(np.int8)
+
+
+def funnel_counts(stages, rows=None, weights=None):
+    """
+    DataFrame [Stage, Count, Pct] where Pct is relative to the first stage.
+    rows: optional boolean respondent mask (segment filter).
+    weights: optional respondent weights (Count becomes a weighted total).
+    """
+    if rows is not None:
+        stages = stages[rows]
+        if weights is not None:
+            weights = weights[rows]
+
+    if weights is None:
+        counts = [int((stages >= i + 1).sum()) for i in range(len(STAGES))]
+    else:
+        counts = [float(weights[stages >= i + 1].sum()) for i in range(len(STAGES))]
+    top = counts[0]
+
+    return pd.DataFrame({
+        "Stage": STAGES,
+        "Count": counts,
+        "Pct": [c / top * 100 if top > 0 else 0 for c in counts],
+    })
+
+
+def load_stages(path=FILE, model_labels=True):
+    """
+    Stage codes for a workbook, computed once per dataset version and
+    persisted as journey_stages.npy next to the indicator matrix
+    (model_labels=False: without the classifier's labels).
+    Returns (onehot, stages).
+    """
+    version, onehot = load_indicator_matrix(path, model_labels)
+    npy = cache_path(version, labels_cache_name("journey_stages.npy", model_labels))
+
+    if os.path.exists(npy):
+        return onehot, np.load(npy)
+
+    stages = assign_stages(onehot)
+    np.save(npy, stages)
+    return onehot, stages
+
+
+def sheet_stages(df_raw):
+    """
+    Stage codes straight from a parsed master sheet (columns stripped and
+    lower-cased), without the per-version cache: for callers that already
+    hold the workbook in memory. Returns (onehot, stages).
+    """
+    onehot = build_indicator_matrix(normalize_survey(df_raw))
+    return onehot, assign_stages(onehot)
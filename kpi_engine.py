@@ -0,0 +1,106 @@
+# Respondent-level KPI counters for the editapp.py KPI strip.
+#
+# Every respondent contributes 0/1 to a small set of flags (numerators and
+# denominators). Flags are summed per segment (age group) as respondents
+# arrive, so a KPI for any sidebar selection is answered by adding up a
+# handful of segment rows instead of re-scanning the exploded frames.
+#
+# The engine is shared by every dashboard session and tagged with the
+# data + rules version its flags were computed at. On a new version only
+# the respondents whose flags changed (plus added / removed ones) move
+# the segment totals.
+#
+# Totals are kept per (segment, weighting cell). Raked weights are
+# constant within an age × gender cell (weighting.cell_weights), so a
+# weighted count is the cell totals times the cell weights — no
+# respondent-level scan.
+
+import threading
+
+import pandas as pd
+
+SEGMENT = "segment"
+CELL = "cell"
+
+
+class KpiEngine:
+    """
+    Maintains per-respondent flags and per-segment counter totals.
+
+    kpis: {kpi_name: (numerator_flag, denominator_flag)}
+
+    - sync(flags, version): brings the counters to a data / rules version,
+      touching only respondents that were added, removed or changed
+    - count(flag, segments): counter total for the selected segments
+    - pct(kpi, segments): numerator / denominator * 100, rounded to 1 dp
+
+    count / pct take optional cell weights (Series by CELL label, from
+    weighting.cell_weights); flags need a CELL column for those.
+    """
+
+    def __init__(self, kpis):
+        self.kpis = kpis
+        self.flags = pd.DataFrame()
+        self.totals = pd.DataFrame()
+        self.version = None
+        self._lock = threading.Lock()
+
+    def sync(self, flags, version):
+        """
+        flags: one row per respondent (index = respondent id), a SEGMENT
+        column, an optional CELL column and one 0/1 column per counter,
+        computed at `version`. A different set of columns starts over.
+        Respondents whose flags differ from the stored ones are subtracted
+        from the totals and re-added, removed respondents are subtracted and
+        new ones added. No-op at the current version. Returns the number of
+        respondents whose counters changed.
+        """
+        with self._lock:
+            if version == self.version:
+                return 0
+
+            old = self.flags
+            if old.empty or list(old.columns) != list(flags.columns):
+                old = flags.iloc[:0]
+                self.totals = pd.DataFrame()
+            keys = [k for k in (SEGMENT, CELL) if k in flags.columns]
+
+            common = flags.index.intersection(old.index)
+            differs = (old.loc[common, flags.columns] != flags.loc[common]).any(axis=1)
+            changed = common[differs.to_numpy()]
+
+            removed = old.loc[old.index.difference(flags.index).union(changed)]
+            added = flags.loc[flags.index.difference(old.index).union(changed)]
+
+            for rows, sign in ((removed, -1), (added, 1)):
+                if not rows.empty:
+                    cell_totals = sign * rows.groupby(keys).sum(numeric_only=True)
+                    if self.totals.empty:
+                        self.totals = cell_totals
+                    else:
+                        self.totals = self.totals.add(cell_totals, fill_value=0)
+
+            self.flags = flags.copy()
+            self.version = version
+            return len(added) + len(removed) - len(changed)
+
+    def count(self, flag, segments=None, weights=None):
+        if self.totals.empty:
+            return 0
+
+        rows = self.totals
+        if segments is not None:
+            rows = rows[rows.index.get_level_values(SEGMENT).isin(list(segments))]
+
+        if weights is not None:
+            cells = rows.index.get_level_values(CELL)
+            return float((rows[flag] * weights.reindex(cells).fillna(1.0).to_numpy()).sum())
+
+        return int(rows[flag].sum())
+
+    def pct(self, kpi, segments=None, weights=None):
+        num_flag, den_flag = self.kpis[kpi]
+        den = self.count(den_flag, segments, weights)
+        if den == 0:
+            return 0
+        return round(self.count(num_flag, segments, weights) / den * 100, 1)
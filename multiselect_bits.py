@@ -0,0 +1,159 @@
+# Fixed-width bitmask encoding of multi-select answers.
+#
+# Each multi-select question is stored as one unsigned integer per
+# respondent (bit j set = answer j selected), uint32 up to 32 answers and
+# uint64 up to 64. Counting, "answered A and B" and co-occurrence are then
+# NumPy bit operations on one small array — no exploded rows.
+#
+# Weighted counts group respondents by weight value (raked weights are
+# constant per age × gender cell, so there are only a few groups) and sum
+# weight × the unweighted popcount counts of each group.
+
+import numpy as np
+import pandas as pd
+
+# questions whose answers are exploded into several rows in the pipeline
+MULTISELECT_QUESTIONS = [
+    "product_category",
+    "discovery",
+    "consumption_moment",
+    "perception",
+    "motivation",
+    "other_packaged_brands",
+    "top_3_packaged_brands",
+    "consumption_occasion",
+]
+
+# popcount of every byte value (fallback for numpy < 2.0)
+_POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values):
+    """
+    Number of set bits per element of an unsigned integer array (any shape).
+    """
+    values = np.ascontiguousarray(values)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.int64)
+
+    per_byte = _POP8[values.view(np.uint8)].reshape(values.shape + (values.itemsize,))
+    return per_byte.sum(axis=-1, dtype=np.int64)
+
+
+class MultiSelectBits:
+    """
+    answers: answer labels, answers[j] is bit j
+    bits: one uint32 / uint64 per respondent (aligned with `respondents`)
+    """
+
+    def __init__(self, question, answers, bits, respondents):
+        self.question = question
+        self.answers = list(answers)
+        self.bits = bits
+        self.respondents = pd.Index(respondents)
+
+    def mask(self, answers):
+        """
+        Integer mask with the bits of the given answers set.
+        """
+        m = 0
+        for a in answers:
+            m |= 1 << self.answers.index(a)
+        return self.bits.dtype.type(m)
+
+    def _rows(self, rows):
+        return self.bits if rows is None else self.bits[rows]
+
+    def n_selected(self, rows=None):
+        """
+        Answers selected per respondent (popcount).
+        """
+        return popcount(self._rows(rows))
+
+    def _weighted(self, rows, weights, count):
+        """
+        count(bits) for the selected respondents, or with weights (aligned
+        with `respondents`) sum of weight × count(bits) per weight value.
+        """
+        bits = self._rows(rows)
+        if weights is None:
+            return count(bits)
+
+        w = np.asarray(weights, dtype=float)
+        w = w if rows is None else w[rows]
+        return sum(value * count(bits[w == value]) for value in np.unique(w))
+
+    def respondents_answered(self, rows=None, weights=None):
+        return self._weighted(rows, weights, lambda bits: int(np.count_nonzero(bits)))
+
+    def count_all(self, answers, rows=None):
+        """
+        Respondents who selected every one of `answers` (A and B ...).
+        """
+        m = self.mask(answers)
+        return int(np.count_nonzero((self._rows(rows) & m) == m))
+
+    def count_any(self, answers, rows=None):
+        """
+        Respondents who selected at least one of `answers` (A or B ...).
+        """
+        return int(np.count_nonzero(self._rows(rows) & self.mask(answers)))
+
+    def answer_masks(self):
+        """
+        One single-bit mask per answer (answer_masks()[j] == 1 << j).
+        """
+        return self.bits.dtype.type(1) << np.arange(len(self.answers), dtype=self.bits.dtype)
+
+    def counts(self, rows=None, weights=None):
+        """
+        Respondents per answer: popcount(bits & mask) summed over the
+        respondents' words, one pass per answer mask.
+        """
+        masks = self.answer_masks()
+        return pd.Series(
+            self._weighted(rows, weights, lambda bits: np.array([popcount(bits & m).sum() for m in masks])),
+            index=self.answers
+        )
+
+    def cooccurrence(self, rows=None, weights=None):
+        """
+        answer × answer respondent counts (diagonal = respondents per answer):
+        row j is popcount(bits & mask) over the words with bit j set.
+        """
+        masks = self.answer_masks()
+
+        def table(bits):
+            return np.array([[popcount(picked & m).sum() for m in masks] for picked in (bits[(bits & m) != 0] for m in masks)])
+
+        return pd.DataFrame(
+            self._weighted(rows, weights, table).reshape(len(masks), len(masks)),
+            index=self.answers,
+            columns=self.answers
+        )
+
+
+def encode_question(onehot, question):
+    """
+    Bitmask encoding of one question from the indicator matrix.
+    """
+    answers = onehot.answers(question)
+    if len(answers) > 64:
+        raise ValueError(f"{question} has {len(answers)} answers; bitmasks hold at most 64")
+
+    dtype = np.uint32 if len(answers) <= 32 else np.uint64
+
+    block = onehot.block(question).tocoo()
+    bits = np.zeros(onehot.matrix.shape[0], dtype=dtype)
+    np.bitwise_or.at(bits, block.row, (dtype(1) << block.col.astype(dtype)))
+
+    return MultiSelectBits(question, answers, bits, onehot.respondents)
+
+
+def encode_multiselect(onehot, questions=None):
+    """
+    {question: MultiSelectBits} for every multi-select question.
+    """
+    if questions is None:
+        questions = [q for q in MULTISELECT_QUESTIONS if q in onehot.slices]
+    return {q: encode_question(onehot, q) for q in questions}
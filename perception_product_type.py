@@ -1,21 +1,7 @@
-import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
-import os
 
-input_file = "Untitled spreadsheet.xlsx"
-output_folder = "insightsgraphs"
-os.makedirs(output_folder, exist_ok=True)
+from chart_common import OUTPUT_FOLDER, as_text, product_sheets, read_workbook, save_chart
 
-# Read sheets
-excel_file = pd.ExcelFile(input_file)
-sheets = [s for s in excel_file.sheet_names if "sweet" in s.lower() or "mint" in s.lower() or "confection" in s.lower()]
-df = pd.concat([pd.read_excel(input_file, sheet_name=s) for s in sheets], ignore_index=True)
-df.columns = df.columns.str.strip().str.lower()
-
-# Find column
-col = [c for c in df.columns if "what is desi popz" in c][0]
-df[col] = df[col].astype(str).str.lower().str.strip()
 
 # Map categories
 def categorize(x):
@@ -30,27 +16,43 @@ def categorize(x):
     else:
         return "Other"
 
-df["Perceived_Category"] = df[col].apply(categorize)
-
-# Count
-counts = df["Perceived_Category"].value_counts()
-
-# --- Donut Chart ---
-colors = ["#F57C00", "#FFA726", "#FFE0B2", "#E0E0E0"]
-fig, ax = plt.subplots(figsize=(5,5))
-wedges, texts, autotexts = ax.pie(
-    counts.values,
-    labels=counts.index,
-    autopct='%1.1f%%',
-    startangle=90,
-    colors=colors,
-    textprops={'color':'#333333', 'fontsize':10}
-)
-centre_circle = plt.Circle((0,0),0.70,fc='white')
-fig.gca().add_artist(centre_circle)
-ax.set_title("What Do Consumers Think Desi Popz Is?", pad=15, weight="bold", color="#333333")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "perception_donut.png"), dpi=300)
-plt.close()
-
-print("✅ perception_donut.png saved in", output_folder)
+
+def perception_donut(book):
+    # Read sheets
+    df = product_sheets(book)
+
+    # Find column
+    col = [c for c in df.columns if "what is desi popz" in c][0]
+    df[col] = as_text(df[col]).str.lower().str.strip()
+
+    df["Perceived_Category"] = df[col].apply(categorize)
+
+    # Count
+    counts = df["Perceived_Category"].value_counts()
+
+    # --- Donut Chart ---
+    colors = ["#F57C00", "#FFA726", "#FFE0B2", "#E0E0E0"]
+    fig, ax = plt.subplots(figsize=(5,5))
+    wedges, texts, autotexts = ax.pie(
+        counts.values,
+        labels=counts.index,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=colors,
+        textprops={'color':'#333333', 'fontsize':10}
+    )
+    centre_circle = plt.Circle((0,0),0.70,fc='white')
+    fig.gca().add_artist(centre_circle)
+    ax.set_title("What Do Consumers Think Desi Popz Is?", pad=15, weight="bold", color="#333333")
+    return save_chart("perception_donut.png")
+
+
+CHARTS = [perception_donut]
+
+
+if __name__ == "__main__":
+    book = read_workbook()
+    for chart in CHARTS:
+        chart(book)
+
+    print("✅ perception_donut.png saved in", OUTPUT_FOLDER)
@@ -0,0 +1,198 @@
+# Regenerates every insightsgraphs/ chart in one go.
+#
+# The workbook is parsed once in the parent; each chart function listed in
+# a script's CHARTS is a job on a process pool (Agg backend, workbook handed
+# to every worker once through the pool initializer). Status is streamed as
+# jobs finish, followed by the total wall time.
+#
+# Charts whose inputs, code and style are unchanged since the last run are
+# skipped (content-addressed manifest, see chart_cache.py); --force
+# re-renders everything.
+#
+# --profile picks the render profile (see chart_common.py, default from
+# CHART_PROFILE). For publication, a changed chart is first drawn as a cheap
+# in-memory preview; the deck-quality PNG/SVG/PDF is only re-rendered when
+# that preview differs from the one behind the current deck files. The
+# preview is never written, so insightsgraphs/preview/ and its manifest
+# only change on --profile preview runs.
+#
+# CLI:
+#   python render_all.py                          (every chart, one worker per core)
+#   python render_all.py --workers 4
+#   python render_all.py --only consumption_context sweets_brand_awareness
+#   python render_all.py --force
+#   python render_all.py --profile preview
+
+import argparse
+import importlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+import chart_cache
+import chart_common
+from chart_cache import RecordingBook
+from chart_common import INPUT_FILE, PROFILES, capture_figures, read_workbook, set_profile
+
+CHART_MODULES = [
+    "generate_demographic_graphs",
+    "discovery_channels_chart",
+    "age_vs_discovery_heatmap",
+    "product_motivation_analysis",
+    "purchase_motivation",
+    "perception_product_type",
+    "consumption_context",
+    "consumer_journey_funnel",
+    "brand_linkage_awareness",
+    "sweets_brand_awareness",
+    "sweets_perception_preference",
+]
+
+_BOOK = None
+_HASHES = None
+
+
+def chart_jobs(modules=CHART_MODULES):
+    """
+    (module, function name) for every chart the given scripts declare.
+    """
+    return [
+        (module, chart.__name__)
+        for module in modules
+        for chart in importlib.import_module(module).CHARTS
+    ]
+
+
+def _init_worker(book, hashes):
+    global _BOOK, _HASHES
+    matplotlib.use("Agg")
+    _BOOK = book
+    _HASHES = hashes
+
+
+def _preview_hash(chart, book):
+    """
+    Hash of the chart's preview PNG, drawn in memory (nothing is saved).
+    """
+    set_profile("preview")
+    with capture_figures():
+        [fig] = chart(book)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=PROFILES["preview"]["dpi"])
+    plt.close(fig)
+    return chart_cache.bytes_hash(buf.getvalue())
+
+
+def _render(module, name, entry, force, profile):
+    """
+    Renders one chart in `profile` unless its manifest entry is still fresh
+    (or, for publication, its preview did not change).
+    Returns (new manifest entry, status, seconds).
+    """
+    start = time.perf_counter()
+    mod = importlib.import_module(module)
+    chart = getattr(mod, name)
+    source = chart_cache.source_hash(mod)
+    style = chart_cache.style_hash(PROFILES[profile])
+
+    if not force and entry:
+        key = chart_cache.chart_key(source, style, _HASHES, entry["sheets"])
+        if chart_cache.is_fresh(entry, key):
+            return entry, "unchanged", time.perf_counter() - start
+
+    book = RecordingBook(_BOOK)
+    if profile == "preview":
+        set_profile("preview")
+        paths = chart(book)
+        preview = chart_cache.file_hash(paths[0])
+    else:
+        preview = _preview_hash(chart, book)
+        if not force and entry and entry.get("preview") == preview and chart_cache.outputs_intact(entry):
+            # same picture at preview resolution: keep the deck files
+            entry = dict(entry, key=chart_cache.chart_key(source, style, _HASHES, sorted(book.read)))
+            return entry, "preview unchanged", time.perf_counter() - start
+        set_profile(profile)
+        paths = chart(book)
+
+    sheets = sorted(book.read)
+    entry = {
+        "key": chart_cache.chart_key(source, style, _HASHES, sheets),
+        "sheets": sheets,
+        "outputs": {p: chart_cache.file_hash(p) for p in paths},
+        "preview": preview,
+    }
+    return entry, "rendered", time.perf_counter() - start
+
+
+def render_all(modules=CHART_MODULES, workers=None, path=INPUT_FILE, force=False, profile=None):
+    """
+    Renders every chart of `modules` in parallel in `profile` (default:
+    the CHART_PROFILE one), skipping the ones whose cache key is unchanged.
+    Returns the list of (module.function, error) that failed.
+    """
+    profile = profile or chart_common.profile
+    start = time.perf_counter()
+    book = read_workbook(path)
+    hashes = chart_cache.sheet_hashes(book)
+    jobs = chart_jobs(modules)
+    manifest = chart_cache.load_manifest(profile)
+    print(
+        f"Workbook parsed in {time.perf_counter() - start:.2f}s, "
+        f"{len(jobs)} charts to check ({profile} profile)"
+    )
+
+    failed = []
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(book, hashes)) as pool:
+        futures = {}
+        for module, name in jobs:
+            job = f"{module}.{name}"
+            futures[pool.submit(_render, module, name, manifest.get(job), force, profile)] = job
+
+        for i, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                entry, status, seconds = future.result()
+            except Exception as e:
+                failed.append((job, e))
+                manifest.pop(job, None)
+                print(f"❌ [{i}/{len(jobs)}] {job}: {type(e).__name__}: {e}")
+                continue
+            manifest[job] = entry
+            files = ", ".join(os.path.basename(p) for p in entry["outputs"])
+            if status == "rendered":
+                rendered += 1
+                print(f"✅ [{i}/{len(jobs)}] {job} → {files} ({seconds:.2f}s)")
+            else:
+                print(f"⏭️  [{i}/{len(jobs)}] {job} {status} ({files}, {seconds:.2f}s)")
+
+    chart_cache.save_manifest(manifest, profile)
+    print(
+        f"\n{rendered} rendered, {len(jobs) - rendered - len(failed)} unchanged, "
+        f"{len(failed)} failed ({PROFILES[profile]['folder']}) in {time.perf_counter() - start:.2f}s"
+    )
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every insightsgraphs chart in parallel")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--only", nargs="+", choices=CHART_MODULES, default=CHART_MODULES)
+    parser.add_argument("--force", action="store_true", help="ignore the chart manifest")
+    parser.add_argument("--profile", choices=list(PROFILES), default=chart_common.profile)
+    args = parser.parse_args()
+
+    failed = render_all(args.only, args.workers, force=args.force, profile=args.profile)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Command-line client for render_daemon.py.
+#
+# Sends chart jobs to a running render daemon and prints the files it
+# wrote. Only the standard library is imported here, so a request costs
+# the interpreter start-up plus the render itself.
+#
+# CLI:
+#   python render_client.py consumption_context
+#   python render_client.py consumption_context.consumption_context_bar --profile preview
+#   python render_client.py --stop
+
+import argparse
+import json
+import socket
+import sys
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+def send(request, port=PORT):
+    """
+    Sends one request to the daemon and returns its reply.
+    """
+    with socket.create_connection((HOST, port)) as conn:
+        conn.sendall((json.dumps(request) + "\n").encode())
+        return json.loads(conn.makefile(encoding="utf-8").readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render charts through the render daemon")
+    parser.add_argument("jobs", nargs="*", help="chart script or script.chart_function")
+    parser.add_argument("--profile", default=None, help="preview or publication (daemon default if omitted)")
+    parser.add_argument("--stop", action="store_true", help="stop the daemon")
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    if not args.stop and not args.jobs:
+        parser.error("give chart jobs or --stop")
+
+    try:
+        reply = send({"stop": True} if args.stop else {"jobs": args.jobs, "profile": args.profile}, args.port)
+    except ConnectionRefusedError:
+        sys.exit(f"❌ No render daemon on {HOST}:{args.port}; start one with: python render_daemon.py")
+
+    if not reply["ok"]:
+        sys.exit(f"❌ {reply['error']}")
+    for job, paths in reply.get("outputs", {}).items():
+        print(f"✅ {job} → {', '.join(paths)}")
+    if "seconds" in reply:
+        print(f"Rendered in {reply['seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# Long-running render daemon for the insightsgraphs charts.
+#
+# A chart script run on its own pays the pandas / matplotlib / seaborn
+# imports, the font cache lookup (the custom "Inter" family of
+# consumption_context) and the workbook parse before drawing anything. The
+# daemon pays them once, keeps the parsed workbook and the chart modules
+# in memory, and renders jobs sent over a localhost socket. That saves the
+# ~3s start-up of every run; what is left is the drawing itself, a few
+# tenths of a second per chart in the preview profile (the daemon's
+# default) and one to two seconds for a publication script (300 dpi PNG +
+# SVG + PDF).
+#
+# A job names a chart script ("consumption_context": every chart it
+# declares) or one chart ("consumption_context.consumption_context_bar").
+# Before each job the daemon re-imports repo modules whose file changed on
+# disk and re-reads the workbook if it changed, so edits are picked up
+# without a restart: changed helpers are reloaded in import order, together
+# with the helpers and chart scripts that import them. Jobs run one at a
+# time (pyplot is process-global); the reply lists the files written.
+#
+# Jobs are sent with render_client.py (standard library only, so the
+# client itself starts fast).
+#
+# Protocol: one JSON line per request, one JSON line back.
+#   {"jobs": [...], "profile": "preview"}  ->  {"ok": true, "outputs": {job: [paths]}, "seconds": s}
+#   {"stop": true}                         ->  {"ok": true}
+#   on failure                             ->  {"ok": false, "error": "..."}
+#
+# CLI:
+#   python render_daemon.py                (start the daemon, foreground)
+#   python render_daemon.py --port 8766
+#   python render_daemon.py --profile publication   (default for jobs without a profile)
+#   python render_client.py consumption_context
+#   python render_client.py --stop
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from graphlib import TopologicalSorter
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+from chart_cache import ROOT
+from chart_common import INPUT_FILE, PROFILES, read_workbook, set_profile
+from render_all import CHART_MODULES
+from render_client import HOST, PORT
+
+
+def local_imports(path):
+    """
+    Top-level module names a source file imports (import x / from x import y).
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.partition(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.partition(".")[0])
+    return names
+
+
+class ChartState:
+    """
+    What the daemon keeps warm: the parsed workbook and the imported repo
+    modules, each with the mtime it was loaded at.
+    """
+
+    def __init__(self, path=INPUT_FILE):
+        self.path = path
+        self.book = None
+        self.book_mtime = None
+        self.mtimes = {}
+        for name in CHART_MODULES:
+            importlib.import_module(name)
+        self.refresh()
+
+    def _local_modules(self):
+        running = {sys.modules.get("__main__"), sys.modules.get(__name__)}
+        for name, module in list(sys.modules.items()):
+            # the daemon itself (also aliased as __mp_main__ by multiprocessing)
+            if module in running:
+                continue
+            path = getattr(module, "__file__", None)
+            if path and os.path.abspath(path).startswith(ROOT + os.sep) and "site-packages" not in path:
+                yield name, module, path
+
+    def refresh(self):
+        """
+        Re-reads the workbook and re-imports changed repo modules. A changed
+        helper is reloaded after the helpers it imports and before the
+        helpers and chart scripts that import from it, so none keeps names
+        from a stale module. Returns the names of the reloaded modules.
+        """
+        mtime = os.path.getmtime(self.path)
+        if mtime != self.book_mtime:
+            self.book = read_workbook(self.path)
+            self.book_mtime = mtime
+
+        local = {name: path for name, _, path in self._local_modules()}
+        changed = {
+            name for name, path in local.items()
+            if self.mtimes.get(name, os.path.getmtime(path)) != os.path.getmtime(path)
+        }
+
+        # helpers to reload: the changed ones and, transitively, the ones importing them
+        deps = {name: local_imports(path) & local.keys() for name, path in local.items()}
+        stale = {name for name in changed if name not in CHART_MODULES}
+        while True:
+            importers = {
+                name for name in deps
+                if name not in CHART_MODULES and name not in stale and deps[name] & stale
+            }
+            if not importers:
+                break
+            stale |= importers
+        helpers = list(TopologicalSorter({name: deps[name] & stale for name in stale}).static_order())
+
+        charts = CHART_MODULES if helpers else [name for name in CHART_MODULES if name in changed]
+        for name in helpers + list(charts):
+            importlib.reload(sys.modules[name])
+
+        self.mtimes = {name: os.path.getmtime(path) for name, _, path in self._local_modules()}
+        return helpers + list(charts)
+
+    def charts(self, job):
+        """
+        Chart functions of a job: "module" or "module.function".
+        """
+        module, _, name = job.partition(".")
+        if module not in CHART_MODULES:
+            raise ValueError(f"Unknown chart script {module!r}, expected one of {CHART_MODULES}")
+        charts = sys.modules[module].CHARTS
+        if not name:
+            return charts
+        matches = [c for c in charts if c.__name__ == name]
+        if not matches:
+            raise ValueError(f"{module} has no chart {name!r}, expected one of {[c.__name__ for c in charts]}")
+        return matches
+
+    def render(self, jobs, profile):
+        """
+        Renders the jobs in `profile`; {job: [output paths]}.
+        """
+        reloaded = self.refresh()
+        if reloaded:
+            print(f"↻ reloaded {', '.join(reloaded)}")
+        set_profile(profile)
+        outputs = {}
+        try:
+            for job in jobs:
+                outputs[job] = [path for chart in self.charts(job) for path in chart(self.book)]
+        finally:
+            plt.close("all")
+        return outputs
+
+
+def warm_up():
+    """
+    Draws one throwaway figure in every rc style the charts use, so the
+    font lookups are cached before the first job.
+    """
+    from consumption_context import STYLE
+
+    for style in ({}, STYLE):
+        with plt.rc_context(style):
+            fig = plt.figure()
+            fig.text(0.5, 0.5, "GO DESi", weight="bold")
+            fig.canvas.draw()
+            plt.close(fig)
+
+
+class RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        start = time.perf_counter()
+        try:
+            request = json.loads(self.rfile.readline())
+            if request.get("stop"):
+                reply = {"ok": True}
+                # shutdown() waits for serve_forever, which is running this handler
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                profile = request.get("profile") or self.server.profile
+                outputs = self.server.state.render(request["jobs"], profile)
+                reply = {"ok": True, "outputs": outputs, "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write((json.dumps(reply) + "\n").encode())
+
+        if "outputs" in reply:
+            print(f"✅ {', '.join(reply['outputs'])} ({reply['seconds']:.3f}s)")
+        elif not reply["ok"]:
+            print(f"❌ {reply['error']}")
+
+
+class RenderServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
+    def __init__(self, state, port=PORT, profile="preview"):
+        super().__init__((HOST, port), RenderHandler)
+        self.state = state
+        self.profile = profile
+
+
+def serve(port=PORT, path=INPUT_FILE, profile="preview"):
+    start = time.perf_counter()
+    state = ChartState(path)
+    warm_up()
+    with RenderServer(state, port, profile) as server:
+        print(f"Render daemon on {HOST}:{port}, {profile} profile (warm in {time.perf_counter() - start:.2f}s)")
+        server.serve_forever(poll_interval=0.2)
+    print("Render daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the chart renderer warm and render on request")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--profile", choices=list(PROFILES), default="preview",
+                        help="profile of jobs that do not name one")
+    args = parser.parse_args()
+
+    serve(args.port, args.input, args.profile)
+
+
+if __name__ == "__main__":
+    main()
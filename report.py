@@ -0,0 +1,642 @@
+# One-pass insights report: every chart in a single PDF or PPTX deck.
+#
+# The deck holds a cover page, every insightsgraphs chart (the functions
+# the batch scripts list in CHARTS, publication profile) and a static
+# equivalent of each dashboard chart (master sheet, no filters, the
+# bar / heatmap / funnel figures static_export.py exports). Pages are drawn concurrently in
+# worker processes. Each worker rasterizes its figure to an in-memory PNG
+# (150 dpi by default), because matplotlib figures do not survive pickling
+# (bar_label keeps a lambda). The pages are streamed into the deck in
+# deck order as they arrive. Nothing is written to insightsgraphs/.
+#
+# Segment fan-out (--segments): the same dashboard chart pack once per
+# segment (age group, gender, product category, or their combinations
+# with --cross). The survey is normalized and counted once into a cube of
+# respondent cells × answers; every segment's charts are sums over its
+# cells, and the packs are rendered concurrently, one per worker job, as
+# vector PDF pages. The batch-script charts read the raw sheets and are
+# not part of the segment packs.
+#
+# --rules-only leaves the fallback classifier's labels out of the
+# dashboard charts, as the dashboard's "Include classifier labels" toggle.
+#
+# PPTX output needs python-pptx (optional, not in requirements.txt):
+#   pip install python-pptx
+#
+# CLI:
+#   python report.py                               (insights_report.pdf)
+#   python report.py --format pptx                 (insights_report.pptx)
+#   python report.py --out deck.pdf --workers 4 --dpi 300
+#   python report.py --segments age product        (insights_report_segments/<segment>.pdf)
+#   python report.py --segments age product --cross
+#   python report.py --rules-only                  (dashboard charts without classifier labels)
+
+import argparse
+import datetime
+import importlib
+import importlib.util
+import io
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_pdf import PdfPages
+
+from chart_common import INPUT_FILE, capture_figures, read_workbook, set_profile
+from journey import STAGES, load_stages
+from render_all import CHART_MODULES, chart_jobs
+from significance import ALPHA, annotate_multiselect
+from static_export import TABS, export_frames, slug
+from survey_pipeline import load_survey, rule_labels_only
+
+REPORT_FILE = "insights_report"
+
+# slides are viewed on screens: 150 dpi fills a full-HD 16:9 slide
+# (--dpi 300 matches the publication PNGs, at ~4x the pixels)
+DPI = 150
+
+# 16:9 slide, in inches
+SLIDE_SIZE = (13.333, 7.5)
+
+_BOOK = None
+
+
+def dashboard_charts(path=INPUT_FILE, model_labels=True):
+    """
+    Every chart of the exported dashboard tabs with its unfiltered
+    aggregates (the whole-sample segment of the cube), in tab order.
+    Returns (respondents, charts).
+    """
+    cube = SegmentCube(path, model_labels)
+    [(_, respondents, charts)] = cube.packs([("All", np.ones(len(cube.cells), dtype=bool))])
+    return respondents, charts
+
+
+def report_jobs(path=INPUT_FILE, modules=CHART_MODULES, model_labels=True):
+    """
+    Pages of the deck, in order: ("cover", info), ("script", "module.function")
+    per batch chart, ("dashboard", chart) per dashboard chart.
+    """
+    respondents, charts = dashboard_charts(path, model_labels)
+    scripts = [f"{module}.{name}" for module, name in chart_jobs(modules)]
+    cover = {
+        "source": os.path.basename(path),
+        "respondents": respondents,
+        "charts": len(scripts) + len(charts),
+        "labels": model_labels,
+        "date": datetime.date.today().strftime("%d %b %Y"),
+    }
+    return (
+        [("cover", cover)]
+        + [("script", job) for job in scripts]
+        + [("dashboard", chart) for chart in charts]
+    )
+
+
+# =====================================================
+# PAGES
+# =====================================================
+def cover_page(info):
+    fig = plt.figure(figsize=SLIDE_SIZE)
+    fig.patch.set_facecolor("#F28C28")
+    fig.text(0.08, 0.58, "GO DESi – Consumer Insights", fontsize=40, weight="bold", color="white")
+    if info.get("segment"):
+        fig.text(0.08, 0.70, f"Segment: {info['segment']}", fontsize=22, color="white")
+    fig.text(
+        0.08, 0.48,
+        f"{info['respondents']} respondents · {info['charts']} charts · {info['source']}",
+        fontsize=18, color="white"
+    )
+    fig.text(0.08, 0.42, info["date"], fontsize=14, color="white", alpha=0.9)
+    fig.text(
+        0.08, 0.36,
+        "Classifier labels for unmapped answers " + ("included" if info.get("labels", True) else "left out"),
+        fontsize=12, color="white", alpha=0.9
+    )
+    return fig
+
+
+def _footer(fig, chart, n):
+    notes = [f"Tab: {chart['tab']}", f"Respondents: {n}"]
+    if chart.get("note"):
+        notes.append(chart["note"])
+    fig.text(0.01, 0.01, "   ·   ".join(notes), fontsize=8, color="#666")
+
+
+def dashboard_bar(chart):
+    """
+    Horizontal % bars with % labels, as bar_chart_with_pct_labels in app.py.
+    """
+    cell = chart["cell"]
+    n = cell["n"]
+    labels = [chart["answers"][i] for i, _ in cell["rows"]]
+    pct = [count / n * 100 if n else 0 for _, count in cell["rows"]]
+
+    fig, ax = plt.subplots(figsize=(10, 1.6 + 0.4 * len(labels)))
+    bars = ax.barh(labels, pct, color=chart["color"], height=0.6)
+    ax.invert_yaxis()
+    ax.bar_label(bars, labels=[f"{p:.1f}%" for p in pct], padding=4, fontsize=9)
+    ax.set_xlabel("% of Total Respondents")
+    ax.set_title(chart["title"], weight="bold", pad=12)
+    sns.despine(ax=ax)
+    _footer(fig, chart, n)
+    return fig
+
+
+def dashboard_heatmap(chart):
+    """
+    Age × answer % shading with ▲ / ▼ on significantly over / under-indexed
+    cells, as significance_heatmap in app.py.
+    """
+    cell = chart["cell"]
+    n = cell["n"]
+    cells = pd.DataFrame(
+        [
+            (chart["ages"][a], chart["answers"][i], count / n * 100 if n else 0, signal)
+            for a, i, count, _, _, _, signal in cell["rows"]
+        ],
+        columns=["Age", "Answer", "Pct", "Signal"]
+    )
+    pct = cells.pivot(index="Age", columns="Answer", values="Pct")
+    signal = cells.pivot(index="Age", columns="Answer", values="Signal").reindex_like(pct).fillna("")
+
+    fig, ax = plt.subplots(figsize=(max(8, 0.9 * pct.shape[1] + 3), 2.4 + 0.55 * pct.shape[0]))
+    sns.heatmap(pct, annot=signal, fmt="", cmap="GnBu", linewidths=0.4, ax=ax,
+                cbar_kws={"label": "%"}, annot_kws={"fontsize": 12, "color": "#222"})
+    ax.set_title(chart["title"], weight="bold", pad=12)
+    ax.set_xlabel(chart["label"])
+    ax.set_ylabel("Age Group")
+    plt.setp(ax.get_xticklabels(), rotation=30, ha="right")
+    plt.setp(ax.get_yticklabels(), rotation=0)
+    if "tested" in cell:
+        chart = dict(chart, note=(
+            f"{cell['significant']} of {cell['tested']} answers differ significantly by age group "
+            f"(picked vs not, χ² p < {ALPHA}); ▲ / ▼ = significantly over / under-indexed. "
+            + chart.get("note", "")
+        ).strip())
+    _footer(fig, chart, n)
+    return fig
+
+
+def dashboard_funnel(chart):
+    """
+    Respondents reaching each journey stage, as the Consumer Journey tab.
+    """
+    counts = chart["cell"]["rows"]
+    top = counts[0] or 1
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    bars = ax.barh(chart["answers"], counts, color=chart["color"], height=0.6)
+    ax.invert_yaxis()
+    ax.bar_label(bars, labels=[f"{c} ({c / top * 100:.0f}%)" for c in counts], padding=4)
+    ax.set_xlabel("Respondents")
+    ax.set_title(chart["title"], weight="bold", pad=12)
+    sns.despine(ax=ax)
+    _footer(fig, chart, counts[0])
+    return fig
+
+
+def empty_page(chart):
+    """
+    Placeholder for a chart nobody in the (segment) sample answered.
+    """
+    fig = plt.figure(figsize=(10, 3))
+    fig.text(0.5, 0.62, chart["title"], ha="center", fontsize=14, weight="bold")
+    fig.text(0.5, 0.42, "No responses in this segment", ha="center", fontsize=12, color="#666")
+    _footer(fig, chart, chart["cell"].get("n", 0))
+    return fig
+
+
+DASHBOARD_KINDS = {"bar": dashboard_bar, "heatmap": dashboard_heatmap, "funnel": dashboard_funnel}
+
+
+def _init_worker(book):
+    global _BOOK
+    matplotlib.use("Agg")
+    set_profile("publication")
+    _BOOK = book
+
+
+def draw_page(kind, job):
+    """
+    The figure of one deck page (left open).
+    """
+    if kind == "cover":
+        return cover_page(job)
+    if kind == "script":
+        module, _, name = job.partition(".")
+        with capture_figures():
+            [fig] = getattr(importlib.import_module(module), name)(_BOOK)
+        return fig
+    if not any(job["cell"]["rows"]):
+        return empty_page(job)
+    fig = DASHBOARD_KINDS[job["kind"]](job)
+    fig.tight_layout(rect=(0, 0.03, 1, 1))
+    return fig
+
+
+def figure_png(fig, dpi):
+    """
+    PNG bytes of a figure; closes it.
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def render_page(kind, job, dpi):
+    """
+    Worker: draws one page and returns (PNG bytes, seconds).
+    """
+    start = time.perf_counter()
+    png = figure_png(draw_page(kind, job), dpi)
+    return png, time.perf_counter() - start
+
+
+# =====================================================
+# DECKS
+# =====================================================
+class PdfDeck:
+    """
+    PDF written page by page, each page the size of its chart.
+    """
+
+    def __init__(self, out, dpi):
+        self.dpi = dpi
+        self.pdf = PdfPages(out)
+
+    def add(self, png):
+        image = mpimg.imread(io.BytesIO(png), format="png")
+        height, width = image.shape[:2]
+        fig = plt.figure(figsize=(width / self.dpi, height / self.dpi), dpi=self.dpi)
+        fig.figimage(image)
+        self.pdf.savefig(fig, dpi=self.dpi)
+        plt.close(fig)
+
+    def add_figure(self, fig):
+        # drawn in this process: keep the page vector
+        self.pdf.savefig(fig, facecolor=fig.get_facecolor())
+        plt.close(fig)
+
+    def close(self):
+        self.pdf.close()
+
+
+class PptxDeck:
+    """
+    16:9 slides, one chart per slide, scaled to fit. python-pptx keeps the
+    deck in memory and writes it on close.
+    """
+
+    def __init__(self, out, dpi):
+        from pptx import Presentation
+        from pptx.util import Inches
+
+        self.out = out
+        self.dpi = dpi
+        self.inches = Inches
+        self.deck = Presentation()
+        self.deck.slide_width = Inches(SLIDE_SIZE[0])
+        self.deck.slide_height = Inches(SLIDE_SIZE[1])
+        self.blank = self.deck.slide_layouts[6]
+
+    def add(self, png):
+        from PIL import Image
+
+        width, height = Image.open(io.BytesIO(png)).size
+        width, height = width / self.dpi, height / self.dpi
+        scale = min((SLIDE_SIZE[0] - 0.6) / width, (SLIDE_SIZE[1] - 0.6) / height, 1.0)
+        width, height = width * scale, height * scale
+
+        slide = self.deck.slides.add_slide(self.blank)
+        slide.shapes.add_picture(
+            io.BytesIO(png),
+            self.inches((SLIDE_SIZE[0] - width) / 2), self.inches((SLIDE_SIZE[1] - height) / 2),
+            width=self.inches(width), height=self.inches(height)
+        )
+
+    def add_figure(self, fig):
+        self.add(figure_png(fig, self.dpi))
+
+    def close(self):
+        self.deck.save(self.out)
+
+
+DECKS = {"pdf": PdfDeck, "pptx": PptxDeck}
+
+
+def build_report(path=INPUT_FILE, fmt="pdf", out=None, workers=None, dpi=DPI, model_labels=True):
+    """
+    Renders every page in parallel and streams them into the deck in order.
+    Returns the output path.
+    """
+    start = time.perf_counter()
+    out = out or f"{REPORT_FILE}.{fmt}"
+    book = read_workbook(path)
+    jobs = report_jobs(path, model_labels=model_labels)
+    print(f"Data ready in {time.perf_counter() - start:.2f}s, {len(jobs)} pages")
+
+    deck = DECKS[fmt](out, dpi)
+    pages = {}
+    done = written = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(book,)) as pool:
+            futures = {pool.submit(render_page, kind, job, dpi): i for i, (kind, job) in enumerate(jobs)}
+            for future in as_completed(futures):
+                i = futures[future]
+                pages[i], seconds = future.result()
+                done += 1
+                kind, job = jobs[i]
+                label = {"cover": "cover", "script": job}.get(kind) or job["title"]
+                print(f"✅ [{done}/{len(jobs)}] {label} ({seconds:.2f}s)")
+
+                # stream every page whose predecessors are all in
+                while written in pages:
+                    deck.add(pages.pop(written))
+                    written += 1
+    finally:
+        deck.close()
+
+    print(f"\nWrote {out} ({os.path.getsize(out) / 1024 / 1024:.1f} MB, {written} pages) in {time.perf_counter() - start:.2f}s")
+    return out
+
+
+# =====================================================
+# SEGMENT FAN-OUT
+# =====================================================
+SEGMENT_DIR = "insights_report_segments"
+
+SEGMENT_DIMENSIONS = ["age", "gender", "product"]
+
+PRODUCT_CATEGORIES = ["Sweets", "Confectionery and Mints"]
+
+
+class SegmentCube:
+    """
+    Every dashboard chart counted once per (respondent cell, answer), where
+    a cell is a distinct (age, gender, products bought) combination. A
+    segment is a set of cells, so its charts are sums over cube rows and no
+    frame is filtered or re-aggregated per segment.
+
+    - segments(dimensions, cross): [(label, cell mask)]
+    - pack(mask): (respondents, charts) of one segment
+    - packs(segments): the same for many segments, significance tests of
+      every segment's heatmaps batched per chart
+    """
+
+    def __init__(self, path=INPUT_FILE, model_labels=True):
+        _, frames = load_survey(path)
+        if not model_labels:
+            frames = rule_labels_only(frames)
+        master = frames["master"]
+
+        bought = frames["product"].groupby(level=0)["product_norm"].agg(set).reindex(master.index)
+        people = pd.DataFrame({
+            "age": master["age_norm"].fillna(""),
+            "gender": master["gender_norm"].fillna(""),
+        })
+        for category in PRODUCT_CATEGORIES:
+            people[category] = bought.map(lambda b: isinstance(b, set) and category in b)
+
+        codes, cells = pd.factorize(pd.Series(list(people.itertuples(index=False, name=None)), index=master.index))
+        self.cell = pd.Series(codes, index=master.index)
+        self.cells = pd.DataFrame(list(cells), columns=people.columns)
+        self.people = np.bincount(codes, minlength=len(self.cells))
+
+        sources = export_frames(frames)
+        self.charts = []
+        for tab, specs in TABS:
+            for chart in specs:
+                # co-recall, associations and the brand funnel are counted
+                # from the indicator matrix, not the cube: static export only
+                if chart["kind"] not in DASHBOARD_KINDS:
+                    continue
+                spec = {k: v for k, v in chart.items() if k not in ("frame", "base", "col", "order")}
+                spec["tab"] = tab
+                if chart["kind"] == "funnel":
+                    spec["answers"] = STAGES
+                    spec["cube"] = self._stage_cube(path, model_labels)
+                else:
+                    frame = sources[chart["frame"]]
+                    col = chart["col"]
+                    spec["answers"] = chart.get("order") or sorted(frame[col].dropna().astype(str).unique())
+                    spec["order"] = chart.get("order")
+                    if chart["kind"] == "heatmap":
+                        # multi-select: respondents picking each answer, tested per answer
+                        frame = frame[~frame.set_index(col, append=True).index.duplicated()]
+                        answered = frame.index.unique()
+                        spec["people"] = np.bincount(answered.map(self.cell), minlength=len(self.cells))
+                    spec["cube"] = frame.groupby([frame.index.map(self.cell), col]).size()
+                    spec["base"] = np.bincount(
+                        sources[chart.get("base", chart["frame"])].index.map(self.cell),
+                        minlength=len(self.cells)
+                    )
+                self.charts.append(spec)
+
+    def _stage_cube(self, path, model_labels=True):
+        """
+        Respondents per (cell, journey stage reached).
+        """
+        onehot, stages = load_stages(path, model_labels)
+        codes = self.cell.reindex(onehot.respondents, fill_value=-1).to_numpy()
+        known = codes >= 0
+        return np.stack([
+            np.bincount(codes[known & (stages >= i + 1)], minlength=len(self.cells))
+            for i in range(len(STAGES))
+        ], axis=1)
+
+    def segments(self, dimensions=SEGMENT_DIMENSIONS, cross=False):
+        """
+        One segment per value of each dimension (age / gender groups, N/A
+        left out; product categories, "Both" buyers in each), or one per
+        combination of values across the dimensions with cross. Empty
+        segments are dropped.
+        """
+        options = []
+        for dim in dimensions:
+            if dim == "product":
+                options.append([(c, self.cells[c].to_numpy()) for c in PRODUCT_CATEGORIES])
+            else:
+                values = sorted(v for v in self.cells[dim].unique() if v not in ("", "N/A"))
+                options.append([(v, (self.cells[dim] == v).to_numpy()) for v in values])
+
+        if cross:
+            segments = [
+                (" · ".join(label for label, _ in combo), np.logical_and.reduce([m for _, m in combo]))
+                for combo in itertools.product(*options)
+            ]
+        else:
+            segments = [segment for values in options for segment in values]
+        return [(label, mask) for label, mask in segments if mask.any()]
+
+    def _bar_cell(self, chart, selected):
+        cube = chart["cube"]
+        counts = cube[cube.index.get_level_values(0).isin(selected)].groupby(level=1).sum()
+        if chart["order"]:
+            counts = counts.reindex(chart["order"], fill_value=0)
+        else:
+            counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+        position = {a: i for i, a in enumerate(chart["answers"])}
+        return {
+            "n": int(chart["base"][selected].sum()),
+            "rows": [[position[str(a)], int(c)] for a, c in counts.items()],
+        }
+
+    def _heatmap_long(self, chart, selected):
+        """
+        (respondents per age × answer, respondents per age) of the selected cells.
+        """
+        cube = chart["cube"]
+        cube = cube[cube.index.get_level_values(0).isin(selected)]
+        long = pd.DataFrame({
+            "age_norm": self.cells["age"].to_numpy()[cube.index.get_level_values(0)],
+            chart["answer_col"]: cube.index.get_level_values(1),
+            "Count": cube.to_numpy(),
+        })
+        long = long[long["age_norm"] != ""]
+        bases = pd.Series(chart["people"][selected], index=self.cells["age"].to_numpy()[selected])
+        bases = bases[bases.index != ""].groupby(level=0).sum()
+        return long.groupby(["age_norm", chart["answer_col"]], as_index=False)["Count"].sum(), bases
+
+    def packs(self, segments):
+        """
+        [(label, respondents, charts)] per segment; each chart carries the
+        segment's aggregates as "cell", in the shape dashboard_charts uses.
+        """
+        selected = [np.flatnonzero(mask) for _, mask in segments]
+        packs = [[] for _ in segments]
+        for chart in self.charts:
+            spec = {k: v for k, v in chart.items() if k not in ("cube", "base", "people", "order")}
+            if chart["kind"] == "bar":
+                for pack, cells in zip(packs, selected):
+                    pack.append(dict(spec, cell=self._bar_cell(chart, cells)))
+            elif chart["kind"] == "funnel":
+                for pack, cells in zip(packs, selected):
+                    rows = chart["cube"][cells].sum(axis=0)
+                    pack.append(dict(spec, cell={"rows": [int(r) for r in rows]}))
+            else:
+                self._heatmap_cells(chart, spec, selected, packs)
+        return [
+            (label, int(self.people[cells].sum()), pack)
+            for (label, _), cells, pack in zip(segments, selected, packs)
+        ]
+
+    def _heatmap_cells(self, chart, spec, selected, packs):
+        chart = dict(chart, answer_col="Answer")
+        longs = [self._heatmap_long(chart, cells) for cells in selected]
+        nonempty = [i for i, (long, _) in enumerate(longs) if len(long)]
+        annotated, results = annotate_multiselect(
+            [longs[i][0] for i in nonempty], [longs[i][1] for i in nonempty], "age_norm", "Answer"
+        )
+        by_segment = dict(zip(nonempty, zip(annotated, results)))
+
+        ages = sorted(a for a in self.cells["age"].unique() if a)
+        age_position = {a: i for i, a in enumerate(ages)}
+        position = {a: i for i, a in enumerate(chart["answers"])}
+        for i, (pack, cells) in enumerate(zip(packs, selected)):
+            cell = {"n": int(chart["base"][cells].sum()), "rows": []}
+            if i in by_segment:
+                frame, result = by_segment[i]
+                cell["rows"] = [
+                    [age_position[r["age_norm"]], position[str(r["Answer"])], int(r["Count"]),
+                     round(float(r["Expected"]), 2), round(float(r["Residual"]), 2),
+                     round(float(r["CellP"]), 4), r["Signal"]]
+                    for r in frame.to_dict(orient="records")
+                ]
+                cell["tested"] = len(result["tests"])
+                cell["significant"] = result["significant"]
+            pack.append(dict(spec, ages=ages, cell=cell))
+
+
+def render_pack(segment, respondents, charts, fmt, out, dpi, model_labels=True, path=INPUT_FILE):
+    """
+    Worker: one segment's deck (cover + dashboard charts), written page
+    by page. Returns (output path, pages, seconds).
+    """
+    start = time.perf_counter()
+    cover = {
+        "segment": segment,
+        "source": os.path.basename(path),
+        "respondents": respondents,
+        "charts": len(charts),
+        "labels": model_labels,
+        "date": datetime.date.today().strftime("%d %b %Y"),
+    }
+    deck = DECKS[fmt](out, dpi)
+    try:
+        deck.add_figure(draw_page("cover", cover))
+        for chart in charts:
+            deck.add_figure(draw_page("dashboard", chart))
+    finally:
+        deck.close()
+    return out, len(charts) + 1, time.perf_counter() - start
+
+
+def build_segment_packs(path=INPUT_FILE, dimensions=SEGMENT_DIMENSIONS, cross=False,
+                        fmt="pdf", out_dir=SEGMENT_DIR, workers=None, dpi=DPI, model_labels=True):
+    """
+    Normalizes and builds the segment cube once, derives every segment's
+    charts from it, then renders the packs concurrently.
+    Returns the output paths.
+    """
+    start = time.perf_counter()
+    cube = SegmentCube(path, model_labels)
+    segments = cube.segments(dimensions, cross)
+    packs = cube.packs(segments)
+    print(f"Cube built and {len(packs)} segments derived in {time.perf_counter() - start:.2f}s")
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(None,)) as pool:
+        futures = {
+            pool.submit(render_pack, label, respondents, charts, fmt,
+                        os.path.join(out_dir, f"{slug(label)}.{fmt}"), dpi, model_labels, path): label
+            for label, respondents, charts in packs
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            out, pages, seconds = future.result()
+            paths.append(out)
+            print(f"✅ [{i}/{len(packs)}] {futures[future]} → {out} ({pages} pages, {seconds:.2f}s)")
+
+    print(f"\nWrote {len(paths)} segment packs to {out_dir} in {time.perf_counter() - start:.2f}s")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the insights report deck in one pass")
+    parser.add_argument("--format", choices=list(DECKS), default="pdf")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=DPI)
+    parser.add_argument("--segments", nargs="+", choices=SEGMENT_DIMENSIONS,
+                        help="one pack per segment of these dimensions, into --out (a folder)")
+    parser.add_argument("--cross", action="store_true", help="segments = combinations across --segments")
+    parser.add_argument("--rules-only", action="store_true",
+                        help="leave answers labelled by the fallback classifier out of the dashboard charts")
+    args = parser.parse_args()
+
+    if args.format == "pptx" and importlib.util.find_spec("pptx") is None:
+        sys.exit("❌ PPTX export needs python-pptx: pip install python-pptx")
+
+    if args.segments:
+        build_segment_packs(args.input, args.segments, args.cross, args.format,
+                            args.out or SEGMENT_DIR, args.workers, args.dpi, not args.rules_only)
+    else:
+        build_report(args.input, args.format, args.out, args.workers, args.dpi, not args.rules_only)
+
+
+if __name__ == "__main__":
+    main()
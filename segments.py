@@ -0,0 +1,108 @@
+# Segment drill-down over packed respondent bitmaps.
+#
+# Every indicator-matrix column (question = answer) is stored as a packed
+# bitmap over respondent ids. A predicate is an OR of answer bitmaps
+# (optionally negated), a segment is the AND of its predicates, and the
+# distribution of every answer inside a segment is one popcount of
+# (column bitmaps & segment bitmap). Weighted distributions sum respondent
+# weights over the segment's rows of the indicator matrix instead.
+
+import numpy as np
+import pandas as pd
+
+from multiselect_bits import popcount
+
+
+class SegmentIndex:
+    """
+    Packed bitmaps (answers × bytes) built once from an IndicatorMatrix.
+    """
+
+    def __init__(self, onehot):
+        self.onehot = onehot
+        self.columns = onehot.columns
+        self.n = onehot.matrix.shape[0]
+
+        dense = onehot.matrix.T.toarray().astype(bool)
+        self.bitmaps = np.packbits(dense, axis=1)
+
+        # respondents per question (answered at least one of its answers)
+        self.answered = {
+            q: np.bitwise_or.reduce(self.bitmaps[sl], axis=0)
+            for q, sl in onehot.slices.items()
+        }
+
+        self.everyone = np.packbits(np.ones(self.n, dtype=bool))
+
+    def known(self, predicates):
+        """
+        Splits predicates built on another wave into the ones this index can
+        evaluate (answers it does not have removed) and the removed
+        (question, answer) pairs. An answer nobody gave here matches no one.
+        """
+        kept, dropped = [], []
+        for question, answers, exclude in predicates:
+            vocabulary = set(self.onehot.answers(question)) if question in self.answered else set()
+            kept.append((question, [a for a in answers if a in vocabulary], exclude))
+            dropped.extend((question, a) for a in answers if a not in vocabulary)
+        return kept, dropped
+
+    def predicate(self, question, answers, exclude=False):
+        """
+        Bitmap of respondents who gave any of `answers` to `question`
+        (or, with exclude=True, who answered it but none of them).
+        """
+        if question not in self.answered:
+            return np.zeros_like(self.everyone)
+
+        cols = [self.onehot.column(question, a) for a in answers]
+        hit = np.bitwise_or.reduce(self.bitmaps[cols], axis=0) if cols else np.zeros_like(self.everyone)
+
+        if exclude:
+            return self.answered[question] & ~hit
+        return hit
+
+    def segment(self, predicates):
+        """
+        predicates: [(question, [answers], exclude), ...] — all must hold.
+        """
+        bitmap = self.everyone.copy()
+        for question, answers, exclude in predicates:
+            bitmap &= self.predicate(question, answers, exclude)
+        return bitmap
+
+    def rest(self, bitmap):
+        """
+        Bitmap of every respondent outside the segment.
+        """
+        return self.everyone & ~bitmap
+
+    def size(self, bitmap):
+        return int(popcount(bitmap).sum())
+
+    def rows(self, bitmap):
+        """
+        Boolean respondent mask (indicator-matrix row order).
+        """
+        return np.unpackbits(bitmap, count=self.n).astype(bool)
+
+    def distributions(self, bitmap, weights=None):
+        """
+        Count and % of segment respondents for every answer of every question.
+        Pct base = segment respondents who answered that question.
+        weights: optional respondent weights (indicator-matrix row order);
+        counts and bases are then sums of weights.
+        """
+        if weights is None:
+            counts = popcount(self.bitmaps & bitmap).sum(axis=1)
+            base = {q: self.size(a & bitmap) for q, a in self.answered.items()}
+        else:
+            w = np.where(self.rows(bitmap), weights, 0.0)
+            counts = self.onehot.matrix.T @ w
+            base = {q: float(w[self.rows(a)].sum()) for q, a in self.answered.items()}
+
+        out = self.columns.copy()
+        out["Count"] = counts
+        out["Base"] = out["question"].map(base)
+        out["Pct"] = np.where(out["Base"] > 0, out["Count"] / out["Base"].where(out["Base"] > 0), 0) * 100
+        return out
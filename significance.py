@@ -0,0 +1,194 @@
+# Chi-square significance for crosstabs (age group × answer heatmaps).
+#
+# All crosstabs are padded into one (k, rows, cols) array so expected
+# counts, adjusted standardized residuals and p-values are computed in a
+# single NumPy pass, whatever the number of tables.
+#
+# Multi-select questions (motivation, occasion, discovery) are not tested
+# on the exploded mentions, where one respondent counts several times:
+# each answer gets its own respondent-level picked / not picked table
+# (annotate_multiselect).
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+ALPHA = 0.05
+
+
+def batch_significance(tables):
+    """
+    tables: list of count DataFrames (rows × cols).
+    Returns one dict per table with:
+      - expected, residual, cell_p: DataFrames shaped like the table
+      - chi2, dof, p_value: overall test of independence
+    """
+    if not tables:
+        return []
+
+    n_rows = max(t.shape[0] for t in tables)
+    n_cols = max(t.shape[1] for t in tables)
+
+    obs = np.zeros((len(tables), n_rows, n_cols))
+    for i, t in enumerate(tables):
+        obs[i, :t.shape[0], :t.shape[1]] = t.to_numpy(dtype=float)
+
+    row_tot = obs.sum(axis=2, keepdims=True)
+    col_tot = obs.sum(axis=1, keepdims=True)
+    n = obs.sum(axis=(1, 2), keepdims=True)
+    n_safe = np.where(n > 0, n, 1)
+
+    expected = row_tot * col_tot / n_safe
+
+    # adjusted standardized residual (Haberman)
+    var = expected * (1 - row_tot / n_safe) * (1 - col_tot / n_safe)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        residual = np.where(var > 0, (obs - expected) / np.sqrt(var), 0.0)
+        contrib = np.where(expected > 0, (obs - expected) ** 2 / expected, 0.0)
+
+    chi2 = contrib.sum(axis=(1, 2))
+
+    # padded / empty rows and cols do not count towards degrees of freedom
+    live_rows = (row_tot[:, :, 0] > 0).sum(axis=1)
+    live_cols = (col_tot[:, 0, :] > 0).sum(axis=1)
+    dof = np.clip(live_rows - 1, 0, None) * np.clip(live_cols - 1, 0, None)
+
+    p_value = np.where(dof > 0, stats.chi2.sf(chi2, np.maximum(dof, 1)), 1.0)
+    cell_p = 2 * stats.norm.sf(np.abs(residual))
+
+    results = []
+    for i, t in enumerate(tables):
+        r, c = t.shape
+
+        def frame(a):
+            return pd.DataFrame(a[i, :r, :c], index=t.index, columns=t.columns)
+
+        results.append({
+            "expected": frame(expected),
+            "residual": frame(residual),
+            "cell_p": frame(cell_p),
+            "chi2": float(chi2[i]),
+            "dof": int(dof[i]),
+            "p_value": float(p_value[i]),
+        })
+
+    return results
+
+
+def annotate_crosstabs(long_frames, row_col, col_col, count_col="Count", alpha=ALPHA):
+    """
+    Adds Expected / Residual / CellP / Signal columns to long-format
+    crosstabs (one row per row_col × col_col cell, as used by the heatmaps).
+    Signal is "▲" (over-indexed), "▼" (under-indexed) or "".
+    Returns (annotated frames, overall results) in input order.
+    """
+    tables = [
+        f.pivot_table(index=row_col, columns=col_col, values=count_col,
+                      aggfunc="sum", fill_value=0)
+        for f in long_frames
+    ]
+    results = batch_significance(tables)
+
+    annotated = []
+    for f, res in zip(long_frames, results):
+        cells = pd.concat(
+            {
+                "Expected": res["expected"].stack(),
+                "Residual": res["residual"].stack(),
+                "CellP": res["cell_p"].stack(),
+            },
+            axis=1
+        ).reset_index()
+
+        out = f.merge(cells, on=[row_col, col_col], how="left")
+
+        sig = out["CellP"] < alpha
+        out["Signal"] = np.where(
+            sig & (out["Residual"] > 0), "▲",
+            np.where(sig & (out["Residual"] < 0), "▼", "")
+        )
+        annotated.append(out)
+
+    return annotated, results
+
+
+def respondent_crosstab(frame, row_col, col_col, weight_col=None):
+    """
+    Respondent-level counts of a multi-select question from an exploded
+    frame (index = respondent id), i.e. its respondent × answer one-hot
+    summed per row_col group:
+      - long frame [row_col, col_col, Count]: respondents picking each answer
+      - Series: respondents per row_col group (who answered the question)
+    A respondent counts once per answer, however many of their mentions map
+    to it. With weight_col, respondents count with their weight.
+    """
+    onehot = frame[~frame.set_index(col_col, append=True).index.duplicated()]
+    people = frame[~frame.index.duplicated()]
+
+    if weight_col is None:
+        long = onehot.groupby([row_col, col_col]).size().reset_index(name="Count")
+        bases = people.groupby(row_col).size()
+    else:
+        long = onehot.groupby([row_col, col_col])[weight_col].sum().reset_index(name="Count")
+        bases = people.groupby(row_col)[weight_col].sum()
+    return long, bases
+
+
+def annotate_multiselect(long_frames, bases, row_col, col_col, count_col="Count", alpha=ALPHA):
+    """
+    annotate_crosstabs for multi-select questions, where one respondent can
+    sit in several cells of a row and a single chi-square over the mentions
+    would count them more than once. Each answer is tested on its own
+    rows × (picked, not picked) table of respondents instead; all the
+    tables of all the frames go through one batch_significance pass.
+
+    long_frames: respondents picking each answer per row_col group
+    bases: respondents per row_col group, one Series per frame
+    Cell columns are those of annotate_crosstabs (the picked column of the
+    answer's table). Results carry "tests" (chi2 / dof / p_value per
+    answer) and "significant" (answers with p < alpha) instead of a single
+    overall test.
+    """
+    tables, keys = [], []
+    for i, (f, base) in enumerate(zip(long_frames, bases)):
+        picked = f.pivot_table(index=row_col, columns=col_col, values=count_col,
+                               aggfunc="sum", fill_value=0)
+        picked = picked.reindex(base.index, fill_value=0)
+        for answer in picked.columns:
+            tables.append(pd.DataFrame({
+                "picked": picked[answer],
+                "not picked": (base - picked[answer]).clip(lower=0),
+            }))
+            keys.append((i, answer))
+    results = batch_significance(tables)
+
+    per_frame = [([], []) for _ in long_frames]
+    for (i, answer), res in zip(keys, results):
+        cells, tests = per_frame[i]
+        cells.append(pd.DataFrame({
+            row_col: res["expected"].index,
+            col_col: answer,
+            "Expected": res["expected"]["picked"].to_numpy(),
+            "Residual": res["residual"]["picked"].to_numpy(),
+            "CellP": res["cell_p"]["picked"].to_numpy(),
+        }))
+        tests.append({"answer": answer, "chi2": res["chi2"], "dof": res["dof"], "p_value": res["p_value"]})
+
+    annotated, overall = [], []
+    for f, (cells, tests) in zip(long_frames, per_frame):
+        cells = pd.concat(cells, ignore_index=True) if cells else pd.DataFrame(
+            columns=[row_col, col_col, "Expected", "Residual", "CellP"]
+        )
+        out = f.merge(cells, on=[row_col, col_col], how="left")
+
+        sig = out["CellP"] < alpha
+        out["Signal"] = np.where(
+            sig & (out["Residual"] > 0), "▲",
+            np.where(sig & (out["Residual"] < 0), "▼", "")
+        )
+        annotated.append(out)
+
+        tests = pd.DataFrame(tests, columns=["answer", "chi2", "dof", "p_value"]).set_index("answer")
+        overall.append({"tests": tests, "significant": int((tests["p_value"] < alpha).sum())})
+
+    return annotated, overall
@@ -0,0 +1,676 @@
+# Static, read-only export of the dashboard.
+#
+# For every wave, each chart of the filterable tabs is aggregated for every
+# age × gender filter combination ("All" included) — the same counts, bases
+# and significance markers app.py computes live (unweighted; classifier
+# labels included unless --rules-only). Waves are built concurrently in
+# worker processes.
+#
+# Output:
+#   <out>/data/<wave>.json   compact aggregates, one file per wave
+#   <out>/index.html         self-contained viewer (data inlined, charts drawn
+#                            client-side with vega-embed), no server needed
+#
+# CLI:
+#   python static_export.py                          (all waves -> dashboard_export/)
+#   python static_export.py --out public --workers 2
+#   python static_export.py --rules-only             (leave out classifier labels)
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from association import cluster_order, load_association
+from brand_funnel import brand_funnel
+from dashboard_layout import BRAND_STAGE_COLORS, CHART_COLORS, GENDER_COLORS, TAB_TITLES
+from journey import STAGES, load_stages
+from multiselect_bits import encode_question
+from significance import ALPHA, annotate_multiselect, respondent_crosstab
+from survey_pipeline import TENURE_BUCKETS, load_survey, rule_labels_only
+from waves import WAVES
+
+OUT_DIR = "dashboard_export"
+
+TENURE_LABELS = [label for label, _ in TENURE_BUCKETS]
+
+INVALID_AGES = {"n/a", "not responded", "don't know", "dont know", ""}
+
+# tab -> charts, mirroring app.py (titles and colours from dashboard_layout).
+# A chart counts `col` over the rows of frame `frame`; Pct is relative to
+# the rows of `base` (default: `frame`), for heatmaps to the respondents
+# of each age group. brand_stages / matrix charts are counted from the
+# indicator matrix. Not exported: the interactive tabs
+# (Segment Builder, Waves, What Changed, Search, Unmapped Clusters), the
+# Gender tab's age × gender bars and the Recency tab's tenure heatmaps.
+# Associations are whole-wave (the age / gender filters do not apply).
+TABS = [
+    (TAB_TITLES["demographics"], [
+        {"id": "age", "kind": "bar", "title": "Respondent Profile", "frame": "demo",
+         "col": "age_norm", "label": "Age", "color": CHART_COLORS["age"]},
+    ]),
+    (TAB_TITLES["gender"], [
+        {"id": "gender", "kind": "bar", "title": "Gender Distribution", "frame": "gender",
+         "col": "gender_norm", "label": "Gender", "color": GENDER_COLORS["Female"]},
+    ]),
+    (TAB_TITLES["discovery"], [
+        {"id": "discovery", "kind": "bar", "title": "How customers discovered GO DESi",
+         "frame": "disc", "col": "discovery_norm", "label": "Channel", "color": CHART_COLORS["discovery"],
+         "note": "Discovery is multi-select, so totals can exceed 100%."},
+    ]),
+    (TAB_TITLES["consumption"], [
+        {"id": "consumption_frequency", "kind": "bar",
+         "title": "How often consumers eat packaged sweets", "frame": "freq",
+         "col": "consumption_frequency_norm", "label": "Frequency",
+         "color": CHART_COLORS["consumption_frequency"]},
+        {"id": "consumption_occasion", "kind": "bar",
+         "title": "When consumers eat packaged sweets", "frame": "occ", "base": "freq",
+         "col": "occasion_norm", "label": "Occasion", "color": CHART_COLORS["consumption_occasion"]},
+        {"id": "consumption_heatmap", "kind": "heatmap",
+         "title": "Age Group vs Consumption Context", "frame": "occ", "base": "freq",
+         "col": "occasion_norm", "label": "Consumption Moment",
+         "note": "Multi-select responses may exceed 100%."},
+    ]),
+    (TAB_TITLES["perception"], [
+        {"id": "perception", "kind": "bar", "title": "How consumers perceive GO DESi (Desi Popz)",
+         "frame": "perception", "col": "perception_norm", "label": "Perception",
+         "color": CHART_COLORS["perception"]},
+    ]),
+    (TAB_TITLES["motivation"], [
+        {"id": "motivation", "kind": "bar", "title": "Why consumers choose GO DESi",
+         "frame": "motivation", "col": "motivation_norm", "label": "Motivation",
+         "color": CHART_COLORS["motivation"]},
+        {"id": "motivation_heatmap", "kind": "heatmap",
+         "title": "Age Group vs Purchase Motivation", "frame": "motivation",
+         "col": "motivation_norm", "label": "Motivation",
+         "note": "Motivation is multi-select, so totals can exceed 100%."},
+    ]),
+    (TAB_TITLES["awareness"], [
+        {"id": "brand_awareness", "kind": "bar",
+         "title": "Other packaged Indian sweet brands consumers are aware of",
+         "frame": "brand", "col": "brand_awareness_norm", "label": "Brand",
+         "color": CHART_COLORS["brand_awareness"]},
+        {"id": "co_recall", "kind": "matrix", "question": "top_3_packaged_brands",
+         "title": "Brands recalled together (Top 3 spontaneous recall)",
+         "label": "Brand", "value": "Count",
+         "note": "Diagonal = respondents recalling the brand; off-diagonal = recalled together."},
+    ]),
+    (TAB_TITLES["preference"], [
+        {"id": "brand_preference", "kind": "bar", "title": "Preferred packaged Indian sweets brand",
+         "frame": "pref", "col": "preferred_brand_norm", "label": "Brand",
+         "color": CHART_COLORS["brand_preference"]},
+    ]),
+    (TAB_TITLES["linkage"], [
+        {"id": "brand_linkage", "kind": "bar",
+         "title": "Awareness of GO DESi’s Indian sweets portfolio",
+         "frame": "linkage", "col": "linkage_norm", "label": "Response",
+         "color": CHART_COLORS["brand_linkage"]},
+    ]),
+    (TAB_TITLES["associations"], [
+        {"id": "associations", "kind": "matrix", "title": "Which survey questions relate to each other",
+         "label": "Question", "value": "V", "unfiltered": True, "domain": [0, 1],
+         "note": "Bias-corrected Cramér's V (0 = unrelated, 1 = fully determined), whole wave "
+                 "(the age / gender filters do not apply)."},
+    ]),
+    (TAB_TITLES["journey"], [
+        {"id": "journey", "kind": "funnel", "title": "GO DESi Consumer Journey Funnel",
+         "label": "Stage", "color": CHART_COLORS["journey"],
+         "note": "Discovery = named a discovery channel · Trial = reported eat frequency · "
+                 "Habit = eats at least weekly · "
+                 "Advocacy = prefers GO DESi, shares it socially or buys it as a gift."},
+    ]),
+    (TAB_TITLES["brand_funnel"], [
+        {"id": "brand_funnel", "kind": "brand_stages",
+         "title": "Brand conversion: aware → recalled → preferred",
+         "label": "Brand", "colors": BRAND_STAGE_COLORS,
+         "note": "All brands, most aware first. "
+                 "Aware = named the brand in Column L, M or N · Recalled = spontaneous top 3 (M) · "
+                 "Preferred = preferred brand (N)."},
+    ]),
+    (TAB_TITLES["recency"], [
+        {"id": "tenure", "kind": "bar", "title": "When customers first heard about GO DESi",
+         "frame": "tenure", "col": "tenure_norm", "label": "Tenure", "color": CHART_COLORS["tenure"],
+         "order": TENURE_LABELS},
+    ]),
+]
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def export_frames(frames):
+    """
+    The frames the exported tabs read, prepared the way app.py prepares them.
+    """
+    master = frames["master"]
+
+    demo = master[
+        master["age_norm"].notna() &
+        ~master["age_norm"].astype(str).str.strip().str.lower().isin(INVALID_AGES)
+    ]
+    return {
+        "demo": demo,
+        "gender": master[master["gender_norm"].isin(["Female", "Male"])],
+        "disc": frames["disc"],
+        "freq": frames["freq"],
+        "occ": frames["occ"],
+        "perception": frames["perception"],
+        "motivation": frames["motivation"],
+        "brand": frames["brand"],
+        "pref": frames["pref"],
+        "linkage": frames["linkage"],
+        "tenure": master[master["tenure_norm"].isin(TENURE_LABELS)],
+    }
+
+
+def combos(ages, genders):
+    """
+    Every (age, gender) filter state, "All" included, in selectbox order.
+    """
+    return [(a, g) for a in ["All"] + ages for g in ["All"] + genders]
+
+
+def combo_key(age, gender):
+    return f"{age}|{gender}"
+
+
+def filter_frame(frame, age, gender):
+    if age != "All":
+        frame = frame[frame["age_norm"] == age]
+    if gender != "All":
+        frame = frame[frame["gender_norm"] == gender]
+    return frame
+
+
+def bar_aggregates(chart, sources, states):
+    """
+    {answers, data: {combo: {n, rows: [[answer index, count], ...]}}};
+    rows follow value_counts order (or the chart's fixed order).
+    """
+    frame = sources[chart["frame"]]
+    base = sources[chart.get("base", chart["frame"])]
+    answers = chart.get("order") or sorted(frame[chart["col"]].dropna().astype(str).unique())
+    position = {a: i for i, a in enumerate(answers)}
+
+    data = {}
+    for age, gender in states:
+        counts = filter_frame(frame, age, gender)[chart["col"]].value_counts()
+        if chart.get("order"):
+            counts = counts.reindex(chart["order"], fill_value=0)
+        data[combo_key(age, gender)] = {
+            "n": int(len(filter_frame(base, age, gender))),
+            "rows": [[position[str(a)], int(c)] for a, c in counts.items()],
+        }
+    return {"answers": answers, "data": data}
+
+
+def heatmap_aggregates(chart, sources, states, ages):
+    """
+    Age × answer cells per combo with the significance columns of the app's
+    heatmaps: rows [age index, answer index, count, expected, residual, p, signal]
+    and bases [respondents per age index]. The heatmap questions are
+    multi-select, so counts are respondents, Pct is of the age group's
+    respondents and each answer is tested on its own (see
+    significance.annotate_multiselect).
+    """
+    frame = sources[chart["frame"]]
+    base = sources[chart.get("base", chart["frame"])]
+    col = chart["col"]
+    answers = sorted(frame[col].dropna().astype(str).unique())
+    position = {a: i for i, a in enumerate(answers)}
+    age_position = {a: i for i, a in enumerate(ages)}
+
+    crosstabs = [respondent_crosstab(filter_frame(frame, age, gender), "age_norm", col) for age, gender in states]
+    nonempty = [i for i, (long, _) in enumerate(crosstabs) if len(long)]
+    annotated, results = annotate_multiselect(
+        [crosstabs[i][0] for i in nonempty], [crosstabs[i][1] for i in nonempty], "age_norm", col
+    )
+    by_state = dict(zip(nonempty, zip(annotated, results)))
+
+    data = {}
+    for i, (age, gender) in enumerate(states):
+        bases = crosstabs[i][1]
+        entry = {
+            "n": int(len(filter_frame(base, age, gender))),
+            "bases": [int(bases.get(a, 0)) for a in ages],
+            "rows": [],
+        }
+        if i in by_state:
+            cells, result = by_state[i]
+            entry["rows"] = [
+                [age_position[r["age_norm"]], position[str(r[col])], int(r["Count"]),
+                 round(float(r["Expected"]), 2), round(float(r["Residual"]), 2),
+                 round(float(r["CellP"]), 4), r["Signal"]]
+                for r in cells.to_dict(orient="records")
+            ]
+            entry["tested"] = len(result["tests"])
+            entry["significant"] = result["significant"]
+            entry["alpha"] = ALPHA
+        data[combo_key(age, gender)] = entry
+    return {"answers": answers, "ages": ages, "data": data}
+
+
+def combo_rows(people, age, gender):
+    """
+    Boolean mask over indicator-matrix rows for one age × gender combo
+    (people: master sheet reindexed to the matrix rows).
+    """
+    rows = np.ones(len(people), dtype=bool)
+    if age != "All":
+        rows &= (people["age_norm"] == age).to_numpy()
+    if gender != "All":
+        rows &= (people["gender_norm"] == gender).to_numpy()
+    return rows
+
+
+def funnel_aggregates(people, stages, states):
+    """
+    Respondents reaching each journey stage, per combo.
+    """
+    data = {}
+    for age, gender in states:
+        rows = combo_rows(people, age, gender)
+        data[combo_key(age, gender)] = {
+            "rows": [int((stages[rows] >= i + 1).sum()) for i in range(len(STAGES))]
+        }
+    return {"answers": STAGES, "data": data}
+
+
+def co_recall_aggregates(chart, onehot, people, states):
+    """
+    Answer × answer respondent counts of a multi-select question, per combo:
+    rows [answer index, answer index, count] (non-zero cells only).
+    """
+    if chart["question"] not in onehot.slices:
+        return {"answers": [], "data": {combo_key(a, g): {"n": 0, "rows": []} for a, g in states}}
+
+    bits = encode_question(onehot, chart["question"])
+    data = {}
+    for age, gender in states:
+        rows = combo_rows(people, age, gender)
+        counts = bits.cooccurrence(rows).to_numpy()
+        data[combo_key(age, gender)] = {
+            "n": bits.respondents_answered(rows),
+            "rows": [[int(i), int(j), int(counts[i, j])] for i, j in zip(*np.nonzero(counts))],
+        }
+    return {"answers": bits.answers, "data": data}
+
+
+def association_aggregates(path, respondents, model_labels=True):
+    """
+    Cramér's V for every question pair in clustered order, whole wave only
+    (stored under the All | All combo).
+    """
+    assoc = load_association(path, model_labels)
+    order = cluster_order(assoc)
+    values = assoc.loc[order, order].to_numpy()
+    rows = [[i, j, round(float(values[i, j]), 3)] for i in range(len(order)) for j in range(len(order))]
+    return {"answers": order, "data": {combo_key("All", "All"): {"n": respondents, "rows": rows}}}
+
+
+def brand_stage_aggregates(onehot, people, states):
+    """
+    Aware / recalled / preferred respondents of every brand (the dashboard
+    table's order over the whole wave), per combo: rows [brand index,
+    aware, recalled, preferred].
+    """
+    brands = brand_funnel(onehot, np.ones(len(people), dtype=bool))["Brand"].tolist()
+    data = {}
+    for age, gender in states:
+        rows = combo_rows(people, age, gender)
+        table = brand_funnel(onehot, rows).set_index("Brand")
+        data[combo_key(age, gender)] = {
+            "n": int(rows.sum()),
+            "rows": [
+                [i, int(table.at[b, "Aware"]), int(table.at[b, "Recalled"]), int(table.at[b, "Preferred"])]
+                for i, b in enumerate(brands) if b in table.index
+            ],
+        }
+    return {"answers": brands, "data": data}
+
+
+def export_wave(name, path, model_labels=True):
+    """
+    Worker: every tab's aggregates for one wave, as a JSON-ready dict
+    (model_labels=False: without the classifier's labels).
+    """
+    start = time.perf_counter()
+    version, frames = load_survey(path)
+    if not model_labels:
+        frames = rule_labels_only(frames)
+    master = frames["master"]
+    sources = export_frames(frames)
+    onehot, stages = load_stages(path, model_labels)
+    people = master.reindex(onehot.respondents)
+
+    ages = sorted(master["age_norm"].dropna().unique().tolist())
+    genders = sorted(master["gender_norm"].dropna().unique().tolist())
+    states = combos(ages, genders)
+
+    tabs = []
+    for tab, charts in TABS:
+        out = []
+        for chart in charts:
+            spec = {k: v for k, v in chart.items() if k not in ("frame", "base", "col", "order", "question")}
+            if chart["kind"] == "bar":
+                spec.update(bar_aggregates(chart, sources, states))
+            elif chart["kind"] == "heatmap":
+                spec.update(heatmap_aggregates(chart, sources, states, ages))
+            elif chart["kind"] == "funnel":
+                spec.update(funnel_aggregates(people, stages, states))
+            elif chart["kind"] == "brand_stages":
+                spec.update(brand_stage_aggregates(onehot, people, states))
+            elif "question" in chart:
+                spec.update(co_recall_aggregates(chart, onehot, people, states))
+            else:
+                spec.update(association_aggregates(path, int(len(master)), model_labels))
+            out.append(spec)
+        tabs.append({"name": tab, "charts": out})
+
+    return {
+        "wave": name,
+        "version": version,
+        "respondents": int(len(master)),
+        "ages": ages,
+        "genders": genders,
+        "tabs": tabs,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def write_bundle(exports, out_dir, model_labels=True):
+    """
+    data/<wave>.json per wave + index.html with every wave inlined.
+    Returns the written paths.
+    """
+    os.makedirs(os.path.join(out_dir, "data"), exist_ok=True)
+    paths = []
+    for export in exports:
+        path = os.path.join(out_dir, "data", f"{slug(export['wave'])}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(export, f, ensure_ascii=False, separators=(",", ":"))
+        paths.append(path)
+
+    payload = json.dumps(exports, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    labels = "classifier labels included" if model_labels else "classifier labels left out"
+    html = HTML_TEMPLATE.replace("__LABELS__", labels).replace("__DATA__", payload)
+    path = os.path.join(out_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    paths.append(path)
+    return paths
+
+
+def export_all(waves=WAVES, out_dir=OUT_DIR, workers=None, model_labels=True):
+    start = time.perf_counter()
+    waves = [(name, path) for name, path in waves if os.path.exists(path)]
+
+    exports = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(export_wave, name, path, model_labels): name for name, path in waves}
+        for future in as_completed(futures):
+            export = future.result()
+            exports[export["wave"]] = export
+            print(f"✅ {export['wave']}: {export['respondents']} respondents ({export['seconds']:.2f}s)")
+
+    paths = write_bundle([exports[name] for name, _ in waves], out_dir, model_labels)
+    size = sum(os.path.getsize(p) for p in paths)
+    print(f"\nWrote {len(paths)} files ({size / 1024:.0f} KB) to {out_dir} in {time.perf_counter() - start:.2f}s")
+    return paths
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>GO DESi · Consumer Insights (static)</title>
+<script src="https://cdn.jsdelivr.net/npm/vega@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>
+<style>
+  body { background: #0E1117; color: #FAFAFA; font-family: "Source Sans Pro", sans-serif; margin: 0 40px 40px; }
+  .hero-box { background-color: #F28C28; padding: 16px 30px; border-radius: 15px; margin: 30px 0; color: white; }
+  .hero-title { font-size: 30px; font-weight: 700; }
+  .hero-sub { font-size: 18px; opacity: 0.95; }
+  .controls { display: flex; gap: 24px; margin-bottom: 16px; }
+  .controls label { display: flex; flex-direction: column; font-size: 14px; gap: 4px; }
+  select { background: #262730; color: #FAFAFA; border: 1px solid #444; border-radius: 6px; padding: 6px 10px; min-width: 160px; }
+  .tabs { display: flex; flex-wrap: wrap; gap: 4px; border-bottom: 1px solid #31333F; margin-bottom: 20px; }
+  .tabs button { background: none; border: none; color: #FAFAFA; padding: 8px 12px; cursor: pointer; font-size: 15px; }
+  .tabs button.active { border-bottom: 2px solid #F28C28; color: #F28C28; }
+  .caption { color: #A3A8B8; font-size: 14px; margin: 4px 0 12px; }
+  .chart { width: 100%; margin-bottom: 32px; }
+</style>
+</head>
+<body>
+<div class="hero-box">
+  <div class="hero-title">Consumer Insights Dashboard</div>
+  <div class="hero-sub" id="hero-sub"></div>
+</div>
+<div class="controls">
+  <label>Wave <select id="wave"></select></label>
+  <label>Age <select id="age"></select></label>
+  <label>Gender <select id="gender"></select></label>
+</div>
+<div class="tabs" id="tabs"></div>
+<div id="content"></div>
+<p class="caption">Static export: unweighted counts (the dashboard's weighting toggle does not apply), __LABELS__. ▲ / ▼ = cell significantly over / under-indexed (adjusted residual).</p>
+<script id="data" type="application/json">__DATA__</script>
+<script>
+const WAVES = JSON.parse(document.getElementById("data").textContent);
+const CONFIG = {
+  background: "#0E1117",
+  axis: { labelColor: "#FAFAFA", titleColor: "#FAFAFA", gridColor: "#31333F", domainColor: "#31333F" },
+  legend: { labelColor: "#FAFAFA", titleColor: "#FAFAFA" },
+  view: { stroke: null }
+};
+const state = { wave: WAVES.length - 1, tab: 0, age: "All", gender: "All" };
+
+// answer labels and titles come from survey text: always set as text, never as HTML
+function el(tag, text, className) {
+  const node = document.createElement(tag);
+  if (text !== undefined) node.textContent = text;
+  if (className) node.className = className;
+  return node;
+}
+
+function fill(select, options, value) {
+  select.replaceChildren(...options.map(o => el("option", o)));
+  select.value = options.includes(value) ? value : options[0];
+}
+
+function barSpec(chart, cell) {
+  const values = cell.rows.map(([i, count]) => ({
+    label: chart.answers[i], Count: count, Pct: cell.n > 0 ? count / cell.n * 100 : 0
+  }));
+  return {
+    data: { values },
+    layer: [
+      { mark: { type: "bar", color: chart.color },
+        encoding: {
+          x: { field: "Pct", type: "quantitative", title: "% of Total Respondents" },
+          y: { field: "label", type: "nominal", sort: null, title: chart.label },
+          tooltip: [
+            { field: "label", type: "nominal", title: chart.label },
+            { field: "Pct", type: "quantitative", format: ".1f", title: "%" },
+            { field: "Count", type: "quantitative", title: "Count" }
+          ]
+        } },
+      { mark: { type: "text", align: "left", baseline: "middle", dx: 6, fontSize: 12, color: "white" },
+        transform: [{ calculate: "format(datum.Pct, '.1f') + '%'", as: "PctLabel" }],
+        encoding: {
+          x: { field: "Pct", type: "quantitative" },
+          y: { field: "label", type: "nominal", sort: null },
+          text: { field: "PctLabel", type: "nominal" }
+        } }
+    ]
+  };
+}
+
+function heatmapSpec(chart, cell) {
+  const values = cell.rows.map(([a, i, count, expected, residual, p, signal]) => ({
+    age: chart.ages[a], answer: chart.answers[i], Count: count, Expected: expected,
+    Residual: residual, CellP: p, Signal: signal,
+    Pct: cell.bases[a] > 0 ? count / cell.bases[a] * 100 : 0
+  }));
+  const xy = {
+    x: { field: "answer", type: "nominal", title: chart.label },
+    y: { field: "age", type: "nominal", title: "Age Group" }
+  };
+  return {
+    data: { values },
+    layer: [
+      { mark: "rect",
+        encoding: { ...xy,
+          color: { field: "Pct", type: "quantitative", scale: { scheme: "tealblues" } },
+          tooltip: [
+            { field: "age", title: "age_norm" }, { field: "answer", title: chart.label },
+            { field: "Pct", type: "quantitative", format: ".1f" }, { field: "Count" },
+            { field: "Expected", type: "quantitative", format: ".1f" },
+            { field: "Residual", type: "quantitative", format: ".2f", title: "Adj. residual" },
+            { field: "CellP", type: "quantitative", format: ".3f", title: "p" }
+          ] } },
+      { mark: { type: "text", fontSize: 14, color: "white" },
+        encoding: { ...xy, text: { field: "Signal", type: "nominal" } } }
+    ]
+  };
+}
+
+function funnelSpec(chart, cell) {
+  const top = cell.rows[0];
+  const values = cell.rows.map((count, i) => ({
+    Stage: chart.answers[i], Count: count,
+    Label: `${count} (${top > 0 ? Math.round(count / top * 100) : 0}%)`
+  }));
+  const y = { field: "Stage", type: "nominal", sort: chart.answers, title: null };
+  return {
+    data: { values },
+    layer: [
+      { mark: { type: "bar", color: chart.color },
+        encoding: { y, x: { field: "Count", type: "quantitative", title: "Respondents" } } },
+      { mark: { type: "text", align: "left", dx: 6, color: "white" },
+        encoding: { y, x: { field: "Count", type: "quantitative" }, text: { field: "Label" } } }
+    ]
+  };
+}
+
+function matrixSpec(chart, cell) {
+  const values = cell.rows.map(([i, j, value]) => ({
+    A: chart.answers[i], B: chart.answers[j], value,
+    Pct: cell.n > 0 ? value / cell.n * 100 : 0
+  }));
+  const xy = {
+    x: { field: "B", type: "nominal", sort: chart.answers, title: null },
+    y: { field: "A", type: "nominal", sort: chart.answers, title: null }
+  };
+  const scale = chart.domain ? { scheme: "tealblues", domain: chart.domain } : { scheme: "tealblues" };
+  const tooltip = [
+    { field: "A", title: `${chart.label} A` }, { field: "B", title: `${chart.label} B` },
+    { field: "value", type: "quantitative", format: chart.domain ? ".2f" : "d", title: chart.value }
+  ];
+  if (!chart.domain) tooltip.push({ field: "Pct", type: "quantitative", format: ".1f" });
+  const layer = [
+    { mark: "rect",
+      encoding: { ...xy, color: { field: "value", type: "quantitative", scale, title: chart.value }, tooltip } }
+  ];
+  if (chart.domain) {
+    layer.push({ mark: { type: "text", fontSize: 10, color: "white" },
+      encoding: { ...xy, text: { field: "value", type: "quantitative", format: ".2f" } } });
+  }
+  return { data: { values }, layer, height: 550 };
+}
+
+function brandStagesSpec(chart, cell) {
+  const stages = ["Aware", "Recalled", "Preferred"];
+  const values = cell.rows.flatMap(([i, ...counts]) =>
+    counts.map((count, k) => ({ Brand: chart.answers[i], Stage: stages[k], Count: count })));
+  return {
+    data: { values },
+    mark: "bar",
+    encoding: {
+      x: { field: "Brand", type: "nominal", sort: chart.answers, title: null },
+      xOffset: { field: "Stage", sort: stages },
+      y: { field: "Count", type: "quantitative", title: "Respondents" },
+      color: { field: "Stage", type: "nominal", sort: stages, scale: { range: chart.colors } },
+      tooltip: ["Brand", "Stage", "Count"]
+    }
+  };
+}
+
+const SPECS = { bar: barSpec, heatmap: heatmapSpec, funnel: funnelSpec, matrix: matrixSpec, brand_stages: brandStagesSpec };
+
+function caption(chart, cell) {
+  if (chart.kind === "funnel") return `Respondents: ${cell.rows[0]}`;
+  let text = `Respondents: ${cell.n}`;
+  if (chart.kind === "heatmap" && cell.tested !== undefined) {
+    text = `${cell.significant} of ${cell.tested} answers differ significantly by age group ` +
+      `(each tested on respondents who picked it vs not, χ² p < ${cell.alpha})`;
+  }
+  return text;
+}
+
+function render() {
+  const wave = WAVES[state.wave];
+  document.getElementById("hero-sub").textContent =
+    `Total Respondents: ${wave.respondents} · Wave: ${wave.wave}`;
+  fill(document.getElementById("age"), ["All", ...wave.ages], state.age);
+  fill(document.getElementById("gender"), ["All", ...wave.genders], state.gender);
+  state.age = document.getElementById("age").value;
+  state.gender = document.getElementById("gender").value;
+
+  document.getElementById("tabs").replaceChildren(...wave.tabs.map((t, i) => {
+    const button = el("button", t.name, i === state.tab ? "active" : "");
+    button.dataset.tab = i;
+    return button;
+  }));
+
+  const content = document.getElementById("content");
+  content.replaceChildren();
+  const key = `${state.age}|${state.gender}`;
+  for (const chart of wave.tabs[state.tab].charts) {
+    const cell = chart.data[chart.unfiltered ? "All|All" : key];
+    const block = el("div", undefined, "chart");
+    const view = el("div");
+    block.append(el("h3", chart.title), el("div", caption(chart, cell), "caption"), view);
+    if (chart.note) block.append(el("div", `Note: ${chart.note}`, "caption"));
+    content.appendChild(block);
+    const spec = { ...SPECS[chart.kind](chart, cell), width: "container", config: CONFIG };
+    vegaEmbed(view, spec, { actions: false });
+  }
+}
+
+fill(document.getElementById("wave"), WAVES.map(w => w.wave), WAVES[state.wave].wave);
+document.getElementById("wave").onchange = e => {
+  state.wave = WAVES.findIndex(w => w.wave === e.target.value); render();
+};
+document.getElementById("age").onchange = e => { state.age = e.target.value; render(); };
+document.getElementById("gender").onchange = e => { state.gender = e.target.value; render(); };
+document.getElementById("tabs").onclick = e => {
+  if (e.target.dataset.tab !== undefined) { state.tab = Number(e.target.dataset.tab); render(); }
+};
+render();
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the dashboard as a static HTML bundle")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rules-only", action="store_true",
+                        help="leave out answers labelled by the fallback classifier")
+    args = parser.parse_args()
+
+    export_all(out_dir=args.out, workers=args.workers, model_labels=not args.rules_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Respondent × answer indicator matrix (sparse one-hot of every question).
+#
+# Rows are respondent ids (master sheet index), columns are the normalized
+# answers of all questions in survey_pipeline.QUESTIONS. Cross-question
+# counts become sparse products, e.g. X[:, a].T @ X[:, b] is the a × b
+# crosstab in respondents.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from survey_pipeline import FILE, QUESTIONS, cache_path, labels_cache_name, load_survey, rule_labels_only
+
+
+class IndicatorMatrix:
+    """
+    matrix: scipy.sparse CSR (respondents × answers), 0/1
+    respondents: Index of respondent ids (row order)
+    columns: DataFrame [question, answer], one row per matrix column
+    """
+
+    def __init__(self, matrix, respondents, columns):
+        self.matrix = matrix.tocsr()
+        self.respondents = pd.Index(respondents)
+        self.columns = columns.reset_index(drop=True)
+
+        # question -> slice of its (contiguous) columns
+        self.slices = {}
+        for q, pos in self.columns.groupby("question", sort=False).indices.items():
+            self.slices[q] = slice(pos.min(), pos.max() + 1)
+
+    @property
+    def questions(self):
+        return list(self.slices)
+
+    def answers(self, question):
+        return self.columns["answer"].iloc[self.slices[question]].tolist()
+
+    def block(self, question):
+        """
+        Respondent × answer sub-matrix for one question (CSC for fast column access).
+        """
+        return self.matrix[:, self.slices[question]].tocsc()
+
+    def column(self, question, answer):
+        pos = self.columns.index[
+            (self.columns["question"] == question) & (self.columns["answer"] == answer)
+        ]
+        if len(pos) == 0:
+            raise KeyError(f"No column for {question}={answer!r}")
+        return int(pos[0])
+
+    def crosstab(self, q_rows, q_cols, rows=None):
+        """
+        Respondent counts for every answer pair of two questions.
+        rows: optional boolean mask / index array restricting respondents.
+        """
+        a = self.block(q_rows)
+        b = self.block(q_cols)
+        if rows is not None:
+            a = a[rows]
+            b = b[rows]
+
+        counts = (a.T @ b).toarray()
+        return pd.DataFrame(counts, index=self.answers(q_rows), columns=self.answers(q_cols))
+
+    def counts(self, question, rows=None):
+        """
+        Respondents per answer of one question.
+        """
+        block = self.block(question)
+        if rows is not None:
+            block = block[rows]
+        return pd.Series(
+            np.asarray(block.sum(axis=0)).ravel(),
+            index=self.answers(question)
+        )
+
+    # ---- persistence ----
+    def save(self, version, model_labels=True):
+        sparse.save_npz(cache_path(version, labels_cache_name("onehot.npz", model_labels)), self.matrix)
+        with open(cache_path(version, labels_cache_name("onehot_columns.json", model_labels)), "w") as f:
+            json.dump({
+                "respondents": [int(r) for r in self.respondents],
+                "columns": self.columns.to_dict(orient="records"),
+            }, f)
+
+    @classmethod
+    def load(cls, version, model_labels=True):
+        matrix = sparse.load_npz(cache_path(version, labels_cache_name("onehot.npz", model_labels)))
+        with open(cache_path(version, labels_cache_name("onehot_columns.json", model_labels))) as f:
+            meta = json.load(f)
+        return cls(matrix, meta["respondents"], pd.DataFrame(meta["columns"]))
+
+
+def build_indicator_matrix(frames):
+    """
+    One pass over the normalized frames: every (respondent, answer) pair
+    becomes a 1 in the matrix. Multi-select answers give several 1s per row.
+    """
+    respondents = frames["master"].index
+
+    rows, cols, col_meta = [], [], []
+    offset = 0
+
+    for question, (frame_key, norm_col) in QUESTIONS.items():
+        answers = frames[frame_key][norm_col].dropna().astype(str)
+        answers = answers[answers != ""]
+
+        codes, uniques = pd.factorize(answers, sort=True)
+
+        rows.append(respondents.get_indexer(answers.index))
+        cols.append(codes + offset)
+        col_meta.extend({"question": question, "answer": a} for a in uniques)
+
+        offset += len(uniques)
+
+    rows = np.concatenate(rows) if rows else np.array([], dtype=int)
+    cols = np.concatenate(cols) if cols else np.array([], dtype=int)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(len(respondents), offset)
+    )
+
+    # repeated answers (e.g. two phrasings -> same bucket) count once
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+
+    return IndicatorMatrix(matrix, respondents, pd.DataFrame(col_meta, columns=["question", "answer"]))
+
+
+def load_indicator_matrix(path=FILE, model_labels=True):
+    """
+    Indicator matrix for a workbook, built once per dataset version and
+    persisted next to the normalized frames. model_labels=False leaves out
+    the answers labelled by the fallback classifier.
+    Returns (version, IndicatorMatrix).
+    """
+    version, frames = load_survey(path)
+
+    if os.path.exists(cache_path(version, labels_cache_name("onehot.npz", model_labels))):
+        return version, IndicatorMatrix.load(version, model_labels)
+
+    onehot = build_indicator_matrix(frames if model_labels else rule_labels_only(frames))
+    onehot.save(version, model_labels)
+    return version, onehot
@@ -0,0 +1,1238 @@
+# Shared loading + normalization of the master survey sheet.
+# Used by app.py (streamlit) and by the batch / CLI tools, so the
+# normalization rules live in exactly one place.
+
+import hashlib
+import os
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+
+import text_classifier
+from text_classifier import NaiveBayesText
+
+# =====================================================
+# DATA LOADING
+# =====================================================
+FILE = "Untitled spreadsheet.xlsx"
+
+# sources whose changes invalidate cached artifacts (rules + fallback model,
+# and the modules that compute or persist derived artifacts next to the frames)
+PIPELINE_SOURCES = [__file__, text_classifier.__file__] + [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py")
+    for name in [
+        "survey_matrix", "association", "significance", "journey",
+        "answer_clusters", "text_index", "wave_compare",
+    ]
+]
+
+# normalized frames + derived artifacts, one folder per dataset version
+CACHE_DIR = ".survey_cache"
+
+def load_master(path=FILE):
+    xl = pd.ExcelFile(path)
+    sheet = next(s for s in xl.sheet_names if "master" in s.lower())
+    df = pd.read_excel(path, sheet_name=sheet)
+    df.columns = [c.strip().lower() for c in df.columns]
+    return df
+
+def dataset_version(path=FILE):
+    """
+    Short hash of the workbook bytes + the pipeline sources.
+    Changes whenever the data, the normalization rules, the fallback
+    classifier or one of the cached derivations change.
+    """
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    for source in PIPELINE_SOURCES:
+        with open(source, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+def cache_path(version, name):
+    folder = os.path.join(CACHE_DIR, version)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+# =====================================================
+# COLUMN MAPPING (BUSINESS MEANING)
+# =====================================================
+COLS = {
+    "customer_name": "customer name",
+    "age": "age",
+    "gender": "gender",
+
+    # Column D (note: “here” typo in sheet)
+    "heard_when": "first here about go desi",
+
+    # Column E
+    "product_category": "product category",
+
+    # Column F
+    "discovery": "how did the customer hear about desi popz",
+
+    # Column G
+    "frequency": "how often does the customer eat desi popz",
+
+    # Column H
+    "consumption_moment": "when does the customer usually eat desi popz",
+
+    # Column I
+    "perception": "what is desi popz",
+
+    # Column J
+    "motivation": "why do you choose desi popz",
+
+    # Column K
+    "brand_linkage": "did you know we also make indian sweets",
+
+    # Column L
+    "other_packaged_brands": "which other packaged indian sweet brand",
+
+    # Column M
+    "top_3_packaged_brands": "top 3 packaged indian sweet brands",
+
+    # Column N
+    "brand_preference": "which packaged sweets brand you prefer",
+
+    # Column O
+    "consumption_frequency": "how often do you consume packaged indian sweets",
+
+    # Column P
+    "consumption_occasion": "on what occasions you consume packaged indian sweets"
+}
+
+def find_col(df_raw, key):
+    token = COLS[key]
+    matches = [c for c in df_raw.columns if token in c]
+    if not matches:
+        raise ValueError(f"Column not found for key='{key}' using token='{token}'")
+    return matches[0]
+
+def resolve_columns(df_raw):
+    """
+    {key: actual sheet column} for every key in COLS except customer_name.
+    """
+    return {key: find_col(df_raw, key) for key in COLS if key != "customer_name"}
+
+def response_date_col(df_raw):
+    """
+    The sheet's response date / timestamp column, or None.
+    """
+    matches = [c for c in df_raw.columns if any(t in c for t in RESPONSE_DATE_TOKENS)]
+    return matches[0] if matches else None
+
+# =====================================================
+# GENERIC HELPERS
+# =====================================================
+def clean_text(x):
+    if pd.isna(x):
+        return None
+    return re.sub(r"\s+", " ", str(x)).strip()
+
+def safe_text(x):
+    """
+    Converts anything into a safe lowercase trimmed string.
+    - NaN/None -> ""
+    - numbers -> "123"
+    - normal string -> "clean lowercase string"
+    """
+    if pd.isna(x):
+        return ""
+    return str(x).strip().lower()
+
+def explode_multiselect(df, col):
+    """
+    Handles comma-separated multiselect answers safely.
+    Example: "Instagram, Friend" -> 2 rows.
+    """
+    tmp = df.copy()
+    tmp[col] = tmp[col].dropna().astype(str).str.split(",")
+    tmp = tmp.explode(col)
+    tmp[col] = tmp[col].astype(str).str.strip()
+    return tmp[tmp[col] != ""]
+
+# =====================================================
+# UNMAPPED AUDIT (TERMINAL)
+# =====================================================
+
+def print_unmapped_report(df_src, raw_col, norm_col, label, id_cols=None, top_n=20):
+    """
+    Prints unmapped responses to terminal.
+    Unmapped = raw has value but norm is NaN/None.
+    """
+    if id_cols is None:
+        id_cols = []
+
+    tmp = df_src.copy()
+
+    # keep only rows with non-empty raw value
+    tmp = tmp[tmp[raw_col].notna()]
+    tmp = tmp[tmp[raw_col].astype(str).str.strip() != ""]
+
+    # unmapped = norm is null
+    unmapped = tmp[tmp[norm_col].isna()].copy()
+
+    if unmapped.empty:
+        print(f"✅ [{label}] No unmapped responses.")
+        return
+
+    print("\n" + "=" * 80)
+    print(f"❗ UNMAPPED REPORT: {label}")
+    print(f"Raw column: {raw_col}")
+    print(f"Total unmapped rows: {len(unmapped)}")
+    print("=" * 80)
+
+    # print top unmapped values
+    value_counts = (
+        unmapped[raw_col]
+        .astype(str)
+        .str.strip()
+        .value_counts()
+        .head(top_n)
+    )
+
+    print("\nTop Unmapped Responses:")
+    for val, cnt in value_counts.items():
+        print(f"  ({cnt}) {val}")
+
+    # print row-level details
+    print("\nSample Row-level Unmapped Entries (first 50):")
+    cols_to_print = id_cols + [raw_col]
+    cols_to_print = [c for c in cols_to_print if c in unmapped.columns]
+
+    for idx, row in unmapped[cols_to_print].head(50).iterrows():
+        row_meta = " | ".join([f"{c}={row[c]}" for c in cols_to_print if c != raw_col])
+        print(f"RowIndex={idx} | {row_meta} | UNMAPPED_VALUE={row[raw_col]}")
+
+    # export all unmapped rows to CSV
+    out_csv = f"unmapped_{label.lower().replace(' ', '_')}.csv"
+    unmapped[cols_to_print].to_csv(out_csv, index=True)
+    print(f"\n📁 Exported unmapped rows to: {out_csv}")
+
+
+# =====================================================
+# NORMALIZATION RULES
+# =====================================================
+
+# ---- Column D: When first heard ----
+INVALID_HEARD_WHEN = {
+    "not responded",
+    "i don't remember",
+    "dont remember",
+    ""
+}
+
+# Tenure buckets, newest first: (label, upper bound in months)
+TENURE_BUCKETS = [
+    ("Past month", 1),
+    ("1–3 months", 3),
+    ("3–6 months", 6),
+    ("6–12 months", 12),
+    ("Over a year", float("inf")),
+]
+
+# Phrases without a number -> months ago
+RECENCY_PHRASES = {
+    "today": 0,
+    "yesterday": 0.03,
+    "just recently": 0.5,
+    "recently": 0.5,
+    "this week": 0.25,
+    "last week": 0.25,
+    "this month": 0.5,
+    "past month": 0.5,
+    "last month": 1,
+    "few weeks": 1,
+    "few months": 3,
+    "last year": 12,
+    "a year": 12,
+    "an year": 12,
+    "one year": 12,
+    "few years": 24,
+}
+
+RECENCY_UNITS = {"day": 1 / 30, "week": 0.25, "month": 1, "year": 12}
+
+RECENCY_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "couple of": 2, "three": 3,
+                 "four": 4, "five": 5, "six": 6, "few": 3}
+
+# "more than a year", "over 6 months", "2+ years" (whole words only)
+RECENCY_MORE_RE = re.compile(r"\b(?:more than|over|above)\b|\+")
+
+# Dated answers ("12/03/2024") are measured against the response date: the
+# sheet's response-date column (RESPONSE_DATE_TOKENS) when it has one,
+# else SURVEY_DATE (fieldwork date, e.g. "2025-06-30"). With neither, a
+# date answer is left unmapped rather than measured against today.
+SURVEY_DATE = None
+
+RESPONSE_DATE_TOKENS = ["timestamp", "response date", "submitted"]
+
+# ---- Column F: Discovery Channel ----
+DISCOVERY_MAP = {
+    # Word of mouth
+    "a friend or a family": "Word of Mouth",
+    "a friend or family member": "Word of Mouth",
+    "friend / family recommendation": "Word of Mouth",
+    "received it as a gift": "Word of Mouth",
+
+    # Corporate gifting
+    "got it as gift from his company": "Corporate Gifting",
+
+    # Social media
+    "instagram": "Social Media",
+    "facebook": "Social Media",
+    "whatsapp": "Social Media",
+    "youtube": "Social Media",
+
+    # E-commerce
+    "amazon": "E-commerce",
+    "amazon/flipkart": "E-commerce",
+
+    # Quick commerce
+    "blinkit/instamart/zepto": "Quick Commerce",
+    "swiggy instamart": "Quick Commerce",
+    "online grocery app (blinkit, instamart, zepto, etc.)": "Quick Commerce",
+
+    # Offline
+    "saw it in a store": "In-store / Offline",
+    "spotted in a store": "In-store / Offline",
+    "shillong shop": "In-store / Offline",
+
+    # Brand
+    "go desi website": "Brand Website",
+
+    # Media
+    "shark tank": "Shark Tank",
+    "sharktank india by my daughter": "Shark Tank",
+
+    # Paid
+    "ad": "Paid Advertising",
+}
+
+INVALID_DISCOVERY = {
+    "not responded",
+    "not sure",
+    "dont know",
+    "other",
+    ""
+}
+
+# ---- Column G: How often they eat Desi Popz ----
+EAT_FREQUENCY_MAP = {
+    "daily": "Daily",
+    "2-3 times a week": "2–3 times a week",
+    "once a week": "Once a week",
+    "a few times a month": "A few times a month",
+    "occasionally": "Occasionally",
+    "rarely": "Rarely",
+    "first time": "First time buying",
+}
+
+# ---- Column H: Consumption Moment ----
+CONSUMPTION_MOMENT_MAP = {
+    # After meals
+    "after lunch": "After meals",
+    "after dinner": "After meals",
+    "after meals": "After meals",
+
+    # Evening snack
+    "as an evening snack": "Evening snack",
+
+    # Work / study
+    "during work/study breaks": "During work / study breaks",
+
+    # Watching content
+    "while watching content": "While watching content (OTT / YouTube)",
+    "while watching content (youtube/ott)": "While watching content (OTT / YouTube)",
+
+    # Cravings
+    "whenever i crave something sweet": "Whenever I crave something sweet",
+    "to curb chatpata cravings": "Whenever I crave something sweet",
+    "to curb my chatpata cravings": "Whenever I crave something sweet",
+    "to curb chatpata cravings / craving": "Whenever I crave something sweet",
+
+    # Festivals
+    "only during festivals/special occasions": "Only during festivals / special occasions",
+
+    # Travel
+    "while traveling": "While travelling",
+    "while travelling": "While travelling",
+
+    # Bored / free time
+    "when bored / free time / leisure": "When bored / free time",
+    "when i'm bored": "When bored / free time",
+
+    # Party
+    "party": "Party / social occasions",
+
+    # Any time
+    "any time": "Any time",
+    "anytime": "Any time",
+    "all time": "Any time"
+}
+
+INVALID_CONSUMPTION_MOMENTS = {
+    "not responded",
+    "other",
+    "none of the above",
+    "it depends on mood",
+    "when will get mood",
+    "stopped eating / didn't like / not a regular consumer",
+    "ocassionally",
+    ""
+}
+
+# ---- Column I: Perception ----
+PERCEPTION_MAP = {
+    # Candy / Lollipop
+    "candy": "Candy",
+    "lollipop": "Lollipop",
+
+    # Tangy / Chatpata
+    "tangy": "Tangy / Chatpata Treat",
+    "chatak chussa": "Tangy / Chatpata Treat",
+    "tamarind": "Tangy / Chatpata Treat",
+    "imli": "Tangy / Chatpata Treat",
+    "mango": "Tangy / Chatpata Treat",
+
+    # Nostalgia
+    "nostalgic": "Nostalgic Snack",
+    "bachpan": "Nostalgic Snack",
+
+    # Craving / Time pass
+    "craving": "Craving / Time-pass Snack",
+    "time pass": "Craving / Time-pass Snack",
+    "break time": "Craving / Time-pass Snack",
+
+    # Unique / Variety
+    "unique": "Flavour Variety / Unique Taste",
+    "variety": "Flavour Variety / Unique Taste",
+
+    # Refreshment
+    "refreshment": "Refreshment / Mouth Freshener",
+    "mouth": "Refreshment / Mouth Freshener",
+
+    # Digestive
+    "churan": "Digestive / Churan-like",
+    "chavanprash": "Digestive / Churan-like",
+
+    # Quality
+    "quality": "Quality / Premium",
+
+    # Indian
+    "indian": "Indian / Desi Snack",
+
+    # Treat
+    "treat": "Occasional Treat",
+
+    # Negative
+    "pathetic": "Negative Feedback",
+    "didn't like": "Negative Feedback",
+    "not a regular": "Negative Feedback",
+}
+
+INVALID_PERCEPTION = {
+    "not responded",
+    "",
+}
+
+# ---- Column J: Motivation ----
+MOTIVATION_MAP = {
+    "better ingredient": "Better Ingredients",
+    "natural": "Natural / Clean Label",
+
+    "guilt free": "Guilt-free Snacking",
+
+    "nostalgic": "Nostalgic Vibes",
+
+    "chatpata": "Chatpata / Tangy Taste",
+    "chapati": "Chatpata / Tangy Taste",
+
+    "fun to eat": "Fun to Eat",
+
+    "unique format": "Unique Format",
+
+    "taste": "Good Taste",
+
+    "quality": "Quality",
+
+    "wanted to try": "Curiosity / Trial",
+    "just tried": "Curiosity / Trial",
+    "curiosity": "Curiosity / Trial",
+
+    "gift": "Gifting",
+
+    "kids": "Kids Like It",
+
+    "no one else": "Availability / No Alternatives",
+
+    "don't like": "Negative Experience",
+    "never ordered": "Negative Experience",
+}
+
+INVALID_MOTIVATION = {
+    "not responded",
+    "",
+}
+
+# ---- Column L: Other Packaged Indian Sweet Brands ----
+BRAND_AWARENESS_MAP = {
+    "haldiram": "Haldiram",
+    "haldirams": "Haldiram",
+    "halidiram": "Haldiram",
+
+    "bikaji": "Bikaji",
+    "bikaaji": "Bikaji",
+
+    "bikanervala": "Bikanervala",
+    "bikaner": "Bikanervala",
+
+    "amul": "Amul",
+    "farmley": "Farmley",
+
+    "go desi": "GO DESi",
+    "godesi": "GO DESi",
+    "only go desi": "GO DESi",
+
+    "anand sweets": "Anand Sweets",
+    "anand": "Anand Sweets",
+
+    "bhikharam": "Bhikharam Chandmal",
+    "bhikharam chandmal": "Bhikharam Chandmal",
+
+    "nandini": "Nandini Sweets",
+    "nandini sweets": "Nandini Sweets",
+
+    "karachi": "Karachi Bakery",
+    "jabson": "Jabsons",
+    "canbox": "Canbox",
+    "daadi": "Daadi’s",
+    "namaste india": "Namaste India",
+}
+
+LOCAL_BRAND_KEYWORDS = [
+    "local",
+    "sweet shop",
+    "sweet stall",
+    "almond house",
+    "rajpurohit",
+    "kanthi",
+    "asha",
+    "kranthi",
+    "tiwari",
+    "tewari",
+    "vijaya",
+]
+
+INVALID_BRAND_RESPONSES = {
+    "not responded",
+    "not sure",
+    "depends",
+    "disconnected in mid of the call",
+    "doesnt prefer packaged sweets",
+    "dont prefer packaged sweets",
+    "not aware of brands",
+    "dont remember any brands",
+    "manufacturer of sweets",
+    "prefers home made sweets",
+    "prefers whatever's convenient",
+    ""
+}
+
+PRODUCT_ONLY_KEYWORDS = [
+    "kaju",
+    "katli",
+    "laddu",
+    "barfi",
+    "barfis",
+    "roll",
+    "snack",
+    "sweetcorn",
+]
+
+# ---- Column M: Top 3 Brands ----
+SPONTANEOUS_BRAND_MAP = {
+    "haldiram": "Haldiram",
+    "haldirams": "Haldiram",
+    "halidiram": "Haldiram",
+
+    "bikaji": "Bikaji",
+    "bikaaji": "Bikaji",
+
+    "bikanervala": "Bikanervala",
+    "bikaner": "Bikanervala",
+    "bikano": "Bikanervala",
+
+    "amul": "Amul",
+    "farmley": "Farmley",
+
+    "go desi": "GO DESi",
+    "godesi": "GO DESi",
+
+    "anand sweets": "Anand Sweets",
+    "anand": "Anand Sweets",
+
+    "bhikharam": "Bhikharam Chandmal",
+    "nandini": "Nandini Sweets",
+
+    "a2b": "A2B",
+    "mtr": "MTR",
+
+    "jabson": "Jabsons",
+    "canbox": "Canbox",
+    "daadi": "Daadi’s",
+    "namaste india": "Namaste India",
+    "karachi": "Karachi Bakery",
+}
+
+SPONTANEOUS_LOCAL_KEYWORDS = [
+    "local",
+    "sweet shop",
+    "sweet stall",
+    "almond house",
+    "agarwal",
+    "kanthi",
+    "asha",
+    "kranthi",
+    "tiwari",
+    "rajpurohit",
+]
+
+SPONTANEOUS_INVALID = {
+    "not responded",
+    "many",
+    "all good",
+    "all the sweets category",
+    "prefers whatever's convenient",
+    "dont prefer packaged sweets",
+    "disconnected in mid of the call",
+    ""
+}
+
+SPONTANEOUS_PRODUCT_KEYWORDS = [
+    "kaju",
+    "katli",
+    "laddu",
+    "barfi",
+    "rasgulla",
+    "jalebi",
+    "peda",
+    "milk",
+]
+
+# ---- Column N: Brand Preference ----
+PREFERENCE_BRAND_MAP = {
+    "haldiram": "Haldiram",
+    "haldirams": "Haldiram",
+
+    "go desi": "GO DESi",
+    "godesi": "GO DESi",
+
+    "bikaji": "Bikaji",
+    "bikaaji": "Bikaji",
+
+    "anand sweets": "Anand Sweets",
+    "anand": "Anand Sweets",
+
+    "daadi": "Daadi’s",
+    "lal": "Lal Sweets",
+
+    "local": "Local / Unbranded Sweets",
+    "generic": "Local / Unbranded Sweets",
+}
+
+INVALID_PREFERENCE = {
+    "not responded",
+    "no preference / doesn’t consume",
+    "no preference",
+    ""
+}
+
+# ---- Column O: Consumption Frequency ----
+FREQUENCY_MAP = {
+    "daily": "Daily",
+    "2-3 times a week": "2–3 times a week",
+    "once a week": "Once a week",
+    "a few times a month": "A few times a month",
+    "occasionally": "Occasionally",
+    "rarely": "Rarely",
+}
+
+INVALID_FREQUENCY = {
+    "dont consume sweets",
+    "do not consume sweets",
+    "never",
+    "not responded",
+    ""
+}
+
+# ---- Column P: Consumption Occasions ----
+OCCASION_MAP = {
+    "after meals": "After meals / dessert",
+    "dessert": "After meals / dessert",
+
+    "tea": "Snack with tea / coffee",
+    "coffee": "Snack with tea / coffee",
+    "snack": "Snack with tea / coffee",
+
+    "craving": "Cravings / impulse eating",
+    "impulse": "Cravings / impulse eating",
+
+    "bored": "Boredom / leisure",
+
+    "festival": "Festivals",
+    "festive": "Festivals",
+
+    "special": "Special occasions",
+
+    "travel": "Travel",
+}
+
+INVALID_OCCASIONS = {
+    "does not consume",
+    "not responded",
+    ""
+}
+
+
+# =====================================================
+# NORMALIZERS
+# =====================================================
+
+# ---- Age Normalization ----
+def normalize_age(x):
+    x_low = str(x).strip().lower()
+
+    # Map invalids to N/A bucket
+    if x_low in {"n/a", "not responded", "don't know", "dont know", ""}:
+        return "N/A"
+
+    # Merge Below 18 into Under 20
+    if x_low in {"below 18", "under 20"}:
+        return "Under 20"
+
+    return x
+
+def normalize_gender(x):
+    x_low = safe_text(x)
+
+    if x_low in ["male", "m"]:
+        return "Male"
+
+    if x_low in ["female", "f"]:
+        return "Female"
+
+    if x_low in ["n/a", "", "not responded"]:
+        return "N/A"
+
+    return "N/A"
+
+# ---- Product Category (explode BOTH) ----
+def expand_product(x):
+    x = clean_text(x)
+    if x is None:
+        return None
+    if str(x).strip().lower() == "both":
+        return ["Sweets", "Confectionery and Mints"]
+    return [x]
+
+# ---- Perception (Column I) ----
+def map_perception(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    for k, v in PERCEPTION_MAP.items():
+        if k in x_low:
+            return v
+
+    return None
+
+# ---- Motivation (Column J) ----
+def map_motivation(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    for k, v in MOTIVATION_MAP.items():
+        if k in x_low:
+            return v
+
+    return None
+
+# ---- Column L: Brand Awareness ----
+def map_brand_awareness(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    if x_low in INVALID_BRAND_RESPONSES:
+        return None
+
+    for p in PRODUCT_ONLY_KEYWORDS:
+        if p in x_low:
+            return None
+
+    for k, v in BRAND_AWARENESS_MAP.items():
+        if k in x_low:
+            return v
+
+    for kw in LOCAL_BRAND_KEYWORDS:
+        if kw in x_low:
+            return "Local / Unbranded Sweets"
+
+    return None
+
+# ---- Column M: Spontaneous Recall (Top 3) ----
+def map_spontaneous_brand(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    if x_low in SPONTANEOUS_INVALID:
+        return None
+
+    for p in SPONTANEOUS_PRODUCT_KEYWORDS:
+        if p in x_low:
+            return None
+
+    for k, v in SPONTANEOUS_BRAND_MAP.items():
+        if k in x_low:
+            return v
+
+    for kw in SPONTANEOUS_LOCAL_KEYWORDS:
+        if kw in x_low:
+            return "Local / Unbranded Sweets"
+
+    return None
+
+# ---- Column D: First heard (recency) ----
+RECENCY_RE = re.compile(
+    r"\b(\d+(?:\.\d+)?|" + "|".join(sorted(RECENCY_WORDS, key=len, reverse=True)) + r")"
+    r"(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(day|week|month|year)s?"
+)
+
+def recency_months(x, reference=None):
+    """
+    Months since first heard, from free text ("6 months ago", "3-6 months",
+    "more than a year ago", "last year") or a date. None if unusable.
+    Ranges take their upper bound; "more than / over" nudges past the bound.
+    Relative phrases are as of the response; a date is measured against
+    `reference` (the response date) and is unusable without one.
+    """
+    x_low = safe_text(x)
+    if x_low in INVALID_HEARD_WHEN:
+        return None
+
+    more = RECENCY_MORE_RE.search(x_low) is not None
+
+    m = RECENCY_RE.search(x_low)
+    if m:
+        amount = m.group(2) or m.group(1)
+        amount = float(RECENCY_WORDS.get(amount, amount))
+        months = amount * RECENCY_UNITS[m.group(3)]
+        return months + 1 if more else months
+
+    for k, v in RECENCY_PHRASES.items():
+        if k in x_low:
+            return v + 1 if more else v
+
+    # dates ("12/03/2024", "March 2024")
+    date = pd.to_datetime(str(x), errors="coerce", dayfirst=True)
+    if pd.notna(date) and reference is not None and pd.notna(reference):
+        return max((pd.Timestamp(reference) - date).days / 30.44, 0)
+
+    return None
+
+def map_tenure(x, reference=None):
+    months = recency_months(x, reference)
+    if months is None:
+        return None
+
+    for label, upper in TENURE_BUCKETS:
+        if months <= upper:
+            return label
+
+    return None
+
+def map_tenure_column(answers, reference=None):
+    """
+    Tenure bucket per row. reference: the response date per row (Series
+    aligned with answers) or one date for every row (None = undated).
+    """
+    if not isinstance(reference, pd.Series):
+        return map_distinct(answers, lambda x: map_tenure(x, reference))
+
+    lookup = {}
+    out = []
+    for x, ref in zip(answers, reference):
+        if (x, ref) not in lookup:
+            lookup[(x, ref)] = map_tenure(x, ref) if pd.notna(x) else None
+        out.append(lookup[(x, ref)])
+    return pd.Series(out, index=answers.index, dtype=object)
+
+def map_distinct(series, fn):
+    """
+    Applies fn once per distinct value (free-text columns repeat a lot).
+    """
+    lookup = {v: fn(v) for v in series.dropna().unique()}
+    return series.map(lookup)
+
+# ---- Column G: Eat Frequency ----
+def map_eat_frequency(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    for k, v in EAT_FREQUENCY_MAP.items():
+        if k in x_low:
+            return v
+
+    return None
+
+# ---- Column N: Brand Preference ----
+def map_preference_brand(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    if x_low in INVALID_PREFERENCE:
+        return None
+
+    for k, v in PREFERENCE_BRAND_MAP.items():
+        if k in x_low:
+            return v
+
+    return None
+
+# ---- Column O: Consumption Frequency (Packaged sweets) ----
+def map_frequency(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    if x_low in INVALID_FREQUENCY:
+        return None
+
+    for k, v in FREQUENCY_MAP.items():
+        if k in x_low:
+            return v
+
+    return None
+
+# ---- Column P: Consumption Occasions ----
+def map_occasion(x):
+    x_low = safe_text(x)
+    if x_low == "":
+        return None
+
+    if x_low in INVALID_OCCASIONS:
+        return None
+
+    for k, v in OCCASION_MAP.items():
+        if k in x_low:
+            return v
+
+    return None
+
+# =====================================================
+# FALLBACK CLASSIFIER (UNMAPPED FREE TEXT)
+# =====================================================
+
+# minimum posterior for a model prediction to be kept
+FALLBACK_THRESHOLD = 0.7
+
+def apply_fallback(frame, raw_col, norm_col, invalid, threshold=FALLBACK_THRESHOLD):
+    """
+    Labels answers no rule matched with a naive Bayes model trained on the
+    rule-mapped answers of the same question. Only distinct unmapped
+    answers are scored; predictions below threshold stay unmapped.
+    Adds <norm_col>_source ("rule" / "model") and <norm_col>_confidence.
+    """
+    frame = frame.copy()
+
+    keys = map_distinct(frame[raw_col], safe_text).fillna("")
+    has_rule = frame[norm_col].notna().to_numpy()
+    unmapped = ~has_rule & (keys != "").to_numpy() & ~keys.isin(invalid).to_numpy()
+
+    norm = frame[norm_col].to_numpy(dtype=object).copy()
+    source = np.where(has_rule, "rule", None).astype(object)
+    confidence = np.where(has_rule, 1.0, np.nan)
+
+    train = (
+        pd.DataFrame({"text": keys[has_rule].to_numpy(), "label": norm[has_rule]})
+        .value_counts()
+        .reset_index(name="n")
+    )
+
+    if unmapped.any() and train["label"].nunique() > 1:
+        model = NaiveBayesText().fit(train["text"], train["label"], train["n"])
+
+        todo = pd.unique(keys[unmapped])
+        labels, conf = model.predict(todo)
+        keep = conf >= threshold
+
+        predicted = keys[unmapped].map(dict(zip(todo[keep], labels[keep]))).to_numpy()
+        scored = keys[unmapped].map(dict(zip(todo, conf))).to_numpy()
+
+        hit = pd.notna(predicted)
+        idx = np.flatnonzero(unmapped)
+
+        norm[idx[hit]] = predicted[hit]
+        source[idx[hit]] = "model"
+        confidence[idx] = scored
+
+    frame[norm_col] = norm
+    frame[f"{norm_col}_source"] = source
+    frame[f"{norm_col}_confidence"] = confidence
+    return frame
+
+# frames whose answers can come from the fallback classifier -> answer column
+FALLBACK_FRAMES = {
+    "perception": "perception_norm",
+    "motivation": "motivation_norm",
+    "occ": "occasion_norm",
+}
+
+def rule_labels_only(frames):
+    """
+    Copy of the frames dict without the answers labelled by the classifier.
+    """
+    out = dict(frames)
+    for key, norm_col in FALLBACK_FRAMES.items():
+        out[key] = frames[key][frames[key][f"{norm_col}_source"] != "model"]
+    return out
+
+def labels_cache_name(name, model_labels=True):
+    """
+    Cache file name for results built with / without classifier labels
+    ("association.csv" / "association_rules.csv").
+    """
+    if model_labels:
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}_rules{ext}"
+
+# =====================================================
+# DATA TRANSFORMATION PIPELINE
+# =====================================================
+
+# question key -> (frame key, normalized answer column)
+# frames share the master sheet's index, so index = respondent id
+QUESTIONS = {
+    "age": ("master", "age_norm"),
+    "gender": ("master", "gender_norm"),
+    "tenure": ("master", "tenure_norm"),
+    "product_category": ("product", "product_norm"),
+    "discovery": ("disc", "discovery_norm"),
+    "frequency": ("df", "eat_frequency_norm"),
+    "consumption_moment": ("moment", "moment_norm"),
+    "perception": ("perception", "perception_norm"),
+    "motivation": ("motivation", "motivation_norm"),
+    "brand_linkage": ("linkage", "linkage_norm"),
+    "other_packaged_brands": ("brand", "brand_awareness_norm"),
+    "top_3_packaged_brands": ("top3", "spontaneous_brand_norm"),
+    "brand_preference": ("pref", "preferred_brand_norm"),
+    "consumption_frequency": ("freq", "consumption_frequency_norm"),
+    "consumption_occasion": ("occ", "occasion_norm"),
+}
+
+def normalize_survey(df_raw):
+    """
+    Runs every normalization step on the raw master sheet.
+    Returns {frame key: DataFrame} (see QUESTIONS for the answer columns).
+    """
+    cols = resolve_columns(df_raw)
+
+    df = df_raw.copy()
+
+    # Clean text (do NOT drop rows)
+    df = df.apply(lambda col: col.map(clean_text))
+
+    df["age_norm"] = df[cols["age"]].apply(normalize_age)
+    df["gender_norm"] = df[cols["gender"]].apply(normalize_gender)
+    date_col = response_date_col(df_raw)
+    df["tenure_norm"] = map_tenure_column(
+        df[cols["heard_when"]],
+        pd.to_datetime(df_raw[date_col], errors="coerce") if date_col else SURVEY_DATE
+    )
+
+    df_master = df.copy()
+
+    # ---- Product Category (explode BOTH) ----
+    product_col = cols["product_category"]
+    df_product = df.copy()
+    df_product[product_col] = df_product[product_col].apply(expand_product)
+    df_product = df_product.dropna(subset=[product_col])
+    df_product = df_product.explode(product_col)
+    df_product["product_norm"] = df_product[product_col]
+
+    # ---- Discovery Channel ----
+    discovery_col = cols["discovery"]
+    df_disc = df.copy()
+    df_disc[discovery_col] = df_disc[discovery_col].map(clean_text)
+
+    df_disc = explode_multiselect(df_disc, discovery_col)
+    df_disc["discovery_norm"] = (
+        df_disc[discovery_col]
+        .astype(str)
+        .str.lower()
+        .map(DISCOVERY_MAP)
+    )
+
+    df_disc = df_disc[
+        ~df_disc[discovery_col].astype(str).str.lower().isin(INVALID_DISCOVERY)
+    ]
+    df_disc = df_disc.dropna(subset=["discovery_norm"])
+
+    # ---- Consumption Frequency (Column G) ----
+    frequency_col = cols["frequency"]
+    df[frequency_col] = df[frequency_col].map(clean_text)
+    df = df[df[frequency_col].notna()]
+    df = df[
+        ~df[frequency_col].astype(str).str.strip().str.lower().isin(
+            ["not responded", "not sure", ""]
+        )
+    ]
+    df["eat_frequency_norm"] = df[frequency_col].apply(map_eat_frequency)
+
+    # ---- Consumption Moment (Column H) ----
+    moment_col = cols["consumption_moment"]
+    df_moment = df.copy()
+    df_moment[moment_col] = df_moment[moment_col].map(clean_text)
+
+    df_moment = explode_multiselect(df_moment, moment_col)
+
+    df_moment["moment_norm"] = (
+        df_moment[moment_col]
+        .astype(str)
+        .str.lower()
+        .map(CONSUMPTION_MOMENT_MAP)
+    )
+
+    df_moment = df_moment[
+        ~df_moment[moment_col].astype(str).str.lower().isin(INVALID_CONSUMPTION_MOMENTS)
+    ]
+    df_moment = df_moment.dropna(subset=["moment_norm"])
+
+    # ---- Perception (Column I) ----
+    perception_col = cols["perception"]
+    df_perception = df.copy()
+    df_perception[perception_col] = df_perception[perception_col].map(clean_text)
+
+    df_perception = explode_multiselect(df_perception, perception_col)
+
+    df_perception["perception_norm"] = df_perception[perception_col].apply(map_perception)
+    df_perception = apply_fallback(df_perception, perception_col, "perception_norm", INVALID_PERCEPTION)
+
+    df_perception = df_perception[
+        ~df_perception[perception_col].astype(str).str.lower().isin(INVALID_PERCEPTION)
+    ]
+    df_perception = df_perception.dropna(subset=["perception_norm"])
+
+    # ---- Motivation (Column J) ----
+    motivation_col = cols["motivation"]
+    df_motivation = df.copy()
+    df_motivation[motivation_col] = df_motivation[motivation_col].map(clean_text)
+
+    df_motivation = explode_multiselect(df_motivation, motivation_col)
+
+    df_motivation["motivation_norm"] = df_motivation[motivation_col].apply(map_motivation)
+    df_motivation = apply_fallback(df_motivation, motivation_col, "motivation_norm", INVALID_MOTIVATION)
+
+    df_motivation = df_motivation[
+        ~df_motivation[motivation_col].astype(str).str.lower().isin(INVALID_MOTIVATION)
+    ]
+    df_motivation = df_motivation.dropna(subset=["motivation_norm"])
+
+    # ---- Brand Linkage (Column K) ----
+    linkage_col = cols["brand_linkage"]
+    df_linkage = df.copy()
+    df_linkage[linkage_col] = df_linkage[linkage_col].map(clean_text)
+    df_linkage = df_linkage[df_linkage[linkage_col].isin(["Yes", "No"])]
+    df_linkage["linkage_norm"] = df_linkage[linkage_col]
+
+    # ---- Column L: Brand Awareness ----
+    other_brand_col = cols["other_packaged_brands"]
+    df_brand = df.copy()
+    df_brand[other_brand_col] = df_brand[other_brand_col].map(clean_text)
+
+    df_brand = explode_multiselect(df_brand, other_brand_col)
+
+    df_brand["brand_awareness_norm"] = df_brand[other_brand_col].apply(map_brand_awareness)
+    df_brand = df_brand.dropna(subset=["brand_awareness_norm"])
+
+    # ---- Column M: Spontaneous Recall (Top 3) ----
+    top3_col = cols["top_3_packaged_brands"]
+    df_top3 = df.copy()
+    df_top3[top3_col] = df_top3[top3_col].map(clean_text)
+
+    df_top3 = explode_multiselect(df_top3, top3_col)
+
+    df_top3["spontaneous_brand_norm"] = df_top3[top3_col].apply(map_spontaneous_brand)
+    df_top3 = df_top3.dropna(subset=["spontaneous_brand_norm"])
+
+    # ---- Column N: Brand Preference ----
+    preference_col = cols["brand_preference"]
+    df_pref = df.copy()
+    df_pref[preference_col] = df_pref[preference_col].map(clean_text)
+
+    df_pref["preferred_brand_norm"] = df_pref[preference_col].apply(map_preference_brand)
+    df_pref = df_pref.dropna(subset=["preferred_brand_norm"])
+
+    # ---- Column O: Consumption Frequency (Packaged sweets) ----
+    freq_col = cols["consumption_frequency"]
+    df_freq = df.copy()
+    df_freq[freq_col] = df_freq[freq_col].map(clean_text)
+
+    df_freq["consumption_frequency_norm"] = df_freq[freq_col].apply(map_frequency)
+    df_freq = df_freq.dropna(subset=["consumption_frequency_norm"])
+
+    # ---- Column P: Consumption Occasions ----
+    occasion_col = cols["consumption_occasion"]
+    df_occ = df.copy()
+    df_occ[occasion_col] = df_occ[occasion_col].map(clean_text)
+    df_occ = explode_multiselect(df_occ, occasion_col)
+
+    df_occ["occasion_norm"] = df_occ[occasion_col].apply(map_occasion)
+    df_occ = apply_fallback(df_occ, occasion_col, "occasion_norm", INVALID_OCCASIONS)
+    df_occ = df_occ.dropna(subset=["occasion_norm"])
+
+    return {
+        "master": df_master,
+        "df": df,
+        "product": df_product,
+        "disc": df_disc,
+        "moment": df_moment,
+        "perception": df_perception,
+        "motivation": df_motivation,
+        "linkage": df_linkage,
+        "brand": df_brand,
+        "top3": df_top3,
+        "pref": df_pref,
+        "freq": df_freq,
+        "occ": df_occ,
+    }
+
+def load_survey(path=FILE):
+    """
+    Normalized frames for a workbook, built once per dataset version and
+    persisted under CACHE_DIR/<version>/normalized.pkl.
+    Returns (version, frames).
+    """
+    version = dataset_version(path)
+    pkl = cache_path(version, "normalized.pkl")
+
+    if os.path.exists(pkl):
+        with open(pkl, "rb") as f:
+            return version, pickle.load(f)
+
+    frames = normalize_survey(load_master(path))
+    with open(pkl, "wb") as f:
+        pickle.dump(frames, f)
+
+    return version, frames
@@ -1,24 +1,11 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
 
-input_file = "Untitled spreadsheet.xlsx"
-output_folder = "insightsgraphs"
-os.makedirs(output_folder, exist_ok=True)
+from chart_common import as_text, read_workbook, save_chart, sheet
 
-# Read Sweets sheet
-df = pd.read_excel(input_file, sheet_name="Sweets")
-df.columns = df.columns.str.strip().str.lower()
-
-# Identify relevant columns
-brand_pref_col = [c for c in df.columns if "prefer" in c][0]
-freq_col = [c for c in df.columns if "how often" in c][0]
-occasion_col = [c for c in df.columns if "occasion" in c][0]
-age_col = [c for c in df.columns if "age" in c][0]
 
 # --- Normalize brand preference ---
-df[brand_pref_col] = df[brand_pref_col].astype(str).str.lower()
 def simplify_brand(b):
     if "haldiram" in b:
         return "Haldiram"
@@ -33,21 +20,6 @@ def simplify_brand(b):
     else:
         return "Misc / Unknown"
 
-df["brand_category"] = df[brand_pref_col].apply(simplify_brand)
-
-# --- Donut Chart: Brand Preference ---
-brand_counts = df["brand_category"].value_counts()
-plt.figure(figsize=(5,5))
-colors = sns.color_palette("Set2", len(brand_counts))
-plt.pie(brand_counts, labels=brand_counts.index, colors=colors, autopct="%1.0f%%", startangle=90, wedgeprops=dict(width=0.45))
-plt.title("Packaged Sweets Brand Preference", pad=20, weight="bold", color="#333")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "sweets_brand_preference_donut.png"), dpi=300)
-plt.close()
-
-# --- Occasion × Frequency ---
-df[occasion_col] = df[occasion_col].astype(str).str.lower().str.strip()
-df[freq_col] = df[freq_col].astype(str).str.lower().str.strip()
 
 # Clean major buckets
 def simplify_occasion(o):
@@ -62,6 +34,7 @@ def simplify_occasion(o):
     else:
         return "Other / Not Mentioned"
 
+
 def simplify_freq(f):
     if "daily" in f:
         return "Daily"
@@ -74,20 +47,53 @@ def simplify_freq(f):
     else:
         return "Other"
 
-df["occasion_group"] = df[occasion_col].apply(simplify_occasion)
-df["frequency_group"] = df[freq_col].apply(simplify_freq)
 
-# Pivot
-pivot = pd.crosstab(df["occasion_group"], df["frequency_group"])
+def sweets_brand_preference_donut(book):
+    # Read Sweets sheet
+    df = sheet(book, "Sweets")
+    brand_pref_col = [c for c in df.columns if "prefer" in c][0]
+
+    df[brand_pref_col] = as_text(df[brand_pref_col]).str.lower()
+    df["brand_category"] = df[brand_pref_col].apply(simplify_brand)
+
+    # --- Donut Chart: Brand Preference ---
+    brand_counts = df["brand_category"].value_counts()
+    plt.figure(figsize=(5,5))
+    colors = sns.color_palette("Set2", len(brand_counts))
+    plt.pie(brand_counts, labels=brand_counts.index, colors=colors, autopct="%1.0f%%", startangle=90, wedgeprops=dict(width=0.45))
+    plt.title("Packaged Sweets Brand Preference", pad=20, weight="bold", color="#333")
+    return save_chart("sweets_brand_preference_donut.png")
+
+
+def sweets_occasion_frequency_heatmap(book):
+    df = sheet(book, "Sweets")
+    freq_col = [c for c in df.columns if "how often" in c][0]
+    occasion_col = [c for c in df.columns if "occasion" in c][0]
+
+    # --- Occasion × Frequency ---
+    df[occasion_col] = as_text(df[occasion_col]).str.lower().str.strip()
+    df[freq_col] = as_text(df[freq_col]).str.lower().str.strip()
+
+    df["occasion_group"] = df[occasion_col].apply(simplify_occasion)
+    df["frequency_group"] = df[freq_col].apply(simplify_freq)
+
+    # Pivot
+    pivot = pd.crosstab(df["occasion_group"], df["frequency_group"])
+
+    plt.figure(figsize=(8,5))
+    sns.heatmap(pivot, annot=True, fmt="g", cmap="YlGnBu", linewidths=0.4)
+    plt.title("Occasion × Frequency of Sweet Consumption", pad=15, weight="bold", color="#333")
+    plt.xlabel("Consumption Frequency")
+    plt.ylabel("Occasion")
+    return save_chart("sweets_occasion_frequency_heatmap.png")
+
+
+CHARTS = [sweets_brand_preference_donut, sweets_occasion_frequency_heatmap]
 
-plt.figure(figsize=(8,5))
-sns.heatmap(pivot, annot=True, fmt="g", cmap="YlGnBu", linewidths=0.4)
-plt.title("Occasion × Frequency of Sweet Consumption", pad=15, weight="bold", color="#333")
-plt.xlabel("Consumption Frequency")
-plt.ylabel("Occasion")
-plt.tight_layout()
-plt.savefig(os.path.join(output_folder, "sweets_occasion_frequency_heatmap.png"), dpi=300)
-plt.close()
 
-print("✅ Saved: sweets_brand_preference_donut.png & sweets_occasion_frequency_heatmap.png")
+if __name__ == "__main__":
+    book = read_workbook()
+    for chart in CHARTS:
+        chart(book)
 
+    print("✅ Saved: sweets_brand_preference_donut.png & sweets_occasion_frequency_heatmap.png")
@@ -0,0 +1,120 @@
+# Lightweight offline text classifier (multinomial naive Bayes on TF-IDF).
+#
+# Used as a fallback for free-text answers no keyword rule matches: it is
+# trained on the rule-mapped answers of a question and only scores the
+# distinct unmapped ones. Vectorizing, training and scoring are sparse
+# matrix products, so a question trains and scores in milliseconds.
+#
+# Unknown words carry no evidence, so a text whose features are mostly
+# outside the training vocabulary would be labelled from one stray word
+# (or from the class priors alone). Such texts get confidence 0 and stay
+# unmapped: at least MIN_KNOWN of a text's features must be known.
+
+import re
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# minimum share of a text's unigrams + bigrams seen in training
+MIN_KNOWN = 0.5
+
+
+def features(text):
+    """
+    Word unigrams + bigrams of the lower-cased text.
+    """
+    words = TOKEN_RE.findall(str(text).lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesText:
+    """
+    fit(texts, labels, weights) -> self
+    predict(texts) -> (labels, confidence), confidence = posterior of the label
+    (0 when less than min_known of the text's features are known)
+    """
+
+    def __init__(self, alpha=0.1, min_known=MIN_KNOWN):
+        self.alpha = alpha
+        self.min_known = min_known
+
+    def known_share(self, texts):
+        """
+        Share of each text's features that are in the fitted vocabulary.
+        """
+        share = []
+        for text in texts:
+            fs = features(text)
+            share.append(sum(f in self.vocab for f in fs) / len(fs) if fs else 0.0)
+        return np.array(share)
+
+    def _counts(self, texts):
+        """
+        Sparse term counts over the fitted vocabulary (unknown terms ignored).
+        """
+        rows, cols = [], []
+        for i, text in enumerate(texts):
+            for f in features(text):
+                j = self.vocab.get(f)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(texts), len(self.vocab))
+        )
+
+    def _tfidf(self, texts):
+        X = self._counts(texts)
+        X.data = np.log1p(X.data)
+        X = X @ sparse.diags(self.idf)
+
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        return sparse.diags(1 / np.where(norms > 0, norms, 1)) @ X
+
+    def fit(self, texts, labels, weights=None):
+        texts = list(texts)
+        weights = np.ones(len(texts)) if weights is None else np.asarray(weights, dtype=float)
+
+        self.vocab = {}
+        for text in texts:
+            for f in features(text):
+                self.vocab.setdefault(f, len(self.vocab))
+
+        # document frequency over distinct training texts
+        df = np.asarray((self._counts(texts) > 0).sum(axis=0)).ravel()
+        self.idf = np.log((1 + len(texts)) / (1 + df)) + 1
+
+        self.classes, y = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        Y = sparse.csr_matrix(
+            (weights, (np.arange(len(texts)), y)),
+            shape=(len(texts), len(self.classes))
+        )
+
+        X = self._tfidf(texts)
+        feature_mass = np.asarray((Y.T @ X).todense()) + self.alpha
+        self.log_likelihood = np.log(feature_mass / feature_mass.sum(axis=1, keepdims=True))
+
+        prior = np.asarray(Y.sum(axis=0)).ravel()
+        self.log_prior = np.log(prior / prior.sum())
+        return self
+
+    def predict(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.array([], dtype=str), np.array([])
+
+        scores = self._tfidf(texts) @ self.log_likelihood.T + self.log_prior
+
+        # posterior via a stable softmax
+        scores = scores - scores.max(axis=1, keepdims=True)
+        posterior = np.exp(scores)
+        posterior /= posterior.sum(axis=1, keepdims=True)
+
+        best = posterior.argmax(axis=1)
+        confidence = posterior[np.arange(len(texts)), best]
+        confidence = np.where(self.known_share(texts) >= self.min_known, confidence, 0.0)
+        return self.classes[best], confidence
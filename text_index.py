@@ -0,0 +1,197 @@
+# Token inverted index over the free-text answer columns.
+#
+# Every token maps to the sorted array of respondent ids whose raw answer
+# (perception, motivation, brands, occasions, ...) contains it. Postings
+# live in one concatenated array + offsets, so a term lookup is a binary
+# search in the vocabulary and a slice. Queries:
+#   gift kids        -> gift AND kids
+#   gift OR kids     -> union (AND binds tighter than OR)
+#   gift*            -> any token starting with "gift" (gifting, gifts, ...)
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from survey_pipeline import FILE, cache_path, load_survey, resolve_columns
+
+# COLS keys of the free-text columns that are indexed
+TEXT_QUESTIONS = [
+    "perception",
+    "motivation",
+    "other_packaged_brands",
+    "top_3_packaged_brands",
+    "brand_preference",
+    "consumption_moment",
+    "consumption_occasion",
+    "discovery",
+]
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "to", "in", "for", "on", "or", "is",
+    "it", "i", "we", "my", "with", "at", "as", "by", "be", "are", "was",
+}
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class TextIndex:
+    """
+    vocab: sorted array of tokens
+    offsets: postings of vocab[i] are postings[offsets[i]:offsets[i + 1]]
+    postings: concatenated sorted respondent ids
+    """
+
+    def __init__(self, vocab, offsets, postings):
+        self.vocab = np.asarray(vocab, dtype=str)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.postings = np.asarray(postings, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def term(self, term):
+        """
+        Sorted respondent ids for one term ("gift" exact, "gift*" prefix).
+        """
+        if term.endswith("*"):
+            prefix = term[:-1]
+            lo = np.searchsorted(self.vocab, prefix, side="left")
+            hi = np.searchsorted(self.vocab, prefix + "\uffff", side="left")
+            if hi <= lo:
+                return np.array([], dtype=np.int64)
+            return np.unique(self.postings[self.offsets[lo]:self.offsets[hi]])
+
+        i = np.searchsorted(self.vocab, term)
+        if i < len(self.vocab) and self.vocab[i] == term:
+            return self.postings[self.offsets[i]:self.offsets[i + 1]]
+        return np.array([], dtype=np.int64)
+
+    def search(self, query):
+        """
+        Sorted respondent ids matching the query (see module header).
+        """
+        result = np.array([], dtype=np.int64)
+
+        for clause in parse_query(query):
+            lists = sorted((self.term(t) for t in clause), key=len)
+
+            # intersect shortest first; stop as soon as nothing is left
+            hits = lists[0]
+            for other in lists[1:]:
+                if not len(hits):
+                    break
+                hits = np.intersect1d(hits, other, assume_unique=True)
+
+            result = np.union1d(result, hits)
+
+        return result
+
+    def save(self, version):
+        np.savez(
+            cache_path(version, "text_index.npz"),
+            offsets=self.offsets,
+            postings=self.postings
+        )
+        with open(cache_path(version, "text_index_vocab.json"), "w") as f:
+            json.dump(self.vocab.tolist(), f)
+
+    @classmethod
+    def load(cls, version):
+        arrays = np.load(cache_path(version, "text_index.npz"))
+        with open(cache_path(version, "text_index_vocab.json")) as f:
+            vocab = json.load(f)
+        return cls(vocab, arrays["offsets"], arrays["postings"])
+
+
+def parse_query(query):
+    """
+    "a b OR c*" -> [["a", "b"], ["c*"]] (OR of AND-clauses).
+    Terms go through the index tokenizer; a trailing * is kept.
+    """
+    clauses = [[]]
+
+    for word in str(query).split():
+        if word.upper() == "OR":
+            clauses.append([])
+            continue
+        if word.upper() == "AND":
+            continue
+
+        tokens = tokenize(word)
+        if word.endswith("*") and tokens:
+            tokens[-1] += "*"
+        clauses[-1].extend(tokens)
+
+    return [c for c in clauses if c]
+
+
+def build_text_index(frames):
+    """
+    One pass over the raw text columns of the master sheet:
+    (token, respondent) pairs, de-duplicated and grouped by token.
+    """
+    master = frames["master"]
+    cols = resolve_columns(master)
+
+    pairs = []
+    for key in TEXT_QUESTIONS:
+        col = cols.get(key)
+        if col is None:
+            continue
+
+        tokens = master[col].dropna().astype(str).str.lower().str.findall(TOKEN_RE.pattern)
+        pairs.append(tokens.explode().dropna())
+
+    tokens = pd.concat(pairs) if pairs else pd.Series(dtype=str)
+    tokens = tokens[~tokens.isin(STOPWORDS)]
+
+    pairs = (
+        pd.DataFrame({"token": tokens.to_numpy(dtype=str), "respondent": tokens.index.to_numpy()})
+        .drop_duplicates()
+        .sort_values(["token", "respondent"])
+    )
+
+    vocab, start = np.unique(pairs["token"].to_numpy(), return_index=True)
+    offsets = np.append(start, len(pairs))
+
+    return TextIndex(vocab, offsets, pairs["respondent"].to_numpy())
+
+
+def cached_text_index(version, frames):
+    """
+    Text index for already-normalized frames, built once per dataset version.
+    """
+    if os.path.exists(cache_path(version, "text_index.npz")):
+        return TextIndex.load(version)
+
+    index = build_text_index(frames)
+    index.save(version)
+    return index
+
+
+def load_text_index(path=FILE):
+    """
+    Returns (version, TextIndex) for a workbook.
+    """
+    version, frames = load_survey(path)
+    return version, cached_text_index(version, frames)
+
+
+def search_waves(indexes, query):
+    """
+    indexes: {wave name: TextIndex}. Returns DataFrame [wave, respondent].
+    """
+    hits = [
+        pd.DataFrame({"wave": name, "respondent": index.search(query)})
+        for name, index in indexes.items()
+    ]
+    if not hits:
+        return pd.DataFrame(columns=["wave", "respondent"])
+    return pd.concat(hits, ignore_index=True)
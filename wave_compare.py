@@ -0,0 +1,125 @@
+# Wave-over-wave (or segment vs segment) delta engine.
+#
+# Aligns the per-answer aggregates of two waves / segments and runs a
+# two-proportion z-test for every answer of every question in one
+# vectorized pass, then ranks the biggest significant movers.
+#
+# CLI:
+#   python wave_compare.py it1.xlsx it2.xlsx
+#   python wave_compare.py it1.xlsx "Untitled spreadsheet.xlsx" --alpha 0.01 --top 15
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from survey_pipeline import cache_path, labels_cache_name
+from waves import WaveStore
+
+ALPHA = 0.05
+
+
+def compare_aggregates(agg_a, agg_b, alpha=ALPHA):
+    """
+    agg_a / agg_b: [question, answer, Count, Base] (wave_aggregates or
+    SegmentIndex.distributions). Returns one row per question × answer:
+    Pct A / Pct B, Delta (pp), z, p, Significant — sorted by |Delta|,
+    significant movers first.
+    """
+    keys = ["question", "answer"]
+    a = agg_a[keys + ["Count", "Base"]]
+    b = agg_b[keys + ["Count", "Base"]]
+
+    m = a.merge(b, on=keys, how="outer", suffixes=(" A", " B"))
+
+    # an answer missing in one side still has that side's question base
+    for side in ("A", "B"):
+        m[f"Count {side}"] = m[f"Count {side}"].fillna(0)
+        base = m.groupby("question")[f"Base {side}"].transform("max")
+        m[f"Base {side}"] = m[f"Base {side}"].fillna(base).fillna(0)
+
+    c1, n1 = m["Count A"].to_numpy(float), m["Base A"].to_numpy(float)
+    c2, n2 = m["Count B"].to_numpy(float), m["Base B"].to_numpy(float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p1 = np.where(n1 > 0, c1 / n1, 0)
+        p2 = np.where(n2 > 0, c2 / n2, 0)
+
+        pooled = np.where(n1 + n2 > 0, (c1 + c2) / (n1 + n2), 0)
+        se = np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+        z = np.where((se > 0) & np.isfinite(se), (p2 - p1) / se, 0)
+
+    m["Pct A"] = p1 * 100
+    m["Pct B"] = p2 * 100
+    m["Delta"] = (p2 - p1) * 100
+    m["z"] = z
+    m["p"] = 2 * stats.norm.sf(np.abs(z))
+    m["Significant"] = (m["p"] < alpha) & (n1 > 0) & (n2 > 0)
+
+    m["_abs"] = m["Delta"].abs()
+    m = m.sort_values(["Significant", "_abs"], ascending=[False, False]).drop(columns="_abs")
+
+    return m[keys + ["Count A", "Base A", "Pct A", "Count B", "Base B", "Pct B",
+                     "Delta", "z", "p", "Significant"]].reset_index(drop=True)
+
+
+def compare_waves(store, wave_a, wave_b, alpha=ALPHA, model_labels=True):
+    """
+    Comparison of two loaded waves, cached per wave pair (dataset versions)
+    as compare_<version A>.csv in wave B's cache folder
+    (model_labels=False: without the classifier's labels).
+    """
+    va = store.waves[wave_a]["version"]
+    vb = store.waves[wave_b]["version"]
+    key = "aggregates" if model_labels else "aggregates_rules"
+    csv = cache_path(vb, labels_cache_name(f"compare_{va}_{alpha}.csv", model_labels))
+
+    if os.path.exists(csv):
+        return pd.read_csv(csv)
+
+    out = compare_aggregates(
+        store.waves[wave_a][key],
+        store.waves[wave_b][key],
+        alpha
+    )
+    out.to_csv(csv, index=False)
+    return out
+
+
+def top_movers(comparison, top=20):
+    return comparison[comparison["Significant"]].head(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What changed between two survey waves")
+    parser.add_argument("wave_a", help="older workbook")
+    parser.add_argument("wave_b", help="newer workbook")
+    parser.add_argument("--alpha", type=float, default=ALPHA)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    store = WaveStore().add_many([(args.wave_a, args.wave_a), (args.wave_b, args.wave_b)])
+    comparison = compare_waves(store, args.wave_a, args.wave_b, args.alpha)
+    movers = top_movers(comparison, args.top)
+
+    print("=" * 80)
+    print(f"WHAT CHANGED: {args.wave_a} → {args.wave_b}  (alpha={args.alpha})")
+    print(f"Answers compared: {len(comparison)} | significant: {int(comparison['Significant'].sum())}")
+    print("=" * 80)
+
+    if movers.empty:
+        print("No significant movers.")
+        return
+
+    for _, r in movers.iterrows():
+        arrow = "▲" if r["Delta"] > 0 else "▼"
+        print(
+            f"{arrow} {r['question']:<24} {r['answer']:<40} "
+            f"{r['Pct A']:5.1f}% → {r['Pct B']:5.1f}%  ({r['Delta']:+.1f} pp, p={r['p']:.3g})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Wave-partitioned survey store.
+#
+# Every workbook is one tagged wave (iteration). A wave is normalized and
+# turned into an indicator matrix on its own, cached per dataset version
+# by survey_pipeline / survey_matrix, so adding a wave never reprocesses
+# the others. Cold waves are normalized concurrently in worker processes.
+#
+# The dashboard shares one store between all sessions: loads hold a lock,
+# and the waves dict is replaced rather than changed in place, so a
+# session reading it never sees a half-updated store.
+#
+# Each wave keeps two indicator matrices / aggregate sets: with and
+# without the answers labelled by the fallback classifier.
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from survey_matrix import load_indicator_matrix
+from survey_pipeline import FILE, dataset_version, load_survey
+
+# (wave name, workbook), oldest first
+WAVES = [
+    ("Iteration 1", "it1.xlsx"),
+    ("Iteration 2", "it2.xlsx"),
+    ("Master", FILE),
+]
+
+
+def _load_wave(path):
+    """
+    Worker: normalized frames + indicator matrices (with / without
+    classifier labels) for one workbook, served from the per-version
+    cache when it exists.
+    """
+    version, frames = load_survey(path)
+    _, onehot = load_indicator_matrix(path)
+    _, onehot_rules = load_indicator_matrix(path, model_labels=False)
+    return version, frames, onehot, onehot_rules
+
+
+def wave_aggregates(onehot):
+    """
+    Per-answer respondent counts for one wave.
+    DataFrame [question, answer, Count, Base, Pct];
+    Base = respondents who answered that question.
+    """
+    counts = np.asarray(onehot.matrix.sum(axis=0)).ravel()
+
+    base = {
+        q: int((np.asarray(onehot.block(q).sum(axis=1)).ravel() > 0).sum())
+        for q in onehot.questions
+    }
+
+    out = onehot.columns.copy()
+    out["Count"] = counts
+    out["Base"] = out["question"].map(base)
+    out["Pct"] = np.where(out["Base"] > 0, out["Count"] / out["Base"].where(out["Base"] > 0), 0) * 100
+    return out
+
+
+class WaveStore:
+    """
+    name -> {"path", "version", "frames", "onehot", "aggregates",
+             "onehot_rules", "aggregates_rules"}
+    (*_rules: without the classifier's labels).
+    Waves keep insertion order (oldest first).
+    """
+
+    def __init__(self):
+        self.waves = {}
+        self._lock = threading.RLock()
+
+    @property
+    def names(self):
+        return list(self.waves)
+
+    def add(self, name, path):
+        """
+        Loads one wave. No-op if the same workbook version is already loaded.
+        """
+        with self._lock:
+            version = dataset_version(path)
+            if name in self.waves and self.waves[name]["version"] == version:
+                return self.waves[name]
+
+            _, frames, onehot, onehot_rules = _load_wave(path)
+            return self._store(name, path, version, frames, onehot, onehot_rules)
+
+    def add_many(self, waves, max_workers=None):
+        """
+        Loads several (name, path) waves concurrently.
+        Waves already loaded at the same version are skipped.
+        """
+        with self._lock:
+            todo = [
+                (name, path) for name, path in waves
+                if os.path.exists(path) and not (
+                    name in self.waves
+                    and self.waves[name]["version"] == dataset_version(path)
+                )
+            ]
+            if not todo:
+                return self
+
+            if len(todo) == 1:
+                self.add(*todo[0])
+                return self
+
+            with ProcessPoolExecutor(max_workers=max_workers or min(len(todo), os.cpu_count() or 1)) as pool:
+                results = pool.map(_load_wave, [path for _, path in todo])
+                for (name, path), (version, frames, onehot, onehot_rules) in zip(todo, results):
+                    self._store(name, path, version, frames, onehot, onehot_rules)
+
+            # keep the configured order, not completion order
+            order = [name for name, _ in waves if name in self.waves]
+            self.waves = {n: self.waves[n] for n in order + [n for n in self.waves if n not in order]}
+            return self
+
+    def _store(self, name, path, version, frames, onehot, onehot_rules):
+        wave = {
+            "path": path,
+            "version": version,
+            "frames": frames,
+            "onehot": onehot,
+            "aggregates": wave_aggregates(onehot),
+            "onehot_rules": onehot_rules,
+            "aggregates_rules": wave_aggregates(onehot_rules),
+        }
+        self.waves = {**self.waves, name: wave}
+        return wave
+
+    def aggregates(self, model_labels=True):
+        """
+        Per-wave aggregates stacked: [wave, question, answer, Count, Base, Pct].
+        """
+        key = "aggregates" if model_labels else "aggregates_rules"
+        if not self.waves:
+            return pd.DataFrame(columns=["wave", "question", "answer", "Count", "Base", "Pct"])
+
+        return pd.concat(
+            [w[key].assign(wave=name) for name, w in self.waves.items()],
+            ignore_index=True
+        )[["wave", "question", "answer", "Count", "Base", "Pct"]]
+
+    def deltas(self, question=None, model_labels=True):
+        """
+        Pct per wave side by side + percentage-point change vs the previous wave.
+        Columns: question, answer, <wave Pct>..., "Δ <wave>" for waves 2..n.
+        """
+        agg = self.aggregates(model_labels)
+        if question is not None:
+            agg = agg[agg["question"] == question]
+
+        wide = (
+            agg.pivot_table(index=["question", "answer"], columns="wave", values="Pct", fill_value=0)
+            .reindex(columns=self.names, fill_value=0)
+        )
+
+        for prev, cur in zip(self.names, self.names[1:]):
+            wide[f"Δ {cur}"] = wide[cur] - wide[prev]
+
+        wide.columns.name = None
+        return wide.reset_index()
+
+
+def load_waves(waves=WAVES):
+    store = WaveStore()
+    return store.add_many(waves)
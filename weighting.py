@@ -0,0 +1,164 @@
+# Survey weighting (raking / iterative proportional fitting).
+#
+# Respondent weights are fitted so the weighted age and gender margins
+# match population targets. Every update is a bincount + gather over the
+# respondent codes, so a fit converges in a few milliseconds. Since the
+# fit only looks at age × gender, a weight is constant within a cell;
+# cell_weights() exposes that table for counters kept per cell.
+#
+# Weights are trimmed at MAX_WEIGHT × the mean weight inside the fit, so a
+# thin cell (a handful of 65+ respondents) cannot dominate the totals;
+# the trimmed margins then miss their targets by what the cap costs, and
+# info reports that error together with the Kish effective sample size.
+#
+# Only respondents every margin covers are raked, trimmed and rescaled;
+# the rest (an "N/A" or missing age / gender) keep weight 1, since the
+# targets say nothing about them.
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Target shares per margin (edit to match the population you report on).
+# Respondents with a value not listed in some margin (e.g. "N/A") are
+# not raked and keep weight 1.
+DEFAULT_TARGETS = {
+    "age_norm": {
+        "Under 20": 0.10,
+        "20-29": 0.25,
+        "30-39": 0.25,
+        "40-49": 0.20,
+        "50-59": 0.12,
+        "65 +": 0.08,
+    },
+    "gender_norm": {
+        "Female": 0.50,
+        "Male": 0.50,
+    },
+}
+
+
+# largest weight, as a multiple of the mean weight
+MAX_WEIGHT = 5.0
+
+# columns the weights are fitted on; a weight is constant per cell of these
+CELL_KEYS = ("age_norm", "gender_norm")
+
+
+def targets_key(targets):
+    """
+    Stable string for a target set (cache key).
+    """
+    return json.dumps(targets, sort_keys=True)
+
+
+def effective_n(weights):
+    """
+    Kish effective sample size: (sum w)² / sum w².
+    """
+    w = np.asarray(weights, dtype=float)
+    return float(w.sum() ** 2 / (w ** 2).sum()) if len(w) and (w ** 2).sum() > 0 else 0.0
+
+
+def trim(w, max_weight):
+    """
+    Caps weights at max_weight × their mean. Capping lowers the mean, so
+    it is repeated until no weight is above the cap.
+    """
+    for _ in range(50):
+        cap = max_weight * w.mean()
+        if w.max() <= cap * (1 + 1e-9):
+            break
+        w = np.minimum(w, cap)
+    return w
+
+
+def rake(frame, targets=DEFAULT_TARGETS, max_iter=100, tol=1e-6, max_weight=MAX_WEIGHT):
+    """
+    frame: one row per respondent with the target columns.
+    max_weight: cap on a weight relative to the mean (None = no trimming).
+    Returns (weights Series aligned with frame.index, mean 1.0, and
+    info {"iterations", "converged", "max_error", "trimmed", "effective_n",
+    "uncovered"}). Respondents outside a margin keep weight 1.
+    """
+    margins = []
+    for col, shares in targets.items():
+        labels = list(shares)
+        share = np.array([shares[l] for l in labels], dtype=float)
+        share = share / share.sum()
+
+        codes = pd.Categorical(frame[col], categories=labels).codes
+        margins.append((codes, share))
+
+    # respondents every margin covers; the others are pinned at 1
+    covered = np.ones(len(frame), dtype=bool)
+    for codes, _ in margins:
+        covered &= codes >= 0
+    margins = [(codes[covered], share) for codes, share in margins]
+
+    w = np.ones(int(covered.sum()), dtype=float)
+    info = {"iterations": 0, "converged": False, "max_error": np.inf, "trimmed": 0}
+
+    for it in range(1, max_iter + 1):
+        previous = w.copy()
+
+        for codes, share in margins:
+            totals = np.bincount(codes, weights=w, minlength=len(share))
+            goal = share * totals.sum()
+
+            factor = np.where(totals > 0, goal / np.where(totals > 0, totals, 1), 1.0)
+            w *= factor[codes]
+
+        if max_weight is not None and len(w):
+            # trimming lowers the total: rescale so passes are comparable
+            w = trim(w, max_weight)
+            w = w / w.mean()
+
+        # largest relative gap between weighted margin and target
+        err = 0.0
+        for codes, share in margins:
+            totals = np.bincount(codes, weights=w, minlength=len(share))
+            if totals.sum() > 0:
+                present = totals > 0
+                err = max(err, np.abs(totals[present] / totals.sum() - share[present]).max())
+
+        info.update(iterations=it, max_error=float(err))
+        if err < tol:
+            info["converged"] = True
+            break
+        # trimmed fits settle short of the targets: stop once weights stop moving
+        if np.abs(w - previous).max() < tol * max(w.mean(), tol):
+            break
+
+    if w.sum() > 0:
+        w = w / w.mean()
+
+    if max_weight is not None:
+        info["trimmed"] = int((w >= max_weight * (1 - 1e-6)).sum())
+
+    weights = np.ones(len(frame), dtype=float)
+    weights[covered] = w
+    info["uncovered"] = int((~covered).sum())
+    info["effective_n"] = effective_n(weights)
+
+    return pd.Series(weights, index=frame.index, name="weight"), info
+
+
+def weight_cells(frame, keys=CELL_KEYS):
+    """
+    Cell label per respondent ("age|gender"); missing values get their own
+    cell, so every respondent has one.
+    """
+    keys = list(keys)
+    label = frame[keys[0]].astype("object").fillna("").astype(str)
+    for k in keys[1:]:
+        label = label + "|" + frame[k].astype("object").fillna("").astype(str)
+    return label
+
+
+def cell_weights(frame, weights, keys=CELL_KEYS):
+    """
+    Weight per cell label (weights are constant within a cell).
+    """
+    return weights.groupby(weight_cells(frame, keys)).first()